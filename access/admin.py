@@ -1,8 +1,40 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
 from .models import ChatAccessRequest
-from .utils.email_utils import informar_decisao
+from .pagination import CHAVE_KEYSET, PaginadorAdmin
+from .utils.busca_utils import buscar
+from .utils.decisao_utils import decidir, decidir_em_lote
+
+# Parâmetro dos links de página com a âncora do PaginadorAdmin.
+ANCORA_VAR = "ancora"
+
+
+class ListaSolicitacoes(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # A âncora é lida pelo paginador (get_paginator); aqui ela seria
+        # tratada como filtro e repetida nos links de filtro e de ordenação.
+        self.params.pop(ANCORA_VAR, None)
+        self.filter_params.pop(ANCORA_VAR, None)
+        queryset = super().get_queryset(request, exclude_parameters)
+        # Com busca e sem ordenação escolhida na lista, os mais relevantes
+        # primeiro.
+        if ORDER_VAR not in self.params and "relevancia" in queryset.query.annotations:
+            queryset = queryset.order_by("-relevancia", "-pk")
+        return queryset
+
+    @cached_property
+    def ancora(self):
+        return self.paginator.ancora_de(self.page_num, self.result_list)
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Só os links de página levam a âncora da página atual.
+        if new_params and PAGE_VAR in new_params and self.ancora:
+            new_params = {**new_params, ANCORA_VAR: self.ancora}
+        return super().get_query_string(new_params, remove)
 
 
 @admin.register(ChatAccessRequest)
@@ -12,8 +44,14 @@ class ChatAccessRequestAdmin(admin.ModelAdmin):
 
     list_display = ("nome", "email", "status_colored", "criado_em")
     list_filter = ("status", "criado_em")
+    # Buscados pelo backend de busca textual (get_search_results).
     search_fields = ("nome", "email", "motivo")
     readonly_fields = ("nome", "email", "motivo", "criado_em")
+    # Na ordem do índice (criado_em, id), em que o paginador navega pela
+    # âncora; a contagem de toda a tabela, ao lado da filtrada, é desligada.
+    ordering = CHAVE_KEYSET
+    paginator = PaginadorAdmin
+    show_full_result_count = False
     actions = ["aprovar_requisicoes", "recusar_requisicoes"]
 
     def status_colored(self, obj):
@@ -30,27 +68,60 @@ class ChatAccessRequestAdmin(admin.ModelAdmin):
     status_colored.short_description = "Status"
 
     def save_model(self, request, obj, form, change):
-        if change:
-            antigo = ChatAccessRequest.objects.get(pk=obj.pk)
-            if antigo.status != obj.status:
-                # Se quiser, pode capturar motivo da recusa de outro campo futuro aqui
-                informar_decisao(obj)
-        super().save_model(request, obj, form, change)
+        if not change or "status" not in form.changed_data:
+            super().save_model(request, obj, form, change)
+            return
+        # O status é o único campo editável: a decisão é gravada só pelo UPDATE
+        # condicional, para dois admins não decidirem a mesma solicitação.
+        if decidir(obj.pk, obj.status) is None:
+            atual = form.initial.get("status")
+            self.message_user(
+                request,
+                f"O status não foi alterado: a mudança de {atual} para "
+                f"{obj.status} não é permitida ou outra pessoa decidiu antes.",
+                level=messages.WARNING,
+            )
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return buscar(queryset, search_term), False
+
+    def get_changelist(self, request, **kwargs):
+        return ListaSolicitacoes
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            ancora=PaginadorAdmin.ler_ancora(request.GET.get(ANCORA_VAR)),
+        )
+
+    def _mensagem_progresso(self, decisao):
+        url = reverse("chat-access-request-decisao", args=[decisao.pk])
+        return f"Acompanhe o envio dos e-mails em {url}"
 
     def aprovar_requisicoes(self, request, queryset):
-        updated = queryset.update(status="aprovado")
-        for req in queryset:
-            informar_decisao(req)
-        self.message_user(request, f"{updated} requisições aprovadas.")
+        decisao = decidir_em_lote(queryset, "aprovado")
+        self.message_user(
+            request,
+            f"{decisao.total} requisições enviadas para aprovação. "
+            f"{self._mensagem_progresso(decisao)}",
+        )
 
     aprovar_requisicoes.short_description = "Aprovar requisições selecionadas"
 
     def recusar_requisicoes(self, request, queryset):
-        updated = queryset.update(status="recusado")
-        for req in queryset:
-            informar_decisao(req)
-
-        self.message_user(request, f"{updated} requisições recusadas.")
+        decisao = decidir_em_lote(queryset, "recusado")
+        self.message_user(
+            request,
+            f"{decisao.total} requisições enviadas para recusa. "
+            f"{self._mensagem_progresso(decisao)}",
+        )
 
     recusar_requisicoes.short_description = "Recusar requisições selecionadas"
 
@@ -6,4 +6,5 @@ class AccessConfig(AppConfig):
     name = "access"
 
     def ready(self):
+        import access.checks
         import access.signals
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+BACKENDS_PERMITIDOS = ("django-db", "redis://", "rediss://")
+
+
+@register(Tags.compatibility)
+def verificar_resultados_celery(app_configs, **kwargs):
+    """Combinações aceitas entre o backend de resultados e a política por tarefa."""
+    backend = settings.CELERY_RESULT_BACKEND
+    tarefas = settings.TAREFAS_COM_RESULTADO
+    erros = []
+
+    if backend and not backend.startswith(BACKENDS_PERMITIDOS):
+        erros.append(
+            Error(
+                f"CELERY_RESULT_BACKEND inválido: {backend!r}.",
+                hint="Use 'django-db', uma URL redis:// ou deixe vazio.",
+                id="access.E001",
+            )
+        )
+    if backend == "django-db" and "django_celery_results" not in (
+        settings.INSTALLED_APPS
+    ):
+        erros.append(
+            Error(
+                "CELERY_RESULT_BACKEND='django-db' exige django_celery_results "
+                "em INSTALLED_APPS.",
+                id="access.E002",
+            )
+        )
+    if tarefas and not backend:
+        erros.append(
+            Error(
+                "TAREFAS_COM_RESULTADO precisa de um CELERY_RESULT_BACKEND.",
+                id="access.E003",
+            )
+        )
+    if backend and not settings.CELERY_TASK_IGNORE_RESULT:
+        mensagem = (
+            "CELERY_TASK_IGNORE_RESULT=False grava o resultado de cada e-mail "
+            "enviado."
+        )
+        dica = "Liste em TAREFAS_COM_RESULTADO só as tarefas acompanhadas."
+        if backend == "django-db":
+            # No mesmo banco da API, cada envio viraria uma escrita a mais.
+            erros.append(Error(mensagem, hint=dica, id="access.E004"))
+        else:
+            erros.append(Warning(mensagem, hint=dica, id="access.W001"))
+    if backend and settings.CELERY_RESULT_EXPIRES <= 0:
+        erros.append(
+            Error(
+                "CELERY_RESULT_EXPIRES deve ser maior que zero.",
+                hint="Sem expiração a tabela de resultados cresce sem limite.",
+                id="access.E005",
+            )
+        )
+    return erros
+
+
+@register(Tags.compatibility)
+def verificar_rotas_email(app_configs, **kwargs):
+    """Cada tipo de e-mail precisa de uma rota para uma fila declarada."""
+    from access.models import TIPO_EMAIL_CHOICES
+
+    filas = {fila.name for fila in settings.CELERY_TASK_QUEUES}
+    erros = []
+    for tipo, _ in TIPO_EMAIL_CHOICES:
+        fila = settings.EMAIL_ROTAS.get(tipo, {}).get("queue")
+        if fila not in filas:
+            erros.append(
+                Error(
+                    f"EMAIL_ROTAS[{tipo!r}] não aponta para uma fila de "
+                    "CELERY_TASK_QUEUES.",
+                    hint=f"Filas declaradas: {', '.join(sorted(filas))}.",
+                    id="access.E006",
+                )
+            )
+    return erros
+
+
+@register(Tags.compatibility)
+def verificar_busca(app_configs, **kwargs):
+    from access.utils.busca_utils import BACKENDS
+
+    backend = settings.CHAT_ACCESS_REQUEST_BUSCA
+    if backend and backend not in BACKENDS:
+        return [
+            Error(
+                f"CHAT_ACCESS_REQUEST_BUSCA inválido: {backend!r}.",
+                hint=f"Use um de: {', '.join(BACKENDS)}, ou deixe vazio.",
+                id="access.E007",
+            )
+        ]
+    return []
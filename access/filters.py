@@ -0,0 +1,17 @@
+from rest_framework.filters import SearchFilter
+
+from .utils.busca_utils import buscar
+
+
+class BuscaTextualFilter(SearchFilter):
+    """
+    O ``?search=`` do SearchFilter, respondido pelo backend de busca textual
+    (índice de texto) em vez de um icontains por campo. Anota ``relevancia``
+    nas solicitações encontradas.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        termos = self.get_search_terms(request)
+        if not termos:
+            return queryset
+        return buscar(queryset, " ".join(termos))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from access.utils.arquivo_utils import arquivar_decididas
+
+
+class Command(BaseCommand):
+    help = (
+        "Move as solicitações aprovadas e recusadas antigas para o arquivo, "
+        "em lotes curtos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            help="Idade mínima, em dias, desde a criação (padrão: ARQUIVO_DIAS).",
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            help="Solicitações por transação (padrão: ARQUIVO_LOTE).",
+        )
+        parser.add_argument(
+            "--max-lotes",
+            type=int,
+            help="Lotes nesta execução (padrão: ARQUIVO_MAX_LOTES).",
+        )
+
+    def handle(self, *args, **options):
+        arquivadas = arquivar_decididas(
+            dias=options["dias"],
+            tamanho=options["lote"],
+            max_lotes=options["max_lotes"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{arquivadas} solicitações arquivadas."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera os arquivos do schema OpenAPI servidos em /swagger.json e /swagger.yaml."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--saida",
+            default=None,
+            help="Diretório dos arquivos (padrão: OPENAPI_SCHEMA_ROOT).",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Não grava nada; falha se os arquivos não batem com o código.",
+        )
+
+    def handle(self, *args, **options):
+        from core.openapi import desatualizados, escrever
+
+        if options["check"]:
+            nomes = desatualizados(options["saida"])
+            if nomes:
+                raise CommandError(
+                    f"Schema desatualizado: {', '.join(nomes)}. "
+                    "Rode manage.py gerar_schema."
+                )
+            self.stdout.write(self.style.SUCCESS("Schema atualizado."))
+            return
+
+        for caminho in escrever(options["saida"]):
+            self.stdout.write(self.style.SUCCESS(f"{caminho} gravado."))
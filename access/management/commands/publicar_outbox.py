@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from access.tasks import publicar_outbox
+
+
+class Command(BaseCommand):
+    help = "Publica no broker os e-mails pendentes do outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-lotes",
+            type=int,
+            default=None,
+            help="Quantos lotes publicar nesta execução (padrão: OUTBOX_MAX_LOTES).",
+        )
+
+    def handle(self, *args, **options):
+        publicadas = publicar_outbox(max_lotes=options["max_lotes"])
+        self.stdout.write(self.style.SUCCESS(f"{publicadas} mensagens publicadas."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from access.utils.email_utils import reenviar_nao_entregues
+
+
+class Command(BaseCommand):
+    help = "Publica de novo os e-mails que esgotaram as tentativas de envio."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "ids",
+            nargs="*",
+            type=int,
+            help="IDs de EmailNaoEntregue (padrão: todos os pendentes).",
+        )
+
+    def handle(self, *args, **options):
+        reenviados = reenviar_nao_entregues(ids=options["ids"] or None)
+        self.stdout.write(self.style.SUCCESS(f"{reenviados} e-mails reenviados."))
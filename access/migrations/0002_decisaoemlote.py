@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:22
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DecisaoEmLote",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("aprovado", "Aprovado"),
+                            ("recusado", "Recusado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("total", models.PositiveIntegerField(blank=True, null=True)),
+                ("processados", models.PositiveIntegerField(default=0)),
+                ("falhas", models.PositiveIntegerField(default=0)),
+                ("criado_em", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:23
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0002_decisaoemlote"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chataccessrequest",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                models.OrderBy(models.F("criado_em"), descending=True),
+                name="access_email_criado_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chataccessrequest",
+            index=models.Index(
+                models.F("status"),
+                models.OrderBy(models.F("criado_em"), descending=True),
+                name="access_status_criado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0003_indices_email_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chataccessrequest",
+            index=models.Index(
+                models.OrderBy(models.F("criado_em"), descending=True),
+                models.OrderBy(models.F("id"), descending=True),
+                name="access_criado_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0004_indice_keyset"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MensagemOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chave", models.CharField(max_length=100, unique=True)),
+                ("assunto", models.CharField(max_length=255)),
+                ("mensagem", models.TextField()),
+                ("destinatarios", models.JSONField()),
+                ("criado_em", models.DateTimeField(auto_now_add=True)),
+                ("publicado_em", models.DateTimeField(blank=True, null=True)),
+                ("enviado_em", models.DateTimeField(blank=True, null=True)),
+                ("tentativas", models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("publicado_em__isnull", True)),
+                        fields=["id"],
+                        name="access_outbox_pendente_idx",
+                    )
+                ],
+            },
+        ),
+    ]
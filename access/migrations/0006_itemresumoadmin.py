@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0005_mensagemoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemResumoAdmin",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("criado_em", models.DateTimeField(auto_now_add=True)),
+                (
+                    "solicitacao",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="access.chataccessrequest",
+                    ),
+                ),
+            ],
+        ),
+    ]
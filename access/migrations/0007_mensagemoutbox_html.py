@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0006_itemresumoadmin"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mensagemoutbox",
+            name="html",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
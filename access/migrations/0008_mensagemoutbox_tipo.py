@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+def preencher_tipo(apps, schema_editor):
+    # Mensagens ainda no outbox: o tipo sai do prefixo da chave.
+    MensagemOutbox = apps.get_model("access", "MensagemOutbox")
+    for prefixo, tipo in [
+        ("criacao-confirmacao-", "confirmacao"),
+        ("resumo-", "resumo"),
+    ]:
+        MensagemOutbox.objects.filter(chave__startswith=prefixo).update(tipo=tipo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0007_mensagemoutbox_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mensagemoutbox",
+            name="tipo",
+            field=models.CharField(
+                choices=[
+                    ("confirmacao", "Confirmação para o solicitante"),
+                    ("decisao", "Decisão para o solicitante"),
+                    ("admin", "Notificação para o admin"),
+                    ("resumo", "Resumo para o admin"),
+                ],
+                default="admin",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(preencher_tipo, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0008_mensagemoutbox_tipo"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailNaoEntregue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("assunto", models.CharField(max_length=255)),
+                ("mensagem", models.TextField()),
+                ("html", models.TextField(blank=True, default="")),
+                ("destinatarios", models.JSONField()),
+                ("fila", models.CharField(blank=True, default="", max_length=100)),
+                ("prioridade", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("erro", models.TextField()),
+                ("tentativas", models.PositiveSmallIntegerField()),
+                ("criado_em", models.DateTimeField(auto_now_add=True)),
+                ("reenviado_em", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0009_emailnaoentregue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContagemStatus",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dia", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("aprovado", "Aprovado"),
+                            ("recusado", "Recusado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("total", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dia", "status"), name="access_contagem_dia_status_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
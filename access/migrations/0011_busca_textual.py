@@ -0,0 +1,96 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Índices da busca textual (access/utils/busca_utils.py). O SQL fica aqui, e
+# não importado do app, para a migração não mudar junto com o código.
+SQL = {
+    "postgresql": {
+        # Mesma expressão de VETOR_POSTGRES. CONCURRENTLY não trava as
+        # escritas na tabela enquanto o índice é criado.
+        "criar": [
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS access_busca_gin "
+            "ON access_chataccessrequest USING gin ("
+            "to_tsvector('simple'::regconfig, nome || ' ' || "
+            "translate(email, '@.-_+', '     ') || ' ' || motivo))",
+        ],
+        "remover": ["DROP INDEX CONCURRENTLY IF EXISTS access_busca_gin"],
+    },
+    "sqlite": {
+        # Tabela FTS5 de conteúdo externo: guarda só o índice e lê o texto da
+        # própria access_chataccessrequest. Os triggers a mantêm em dia em
+        # qualquer escrita, inclusive bulk_create e update(). Mudanças de
+        # status não tocam nas colunas indexadas e não disparam o trigger.
+        # Atenção: uma migração que recrie a tabela no SQLite (ALTER de
+        # coluna) apaga os triggers, que precisam ser recriados.
+        "criar": [
+            "CREATE VIRTUAL TABLE access_busca USING fts5("
+            "nome, email, motivo, content='access_chataccessrequest', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 0')",
+            "CREATE TRIGGER access_busca_ai AFTER INSERT "
+            "ON access_chataccessrequest BEGIN "
+            "INSERT INTO access_busca(rowid, nome, email, motivo) "
+            "VALUES (new.id, new.nome, new.email, new.motivo); END",
+            "CREATE TRIGGER access_busca_ad AFTER DELETE "
+            "ON access_chataccessrequest BEGIN "
+            "INSERT INTO access_busca(access_busca, rowid, nome, email, motivo) "
+            "VALUES ('delete', old.id, old.nome, old.email, old.motivo); END",
+            "CREATE TRIGGER access_busca_au AFTER UPDATE OF nome, email, motivo "
+            "ON access_chataccessrequest BEGIN "
+            "INSERT INTO access_busca(access_busca, rowid, nome, email, motivo) "
+            "VALUES ('delete', old.id, old.nome, old.email, old.motivo); "
+            "INSERT INTO access_busca(rowid, nome, email, motivo) "
+            "VALUES (new.id, new.nome, new.email, new.motivo); END",
+            "INSERT INTO access_busca(access_busca) VALUES ('rebuild')",
+        ],
+        "remover": [
+            "DROP TRIGGER IF EXISTS access_busca_ai",
+            "DROP TRIGGER IF EXISTS access_busca_ad",
+            "DROP TRIGGER IF EXISTS access_busca_au",
+            "DROP TABLE IF EXISTS access_busca",
+        ],
+    },
+}
+
+
+def _executar(acao):
+    def executar(apps, schema_editor):
+        for sql in SQL.get(schema_editor.connection.vendor, {}).get(acao, []):
+            schema_editor.execute(sql)
+
+    return executar
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de uma transação.
+    atomic = False
+
+    dependencies = [
+        ("access", "0010_contagemstatus"),
+    ]
+
+    operations = [
+        migrations.RunPython(_executar("criar"), _executar("remover")),
+        # Só no estado: a tabela FTS5 é criada acima, e só no SQLite.
+        migrations.CreateModel(
+            name="BuscaSolicitacao",
+            fields=[
+                (
+                    "solicitacao",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="busca_fts",
+                        serialize=False,
+                        to="access.chataccessrequest",
+                    ),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "access_busca",
+                "managed": False,
+            },
+        ),
+    ]
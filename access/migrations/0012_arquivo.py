@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0011_busca_textual"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailArquivado",
+            fields=[
+                (
+                    "email",
+                    models.CharField(max_length=254, primary_key=True, serialize=False),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("aprovado", "Aprovado"),
+                            ("recusado", "Recusado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("criado_em", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SolicitacaoArquivada",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("nome", models.CharField(max_length=100)),
+                ("email", models.EmailField(max_length=254)),
+                ("motivo", models.TextField()),
+                ("criado_em", models.DateTimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pendente", "Pendente"),
+                            ("aprovado", "Aprovado"),
+                            ("recusado", "Recusado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("arquivado_em", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
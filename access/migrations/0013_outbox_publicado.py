@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0012_arquivo"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mensagemoutbox",
+            index=models.Index(
+                condition=models.Q(
+                    ("enviado_em__isnull", True), ("publicado_em__isnull", False)
+                ),
+                fields=["publicado_em"],
+                name="access_outbox_publicado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0013_outbox_publicado"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="decisaoemlote",
+            name="ignoradas",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
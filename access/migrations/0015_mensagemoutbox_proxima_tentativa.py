@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("access", "0014_decisaoemlote_ignoradas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mensagemoutbox",
+            name="proxima_tentativa_em",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
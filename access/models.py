@@ -1,4 +1,125 @@
-from django.db import models
+import uuid
+
+from django.db import connections, models, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+STATUS_CHOICES = [
+    ("pendente", "Pendente"),
+    ("aprovado", "Aprovado"),
+    ("recusado", "Recusado"),
+]
+
+# Mudanças de status permitidas numa decisão individual (origem, destino).
+TRANSICOES_STATUS = {
+    ("pendente", "aprovado"),
+    ("pendente", "recusado"),
+}
+
+
+def origens_permitidas(status):
+    """Status a partir dos quais ``TRANSICOES_STATUS`` permite chegar em ``status``."""
+    return sorted(origem for origem, destino in TRANSICOES_STATUS if destino == status)
+
+
+# Tipo de cada e-mail, usado para escolher a fila e a prioridade no Celery
+# (EMAIL_ROTAS em settings).
+TIPO_EMAIL_CHOICES = [
+    ("confirmacao", "Confirmação para o solicitante"),
+    ("decisao", "Decisão para o solicitante"),
+    ("admin", "Notificação para o admin"),
+    ("resumo", "Resumo para o admin"),
+]
+
+
+def normalizar_email(email):
+    return email.strip().lower()
+
+
+def suporta_update_returning(connection):
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+class ChatAccessRequestQuerySet(models.QuerySet):
+    def por_email(self, email):
+        # Usa a mesma expressão do índice funcional, para a busca não depender
+        # da caixa com que o e-mail foi digitado.
+        return self.alias(email_normalizado=Lower("email")).filter(
+            email_normalizado=normalizar_email(email)
+        )
+
+    def ultimo_status_por_email(self, emails):
+        normalizados = {normalizar_email(email) for email in emails}
+        linhas = (
+            self.annotate(email_normalizado=Lower("email"))
+            .filter(email_normalizado__in=normalizados)
+            .order_by("-criado_em")
+            .values_list("email_normalizado", "status")
+        )
+        # Ordenado do mais recente para o mais antigo: vale o primeiro status.
+        status_por_email = {}
+        for email, status in linhas:
+            status_por_email.setdefault(email, status)
+        # Os demais podem ter só solicitações arquivadas.
+        status_por_email.update(
+            EmailArquivado.objects.using(self.db)
+            .filter(email__in=normalizados - status_por_email.keys())
+            .values_list("email", "status")
+        )
+        return status_por_email
+
+    def transicionar(self, pk, status):
+        """
+        Muda o status da solicitação ``pk`` com um UPDATE condicionado ao
+        status atual (``WHERE status = <origem permitida>``), sem ler a linha
+        antes: um comando por origem permitida, hoje só "pendente". Retorna a
+        solicitação alterada, só com nome, e-mail, criação, status e
+        ``status_anterior``, ou None quando a transição não é permitida a
+        partir do status atual, inclusive quando outra requisição decidiu
+        primeiro.
+        """
+        for origem in origens_permitidas(status):
+            linha = self._alterar_status(pk, origem, status)
+            if linha is not None:
+                nome, email, criado_em = linha
+                solicitacao = self.model(
+                    pk=pk, nome=nome, email=email, criado_em=criado_em, status=status
+                )
+                solicitacao.status_anterior = origem
+                return solicitacao
+        return None
+
+    def _alterar_status(self, pk, origem, status):
+        connection = connections[self.db]
+        if not suporta_update_returning(connection):
+            with transaction.atomic(using=self.db):
+                if not self.filter(pk=pk, status=origem).update(status=status):
+                    return None
+                return (
+                    self.filter(pk=pk).values_list("nome", "email", "criado_em").get()
+                )
+
+        quote = connection.ops.quote_name
+        sql = (
+            f"UPDATE {quote(self.model._meta.db_table)} "
+            f"SET {quote('status')} = %s "
+            f"WHERE {quote('id')} = %s AND {quote('status')} = %s "
+            f"RETURNING {quote('nome')}, {quote('email')}, {quote('criado_em')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [status, pk, origem])
+            linha = cursor.fetchone()
+        if linha is None:
+            return None
+        nome, email, criado_em = linha
+        if timezone.is_naive(criado_em):
+            # Sem os conversores do ORM, o SQLite devolve a data sem fuso.
+            criado_em = timezone.make_aware(criado_em, connection.timezone)
+        return nome, email, criado_em
 
 
 class ChatAccessRequest(models.Model):
@@ -8,13 +129,182 @@ class ChatAccessRequest(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     status = models.CharField(
         max_length=20,
-        choices=[
-            ("pendente", "Pendente"),
-            ("aprovado", "Aprovado"),
-            ("recusado", "Recusado"),
-        ],
+        choices=STATUS_CHOICES,
         default="pendente",
     )
 
+    objects = ChatAccessRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                Lower("email"),
+                models.F("criado_em").desc(),
+                name="access_email_criado_idx",
+            ),
+            models.Index(
+                "status",
+                models.F("criado_em").desc(),
+                name="access_status_criado_idx",
+            ),
+            # Chave da paginação por cursor da listagem sem filtro de status.
+            models.Index(
+                models.F("criado_em").desc(),
+                models.F("id").desc(),
+                name="access_criado_id_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.nome} ({self.status})"
+
+
+class BuscaSolicitacao(models.Model):
+    # Tabela FTS5 da busca no SQLite (migração 0011). Lida com um join, para o
+    # rank de cada linha sair da mesma consulta textual.
+    solicitacao = models.OneToOneField(
+        ChatAccessRequest,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="busca_fts",
+    )
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "access_busca"
+
+
+class ContagemStatus(models.Model):
+    # Solicitações por dia de criação (no fuso do projeto) e status atual,
+    # mantidas a cada criação e decisão (access/utils/contagem_utils.py).
+    dia = models.DateField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dia", "status"], name="access_contagem_dia_status_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} {self.status}: {self.total}"
+
+
+class DecisaoEmLote(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    # Só é preenchido depois que todas as linhas foram enfileiradas.
+    total = models.PositiveIntegerField(null=True, blank=True)
+    processados = models.PositiveIntegerField(default=0)
+    falhas = models.PositiveIntegerField(default=0)
+    # Selecionadas que outra decisão alterou antes de o worker chegar nelas:
+    # não mudam de novo (TRANSICOES_STATUS) nem são notificadas.
+    ignoradas = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def feitas(self):
+        return self.processados + self.falhas + self.ignoradas
+
+    @property
+    def concluido(self):
+        return self.total is not None and self.feitas >= self.total
+
+    def __str__(self):
+        return f"{self.status} ({self.feitas}/{self.total})"
+
+
+class MensagemOutbox(models.Model):
+    # Identifica a mensagem de forma estável (ex.: "criacao-admin-42"), para o
+    # mesmo e-mail não ser registrado duas vezes.
+    chave = models.CharField(max_length=100, unique=True)
+    assunto = models.CharField(max_length=255)
+    mensagem = models.TextField()
+    html = models.TextField(blank=True, default="")
+    destinatarios = models.JSONField()
+    tipo = models.CharField(max_length=20, choices=TIPO_EMAIL_CHOICES, default="admin")
+    criado_em = models.DateTimeField(auto_now_add=True)
+    publicado_em = models.DateTimeField(null=True, blank=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    # Depois de uma falha, o relay só publica de novo a partir daqui.
+    proxima_tentativa_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="access_outbox_pendente_idx",
+                condition=models.Q(publicado_em__isnull=True),
+            ),
+            # Publicadas e ainda não enviadas, para o relay achar as perdidas.
+            models.Index(
+                fields=["publicado_em"],
+                name="access_outbox_publicado_idx",
+                condition=models.Q(publicado_em__isnull=False, enviado_em__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return self.chave
+
+
+class EmailNaoEntregue(models.Model):
+    # Fila de mensagens mortas do envio de e-mails (tarefas e outbox): o que
+    # falhou de forma permanente ou esgotou as tentativas. O comando reenviar_nao_entregues
+    # publica de novo, na mesma fila e prioridade.
+    assunto = models.CharField(max_length=255)
+    mensagem = models.TextField()
+    html = models.TextField(blank=True, default="")
+    destinatarios = models.JSONField()
+    fila = models.CharField(max_length=100, blank=True, default="")
+    prioridade = models.PositiveSmallIntegerField(null=True, blank=True)
+    erro = models.TextField()
+    tentativas = models.PositiveSmallIntegerField()
+    criado_em = models.DateTimeField(auto_now_add=True)
+    reenviado_em = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.assunto} -> {', '.join(self.destinatarios)}"
+
+
+class ItemResumoAdmin(models.Model):
+    # Solicitação que ainda não entrou em nenhum resumo enviado ao admin.
+    solicitacao = models.OneToOneField(ChatAccessRequest, on_delete=models.CASCADE)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.solicitacao)
+
+
+class SolicitacaoArquivada(models.Model):
+    # Solicitação decidida há mais de ARQUIVO_DIAS dias, movida da tabela
+    # principal com o mesmo id (access/utils/arquivo_utils.py). Sem índices:
+    # só é lida para auditoria e pela reconciliação dos contadores.
+    id = models.BigIntegerField(primary_key=True)
+    nome = models.CharField(max_length=100)
+    email = models.EmailField()
+    motivo = models.TextField()
+    criado_em = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.nome} ({self.status})"
+
+
+class EmailArquivado(models.Model):
+    # Status da solicitação arquivada mais recente de cada e-mail
+    # (normalizado): a verificação de duplicados lê daqui, pela chave, o que
+    # saiu da tabela principal.
+    email = models.CharField(max_length=254, primary_key=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    criado_em = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.email} ({self.status})"
@@ -0,0 +1,291 @@
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, Subquery
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+CHAVE_KEYSET = ("-criado_em", "-id")
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Paginação por cursor sobre uma chave composta e única.
+
+    A ordenação pedida ao OrderingFilter é completada com os campos de
+    ``CHAVE_KEYSET``, no sentido do primeiro campo pedido; como a posição do
+    cursor guarda todos esses campos, a próxima página é sempre um
+    ``WHERE (campos) > (posição)`` sobre o índice, sem OFFSET.
+    """
+
+    ordering = CHAVE_KEYSET
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        self.page_size = settings.CHAT_ACCESS_REQUEST_PAGE_SIZE
+        self.max_page_size = settings.CHAT_ACCESS_REQUEST_MAX_PAGE_SIZE
+        return super().get_page_size(request)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        campos = {campo.lstrip("-") for campo in ordering}
+        # Tudo no mesmo sentido: ?ordering=criado_em vira (criado_em, id), que
+        # o índice percorre de trás para frente, e não (criado_em, -id).
+        sentido = "-" if ordering[0].startswith("-") else ""
+        for campo in CHAVE_KEYSET:
+            nome = campo.lstrip("-")
+            if nome not in campos:
+                ordering.append(sentido + nome)
+        return tuple(ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        valores = []
+        for campo in ordering:
+            nome = campo.lstrip("-")
+            valor = (
+                instance[nome]
+                if isinstance(instance, dict)
+                else getattr(instance, nome)
+            )
+            valores.append(str(valor))
+        return json.dumps(valores)
+
+    def _filtro_posicao(self, posicao, reverse):
+        try:
+            valores = json.loads(posicao)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(valores, list) or len(valores) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        lookups = []
+        for campo in self.ordering:
+            # Cursor invertido XOR campo decrescente: busca valores menores.
+            menor = reverse != campo.startswith("-")
+            lookups.append((campo.lstrip("-"), "lt" if menor else "gt"))
+
+        # (a, b, c) > (x, y, z) = a > x OR (a = x AND (b > y OR ...)).
+        filtro = Q()
+        for indice in reversed(range(len(lookups))):
+            nome, lookup = lookups[indice]
+            estrito = Q(**{f"{nome}__{lookup}": valores[indice]})
+            if indice == len(lookups) - 1:
+                filtro = estrito
+            else:
+                filtro = estrito | (Q(**{nome: valores[indice]}) & filtro)
+
+        # Limite não estrito no primeiro campo, para o banco usar o índice
+        # como intervalo em vez de avaliar o OR linha a linha.
+        nome, lookup = lookups[0]
+        return Q(**{f"{nome}__{lookup}e": valores[0]}) & filtro
+
+    def _fatia(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self._reverse, self._posicao = False, None
+        else:
+            self._reverse, self._posicao = self.cursor.reverse, self.cursor.position
+
+        if self._reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self._posicao is not None:
+            queryset = queryset.filter(
+                self._filtro_posicao(self._posicao, self._reverse)
+            )
+
+        # A chave é única, então o offset do cursor do DRF nunca é necessário.
+        return queryset[: self.page_size + 1]
+
+    def _montar_pagina(self, results):
+        reverse, current_position = self._reverse, self._posicao
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        fatia = self._fatia(queryset, request, view)
+        if fatia is None:
+            return None
+        return self._montar_pagina(list(fatia))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        fatia = self._fatia(queryset, request, view)
+        if fatia is None:
+            return None
+        return self._montar_pagina([obj async for obj in fatia])
+
+
+def estimar_linhas(queryset):
+    """
+    Linhas que o planejador do PostgreSQL espera para o queryset (o "Plan
+    Rows" do EXPLAIN, sem executar a consulta), ou None nos outros bancos.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plano = json.loads(queryset.order_by().explain(format="json"))
+    return int(plano[0]["Plan"]["Plan Rows"])
+
+
+class PaginadorAdmin(Paginator):
+    """
+    Paginador da lista do admin em que qualquer página abre em tempo quase
+    constante.
+
+    - ``count`` é a estimativa do planejador quando ela passa de
+      ADMIN_CONTAGEM_EXATA_MAX linhas; abaixo disso, e fora do PostgreSQL, é o
+      COUNT(*) de sempre.
+    - Cada página é lida a partir do ponto conhecido mais próximo: o início, o
+      fim (na ordem invertida) ou, na ordem de ``CHAVE_KEYSET``, a âncora, a
+      chave da primeira linha da página em que o admin estava, que os links
+      de página carregam. Como esses links só levam às páginas vizinhas e às
+      das pontas, o OFFSET fica limitado a poucas páginas. Com o total
+      estimado, nada é contado do fim: a última página, aberta longe da
+      âncora, é só a das linhas mais antigas.
+    """
+
+    def __init__(
+        self, object_list, per_page, orphans=0, allow_empty_first_page=True, ancora=None
+    ):
+        # Sem orphans: as páginas contadas do início, do fim e da âncora
+        # precisam ter o mesmo tamanho.
+        super().__init__(object_list, per_page, 0, allow_empty_first_page)
+        self.ancora = ancora
+        self.estimada = False
+
+    @cached_property
+    def count(self):
+        estimativa = estimar_linhas(self.object_list)
+        if estimativa is not None and estimativa > settings.ADMIN_CONTAGEM_EXATA_MAX:
+            self.estimada = True
+            return estimativa
+        return self.object_list.count()
+
+    @property
+    def em_keyset(self):
+        # A chave é única: o que vier depois dela na ordenação não muda nada.
+        ordem = tuple(self.object_list.query.order_by)
+        return ordem[: len(CHAVE_KEYSET)] == CHAVE_KEYSET
+
+    def _filtro_ancora(self, antes):
+        # Linhas antes da âncora na ordem decrescente de (criado_em, id), ou a
+        # partir dela, com o mesmo limite não estrito da paginação da API.
+        _, criado_em, pk = self.ancora
+        if antes:
+            return Q(criado_em__gte=criado_em) & (
+                Q(criado_em__gt=criado_em) | Q(criado_em=criado_em, id__gt=pk)
+            )
+        return Q(criado_em__lte=criado_em) & (
+            Q(criado_em__lt=criado_em) | Q(criado_em=criado_em, id__lte=pk)
+        )
+
+    def _invertida(self, queryset, inicio, fim):
+        # Fatia lida na ordem invertida, devolvida na ordem da lista.
+        fatia = queryset.reverse().values("pk")[inicio:fim]
+        return self.object_list.filter(pk__in=Subquery(fatia))
+
+    def page(self, number):
+        number = self.validate_number(number)
+        por_pagina = self.per_page
+        # Páginas puladas a partir de cada ponto. Com o total estimado, as
+        # páginas não podem ser contadas do fim: sairiam desalinhadas das
+        # contadas do início e da âncora.
+        caminhos = {"inicio": number - 1}
+        if not self.estimada:
+            caminhos["fim"] = self.num_pages - number
+        if self.ancora and self.em_keyset:
+            pagina_ancora = self.ancora[0]
+            if number >= pagina_ancora:
+                caminhos["depois"] = number - pagina_ancora
+            else:
+                caminhos["antes"] = pagina_ancora - number - 1
+        if self.estimada and number == self.num_pages and (min(caminhos.values()) > 1):
+            # A última página, longe da âncora: as linhas mais antigas, lidas
+            # na ordem invertida sem OFFSET.
+            caminhos = {"ultima": 0}
+        caminho = min(caminhos, key=caminhos.get)
+        pulo = caminhos[caminho] * por_pagina
+
+        if caminho == "inicio":
+            object_list = self.object_list[pulo : pulo + por_pagina]
+        elif caminho == "depois":
+            queryset = self.object_list.filter(self._filtro_ancora(antes=False))
+            object_list = queryset[pulo : pulo + por_pagina]
+        elif caminho == "antes":
+            queryset = self.object_list.filter(self._filtro_ancora(antes=True))
+            object_list = self._invertida(queryset, pulo, pulo + por_pagina)
+        elif caminho == "ultima":
+            object_list = self._invertida(self.object_list, 0, por_pagina)
+        else:
+            # A última página tem o que sobra depois das anteriores.
+            ultima = self.count - (self.num_pages - 1) * por_pagina
+            if number == self.num_pages:
+                inicio, fim = 0, ultima
+            else:
+                inicio = ultima + pulo - por_pagina
+                fim = inicio + por_pagina
+            object_list = self._invertida(self.object_list, inicio, fim)
+        return self._get_page(object_list, number, self)
+
+    @staticmethod
+    def ler_ancora(valor):
+        """``(página, criado_em, id)`` de ``"página_id_criado_em"``, ou None."""
+        try:
+            pagina, pk, criado_em = valor.split("_", 2)
+            pagina, pk, criado_em = int(pagina), int(pk), parse_datetime(criado_em)
+        except (AttributeError, ValueError):
+            return None
+        if criado_em is None or pagina < 1:
+            return None
+        return pagina, criado_em, pk
+
+    def ancora_de(self, number, object_list):
+        """A âncora da página ``number`` para os links às vizinhas, ou None."""
+        if not self.em_keyset:
+            return None
+        primeira = next(iter(object_list), None)
+        if primeira is None:
+            return None
+        return f"{number}_{primeira.pk}_{primeira.criado_em.isoformat()}"
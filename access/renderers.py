@@ -0,0 +1,21 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """
+    Mesma saída compacta do ``JSONRenderer``, codificada com orjson. Pedidos com
+    indentação (API navegável, ``; indent=``) continuam no renderer do DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=JSONEncoder().default)
+        # O JSONRenderer escapa esses separadores, inválidos em JavaScript.
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
@@ -0,0 +1,95 @@
+"""
+Documentação OpenAPI das views. Importado só quando o schema é gerado (ver
+core/openapi.py), para que o drf_yasg fique fora da subida do processo.
+"""
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from .serializers import ChatAccessRequestSerializer
+from .utils.export_utils import FORMATOS
+from .views import (
+    ChatAccessRequestAsyncListView,
+    ChatAccessRequestBulkCreateView,
+    ChatAccessRequestEstatisticasView,
+    ChatAccessRequestExportView,
+    ChatAccessRequestListView,
+)
+
+FILTROS_LISTAGEM = [
+    openapi.Parameter(
+        "status",
+        openapi.IN_QUERY,
+        description="Filtrar por status",
+        type=openapi.TYPE_STRING,
+        enum=["pendente", "aprovado", "recusado"],
+    ),
+    openapi.Parameter(
+        "criado_de",
+        openapi.IN_QUERY,
+        description="Criadas a partir desta data/hora (ISO 8601)",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "criado_ate",
+        openapi.IN_QUERY,
+        description="Criadas até esta data/hora (ISO 8601)",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
+
+def _documentar(view, metodo, **kwargs):
+    # O método precisa ser da própria view: o swagger_auto_schema marca a
+    # função, e marcar a herdada documentaria todas as outras views.
+    swagger_auto_schema(**kwargs)(view.__dict__[metodo])
+
+
+_documentar(
+    ChatAccessRequestBulkCreateView,
+    "post",
+    request_body=ChatAccessRequestSerializer(many=True),
+    responses={
+        201: "Solicitações criadas e erros por linha",
+        400: "Nenhuma solicitação criada",
+    },
+)
+_documentar(ChatAccessRequestListView, "get", manual_parameters=FILTROS_LISTAGEM)
+_documentar(ChatAccessRequestAsyncListView, "get", manual_parameters=FILTROS_LISTAGEM)
+_documentar(
+    ChatAccessRequestExportView,
+    "get",
+    manual_parameters=[
+        openapi.Parameter(
+            "formato",
+            openapi.IN_QUERY,
+            description="Formato do arquivo",
+            type=openapi.TYPE_STRING,
+            enum=list(FORMATOS),
+            default="ndjson",
+        ),
+        *FILTROS_LISTAGEM,
+    ],
+    responses={200: "Arquivo NDJSON ou CSV com as solicitações"},
+)
+_documentar(
+    ChatAccessRequestEstatisticasView,
+    "get",
+    manual_parameters=[
+        openapi.Parameter(
+            "criado_de",
+            openapi.IN_QUERY,
+            description="Primeiro dia (AAAA-MM-DD); padrão: ESTATISTICAS_DIAS atrás",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+        ),
+        openapi.Parameter(
+            "criado_ate",
+            openapi.IN_QUERY,
+            description="Último dia (AAAA-MM-DD); padrão: hoje",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+        ),
+    ],
+    responses={200: "Solicitações por status e por dia de criação"},
+)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from .models import ChatAccessRequest
+from .models import ChatAccessRequest, DecisaoEmLote, normalizar_email
+from .utils.cache_utils import status_do_email
 
 
 class ChatAccessRequestSerializer(serializers.ModelSerializer):
@@ -10,11 +11,14 @@ class ChatAccessRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "criado_em", "status"]
 
     def validate_email(self, value):
-        existing_request = (
-            ChatAccessRequest.objects.filter(email=value).order_by("-criado_em").first()
-        )
-        if existing_request:
-            status = existing_request.status
+        # Na criação em lote, o status de todos os e-mails já vem de uma única
+        # consulta feita antes da validação.
+        status_por_email = self.context.get("status_por_email")
+        if status_por_email is not None:
+            status = status_por_email.get(normalizar_email(value))
+        else:
+            status = status_do_email(value)
+        if status:
             if status == "pendente":
                 raise serializers.ValidationError(
                     "Já existe uma solicitação pendente para este e-mail."
@@ -34,3 +38,19 @@ class ChatAccessRequestStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChatAccessRequest
         fields = ["status"]
+        extra_kwargs = {"status": {"required": True}}
+
+
+class DecisaoEmLoteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DecisaoEmLote
+        fields = [
+            "id",
+            "status",
+            "total",
+            "processados",
+            "falhas",
+            "ignoradas",
+            "concluido",
+        ]
+        read_only_fields = fields
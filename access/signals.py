@@ -1,12 +1,32 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from .models import ChatAccessRequest
-from .utils.email_utils import confirmar_solicitante, notificar_admin
+from .utils.cache_utils import invalidar_status, registrar_status_criados
+from .utils.contagem_utils import registrar_contagens_criadas
+from .utils.email_utils import registrar_emails_criacao
 
 
 @receiver(post_save, sender=ChatAccessRequest)
 def enviar_emails_quando_criado(sender, instance, created, **kwargs):
     if created:
-        notificar_admin(instance)
-        confirmar_solicitante(instance)
+        registrar_emails_criacao([instance])
+
+
+@receiver(post_save, sender=ChatAccessRequest)
+def contar_quando_criado(sender, instance, created, using, **kwargs):
+    if created:
+        registrar_contagens_criadas([instance], using=using)
+
+
+@receiver(post_save, sender=ChatAccessRequest)
+def atualizar_cache_status(sender, instance, created, using, **kwargs):
+    if created:
+        registrar_status_criados([instance], using=using)
+    else:
+        invalidar_status([instance.email], using=using)
+
+
+@receiver(post_delete, sender=ChatAccessRequest)
+def remover_cache_status(sender, instance, using, **kwargs):
+    invalidar_status([instance.email], using=using)
@@ -1,14 +1,363 @@
+import logging
+import random
+from datetime import timedelta
+
 from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DecisaoEmLote, EmailNaoEntregue, MensagemOutbox
+from .utils.arquivo_utils import arquivar_decididas
+from .utils.contagem_utils import reconciliar_contagens
+from .utils.smtp_utils import (
+    CircuitoAberto,
+    erro_transitorio,
+    registrar_falha,
+    verificar_circuito,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _espera_reenvio(tentativa, exc):
+    espera = get_exponential_backoff_interval(
+        settings.EMAIL_RETRY_BACKOFF,
+        tentativa,
+        settings.EMAIL_RETRY_BACKOFF_MAX,
+        full_jitter=True,
+    )
+    if isinstance(exc, CircuitoAberto):
+        # Volta depois da pausa, espalhado para não chegarem todos juntos.
+        espera = max(espera, exc.restante + random.uniform(0, exc.restante))
+    return espera
+
+
+def _registrar_nao_entregues(falhas, tentativas, entrega):
+    """
+    Grava em EmailNaoEntregue as ``(mensagem, erro)`` que não serão mais
+    tentadas, com a fila e a prioridade de origem (``entrega``).
+    """
+    entrega = entrega or {}
+    EmailNaoEntregue.objects.bulk_create(
+        EmailNaoEntregue(
+            assunto=assunto,
+            mensagem=mensagem,
+            html=html or "",
+            destinatarios=destinatarios,
+            fila=entrega.get("routing_key") or "",
+            prioridade=entrega.get("priority"),
+            erro=repr(erro),
+            tentativas=tentativas,
+        )
+        for (assunto, mensagem, destinatarios, html), erro in falhas
+    )
+    for (_, _, destinatarios, _), erro in falhas:
+        logger.error(
+            "E-mail para %s não entregue após %s tentativas: %s",
+            destinatarios,
+            tentativas,
+            erro,
+        )
+
+
+def _separar_falhas(mensagens, resultados, tentativa, entrega):
+    """
+    Trata cada mensagem de um lote como o enviar_email_async trataria:
+    retorna os índices das barradas pelo circuito e das que falharam mas
+    ainda podem ser tentadas; as demais falhas vão para EmailNaoEntregue.
+    """
+    pausadas, reenviar, perdidas = [], [], []
+    for indice, erro in enumerate(resultados):
+        if erro is None:
+            continue
+        if isinstance(erro, CircuitoAberto):
+            pausadas.append(indice)
+        elif erro_transitorio(erro) and tentativa < settings.EMAIL_RETRY_MAX_TENTATIVAS:
+            reenviar.append(indice)
+        else:
+            perdidas.append((mensagens[indice], erro))
+    _registrar_nao_entregues(perdidas, tentativa + 1, entrega)
+    return pausadas, reenviar
+
+
+# Sem limite do Celery: o limite é das tentativas de envio, sem as pausas.
+@shared_task(bind=True, queue="emails", max_retries=None)
+def enviar_email_async(self, assunto, mensagem, destinatarios, html=None, pausas=0):
+    # Tentativas de envio já feitas: as reexecuções menos as pausas do circuito,
+    # em que nada foi enviado.
+    tentativa = self.request.retries - pausas
+    try:
+        verificar_circuito()
+    except CircuitoAberto as exc:
+        raise self.retry(
+            exc=exc,
+            countdown=_espera_reenvio(tentativa, exc),
+            kwargs={**(self.request.kwargs or {}), "pausas": pausas + 1},
+        )
+    try:
+        send_mail(
+            assunto,
+            mensagem,
+            settings.DEFAULT_FROM_EMAIL,
+            destinatarios,
+            fail_silently=False,
+            html_message=html or None,
+        )
+    except Exception as exc:
+        registrar_falha(exc)
+        if erro_transitorio(exc) and tentativa < settings.EMAIL_RETRY_MAX_TENTATIVAS:
+            raise self.retry(exc=exc, countdown=_espera_reenvio(tentativa, exc))
+        _registrar_nao_entregues(
+            [((assunto, mensagem, destinatarios, html), exc)],
+            tentativa + 1,
+            self.request.delivery_info,
+        )
+
+
+def _reabrir_conexao(connection):
+    connection.close()
+    try:
+        connection.open()
+    except Exception:
+        logger.exception("Não foi possível reabrir a conexão SMTP.")
+
+
+def entregar_mensagens(mensagens):
+    """
+    Envia uma lista de ``(assunto, mensagem, destinatarios[, html])``
+    reaproveitando uma única conexão SMTP. Retorna, na mesma ordem, ``None`` para cada mensagem
+    entregue ou a exceção que impediu a entrega.
+    """
+    resultados = []
+    connection = get_connection(fail_silently=False)
+    try:
+        verificar_circuito()
+        connection.open()
+    except CircuitoAberto as exc:
+        return [exc] * len(mensagens)
+    except Exception as exc:
+        logger.exception("Falha ao abrir conexão SMTP para o lote.")
+        registrar_falha(exc)
+        return [exc] * len(mensagens)
+
+    try:
+        for assunto, mensagem, destinatarios, *html in mensagens:
+            email = EmailMultiAlternatives(
+                assunto,
+                mensagem,
+                settings.DEFAULT_FROM_EMAIL,
+                destinatarios,
+                connection=connection,
+            )
+            if html and html[0]:
+                email.attach_alternative(html[0], "text/html")
+            try:
+                connection.send_messages([email])
+            except Exception as exc:
+                logger.warning("Falha ao enviar e-mail para %s: %s", destinatarios, exc)
+                registrar_falha(exc)
+                resultados.append(exc)
+                # Um erro no meio do lote pode deixar a sessão SMTP inconsistente.
+                _reabrir_conexao(connection)
+            else:
+                resultados.append(None)
+    finally:
+        connection.close()
+
+    return resultados
 
 
 @shared_task(queue="emails")
-def enviar_email_async(assunto, mensagem, destinatarios):
-    send_mail(
-        assunto,
-        mensagem,
-        settings.DEFAULT_FROM_EMAIL,
-        destinatarios,
-        fail_silently=False,
+def aplicar_decisao_em_lote_async(decisao_id, status, ids):
+    # Import local: decisao_utils importa as tarefas deste módulo.
+    from .utils.decisao_utils import aplicar_decisao_em_lote
+
+    return aplicar_decisao_em_lote(decisao_id, status, ids)
+
+
+@shared_task(bind=True, queue="emails")
+def informar_decisoes_em_lote(self, decisao_id, status, solicitacoes, tentativa=0):
+    # Import local para evitar import circular com email_utils.
+    from .utils.email_templates import renderizar_em_lote
+    from .utils.email_utils import contexto_decisao
+
+    template, _ = contexto_decisao(None, status)
+    renderizados = renderizar_em_lote(
+        template,
+        (contexto_decisao(nome, status)[1] for nome, _ in solicitacoes),
+    )
+    mensagens = [
+        (assunto, mensagem, [email], html)
+        for (assunto, mensagem, html), (_, email) in zip(renderizados, solicitacoes)
+    ]
+
+    resultados = entregar_mensagens(mensagens)
+    pausadas, reenviar = _separar_falhas(
+        mensagens, resultados, tentativa, self.request.delivery_info
     )
+    # As que ainda podem sair voltam numa nova tarefa, só com elas: a pausa
+    # do circuito não conta como tentativa.
+    for indices, proxima in ((pausadas, tentativa), (reenviar, tentativa + 1)):
+        if indices:
+            informar_decisoes_em_lote.apply_async(
+                (decisao_id, status, [solicitacoes[i] for i in indices]),
+                {"tentativa": proxima},
+                countdown=_espera_reenvio(tentativa, resultados[indices[0]]),
+            )
+
+    entregues = sum(erro is None for erro in resultados)
+    falhas = len(resultados) - entregues - len(pausadas) - len(reenviar)
+    DecisaoEmLote.objects.filter(pk=decisao_id).update(
+        processados=F("processados") + entregues,
+        falhas=F("falhas") + falhas,
+    )
+
+
+def _descartar_outbox(falhas):
+    """
+    Move para EmailNaoEntregue as ``(MensagemOutbox, erro)`` que não serão
+    mais tentadas, na fila e prioridade do tipo, e as tira do outbox.
+    """
+    if not falhas:
+        return
+    with transaction.atomic():
+        for m, erro in falhas:
+            rota = settings.EMAIL_ROTAS[m.tipo]
+            _registrar_nao_entregues(
+                [((m.assunto, m.mensagem, m.destinatarios, m.html), erro)],
+                m.tentativas + 1,
+                {"routing_key": rota["queue"], "priority": rota.get("priority")},
+            )
+        MensagemOutbox.objects.filter(pk__in=[m.pk for m, _ in falhas]).delete()
+
+
+@shared_task(queue="emails")
+def enviar_emails_outbox(ids):
+    # A entrega é at-least-once: a mesma mensagem pode chegar de novo se o
+    # relay cair depois de publicar. O que já foi enviado é ignorado.
+    pendentes = list(
+        MensagemOutbox.objects.filter(pk__in=ids, enviado_em__isnull=True).order_by(
+            "id"
+        )
+    )
+    resultados = entregar_mensagens(
+        [(m.assunto, m.mensagem, m.destinatarios, m.html) for m in pendentes]
+    )
+
+    agora = timezone.now()
+    enviadas, descartadas = [], []
+    for m, erro in zip(pendentes, resultados):
+        if erro is None:
+            enviadas.append(m.pk)
+            continue
+        pausa = isinstance(erro, CircuitoAberto)
+        if pausa or (
+            erro_transitorio(erro) and m.tentativas + 1 < settings.OUTBOX_MAX_TENTATIVAS
+        ):
+            # Volta para o relay depois da espera, como no enviar_email_async.
+            # Com o envio em pausa nada foi tentado, e a tentativa não conta.
+            espera = _espera_reenvio(m.tentativas, erro)
+            MensagemOutbox.objects.filter(pk=m.pk).update(
+                publicado_em=None,
+                tentativas=F("tentativas") + (0 if pausa else 1),
+                proxima_tentativa_em=agora + timedelta(seconds=espera),
+            )
+        else:
+            descartadas.append((m, erro))
+    MensagemOutbox.objects.filter(pk__in=enviadas).update(enviado_em=agora)
+    _descartar_outbox(descartadas)
+
+
+def publicar_outbox(max_lotes=None):
+    """
+    Publica as mensagens pendentes do outbox em lotes de OUTBOX_BATCH_SIZE,
+    todas pela mesma conexão com o broker. Retorna quantas foram publicadas.
+    """
+    max_lotes = max_lotes or settings.OUTBOX_MAX_LOTES
+    # Publicadas há mais de OUTBOX_REPUBLICAR_APOS segundos e não enviadas: a
+    # mensagem se perdeu no broker ou o worker caiu antes de registrar o
+    # envio. Voltam para a fila do relay, e a perda conta como tentativa; na
+    # última, vão para EmailNaoEntregue.
+    limite = timezone.now() - timedelta(seconds=settings.OUTBOX_REPUBLICAR_APOS)
+    perdidas = MensagemOutbox.objects.filter(
+        publicado_em__lt=limite, enviado_em__isnull=True
+    )
+    erro = TimeoutError(
+        f"Não enviada {settings.OUTBOX_REPUBLICAR_APOS} s depois de publicada."
+    )
+    esgotadas = perdidas.filter(tentativas__gte=settings.OUTBOX_MAX_TENTATIVAS - 1)
+    _descartar_outbox([(m, erro) for m in esgotadas])
+    perdidas.update(publicado_em=None, tentativas=F("tentativas") + 1)
+
+    publicadas = 0
+    with enviar_emails_outbox.app.producer_or_acquire() as producer:
+        for _ in range(max_lotes):
+            with transaction.atomic():
+                pendentes = list(
+                    MensagemOutbox.objects.filter(
+                        Q(proxima_tentativa_em__isnull=True)
+                        | Q(proxima_tentativa_em__lte=timezone.now()),
+                        publicado_em__isnull=True,
+                    )
+                    .select_for_update(skip_locked=True)
+                    .order_by("id")
+                    .values_list("id", "tipo")[: settings.OUTBOX_BATCH_SIZE]
+                )
+                if not pendentes:
+                    break
+                # Uma tarefa por tipo, cada uma na fila e prioridade do tipo.
+                ids_por_tipo = {}
+                for id_, tipo in pendentes:
+                    ids_por_tipo.setdefault(tipo, []).append(id_)
+                for tipo, ids in ids_por_tipo.items():
+                    enviar_emails_outbox.apply_async(
+                        (ids,), producer=producer, **settings.EMAIL_ROTAS[tipo]
+                    )
+                MensagemOutbox.objects.filter(
+                    pk__in=[id_ for id_, _ in pendentes]
+                ).update(publicado_em=timezone.now())
+            publicadas += len(pendentes)
+    return publicadas
+
+
+@shared_task(queue=settings.FILA_PRIORITARIA, priority=9)
+def relay_outbox():
+    publicadas = publicar_outbox()
+    if publicadas:
+        logger.info("Outbox: %s mensagens publicadas.", publicadas)
+
+
+@shared_task(queue="emails")
+def limpar_outbox():
+    limite = timezone.now() - timedelta(days=settings.OUTBOX_RETENCAO_DIAS)
+    removidas, _ = MensagemOutbox.objects.filter(enviado_em__lt=limite).delete()
+    return removidas
+
+
+@shared_task(queue="emails")
+def enviar_resumo_admin():
+    # Import local para evitar import circular com email_utils.
+    from .utils.email_utils import registrar_resumo_admin
+
+    # Um resumo cheio indica que ainda pode haver pendências acumuladas.
+    while registrar_resumo_admin() == settings.ADMIN_DIGEST_MAX_ITENS:
+        pass
+
+
+@shared_task(queue="emails")
+def reconciliar_contagens_status():
+    corrigidos = reconciliar_contagens()
+    if corrigidos:
+        logger.warning("%s contadores de status estavam divergentes", corrigidos)
+
+
+@shared_task(queue="emails")
+def arquivar_solicitacoes():
+    arquivadas = arquivar_decididas()
+    if arquivadas:
+        logger.info("%s solicitações decididas arquivadas", arquivadas)
+    return arquivadas
@@ -0,0 +1,43 @@
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from .models import normalizar_email
+
+
+class CriacaoThrottle(SimpleRateThrottle):
+    """
+    Limite da criação pública de solicitações. O histórico de cada chave fica
+    no cache padrão (Redis em produção) e é uma janela deslizante: só contam
+    as requisições feitas dentro do período da taxa.
+    """
+
+    setting = None
+
+    def get_rate(self):
+        return getattr(settings, self.setting)
+
+
+class CriacaoPorIPThrottle(CriacaoThrottle):
+    scope = "criacao_ip"
+    setting = "CHAT_ACCESS_REQUEST_THROTTLE_IP"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class CriacaoPorEmailThrottle(CriacaoThrottle):
+    scope = "criacao_email"
+    setting = "CHAT_ACCESS_REQUEST_THROTTLE_EMAIL"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            # Sem e-mail a requisição nem passa da validação.
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": normalizar_email(email),
+        }
@@ -1,25 +1,63 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
+    ChatAccessRequestAsyncCreateView,
+    ChatAccessRequestAsyncListView,
+    ChatAccessRequestAsyncStatusUpdateView,
+    ChatAccessRequestBulkCreateView,
     ChatAccessRequestCreateView,
+    ChatAccessRequestEstatisticasView,
+    ChatAccessRequestExportView,
     ChatAccessRequestListView,
     ChatAccessRequestStatusUpdateView,
+    DecisaoEmLoteDetailView,
 )
 
+# Servido por ASGI, o processo troca as rotas principais pelas versões async.
+if settings.CHAT_ACCESS_REQUEST_ASYNC_VIEWS:
+    CreateView = ChatAccessRequestAsyncCreateView
+    ListView = ChatAccessRequestAsyncListView
+    StatusUpdateView = ChatAccessRequestAsyncStatusUpdateView
+else:
+    CreateView = ChatAccessRequestCreateView
+    ListView = ChatAccessRequestListView
+    StatusUpdateView = ChatAccessRequestStatusUpdateView
+
 urlpatterns = [
     path(
         "chat-access-request/",
-        ChatAccessRequestCreateView.as_view(),
+        CreateView.as_view(),
         name="chat-access-request",
     ),
+    path(
+        "chat-access-request/bulk/",
+        ChatAccessRequestBulkCreateView.as_view(),
+        name="chat-access-request-bulk",
+    ),
     path(
         "chat-access-request/list/",
-        ChatAccessRequestListView.as_view(),
+        ListView.as_view(),
         name="chat-access-request-list",
     ),
+    path(
+        "chat-access-request/export/",
+        ChatAccessRequestExportView.as_view(),
+        name="chat-access-request-export",
+    ),
+    path(
+        "chat-access-request/estatisticas/",
+        ChatAccessRequestEstatisticasView.as_view(),
+        name="chat-access-request-estatisticas",
+    ),
     path(
         "chat-access-request/<int:pk>/status/",
-        ChatAccessRequestStatusUpdateView.as_view(),
+        StatusUpdateView.as_view(),
         name="chat-access-request-status",
     ),
+    path(
+        "chat-access-request/decisoes/<uuid:pk>/",
+        DecisaoEmLoteDetailView.as_view(),
+        name="chat-access-request-decisao",
+    ),
 ]
@@ -0,0 +1,119 @@
+"""
+Arquivamento das solicitações decididas.
+
+Aprovadas e recusadas criadas há mais de ARQUIVO_DIAS dias saem da tabela
+principal para ``SolicitacaoArquivada``, em lotes de ARQUIVO_LOTE linhas, cada
+um na sua transação curta: as linhas do lote ficam travadas só pelo tempo de
+copiá-las e apagá-las. O status de cada e-mail arquivado fica em
+``EmailArquivado``, onde a verificação de duplicados o encontra. Os contadores
+de ``ContagemStatus`` não mudam: as arquivadas continuam contadas.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from access.models import (
+    ChatAccessRequest,
+    EmailArquivado,
+    ItemResumoAdmin,
+    SolicitacaoArquivada,
+    normalizar_email,
+)
+
+STATUS_ARQUIVADOS = ("aprovado", "recusado")
+
+
+def _registrar_emails(solicitacoes, using):
+    # Vale a solicitação mais recente de cada e-mail, entre o lote e o que já
+    # foi arquivado antes.
+    ultimas = {}
+    for solicitacao in sorted(solicitacoes, key=lambda s: s.criado_em):
+        ultimas[normalizar_email(solicitacao.email)] = solicitacao
+    existentes = EmailArquivado.objects.using(using).in_bulk(list(ultimas))
+    emails = [
+        EmailArquivado(email=email, status=s.status, criado_em=s.criado_em)
+        for email, s in ultimas.items()
+        if email not in existentes or existentes[email].criado_em < s.criado_em
+    ]
+    EmailArquivado.objects.using(using).bulk_create(
+        emails,
+        update_conflicts=True,
+        unique_fields=["email"],
+        update_fields=["status", "criado_em"],
+    )
+
+
+def _apagar(ids, using):
+    # DELETE direto: o delete() do ORM carregaria as linhas de novo para os
+    # sinais, e o post_delete só invalidaria o cache de status, que continua
+    # certo (o status agora vem de EmailArquivado).
+    ItemResumoAdmin.objects.using(using).filter(solicitacao_id__in=ids).delete()
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    tabela = connection.ops.quote_name(ChatAccessRequest._meta.db_table)
+    marcadores = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {tabela} WHERE id IN ({marcadores})", ids)
+
+
+def arquivar_lote(status, limite, tamanho, using=None):
+    """
+    Move até ``tamanho`` solicitações com ``status`` criadas antes de
+    ``limite``, as mais antigas primeiro, numa transação. Retorna quantas.
+    """
+    with transaction.atomic(using=using):
+        solicitacoes = list(
+            ChatAccessRequest.objects.using(using)
+            .filter(status=status, criado_em__lt=limite)
+            .order_by("criado_em")
+            # Pula as que uma decisão ou edição está alterando agora.
+            .select_for_update(skip_locked=True)[:tamanho]
+        )
+        if not solicitacoes:
+            return 0
+        SolicitacaoArquivada.objects.using(using).bulk_create(
+            [
+                SolicitacaoArquivada(
+                    id=s.id,
+                    nome=s.nome,
+                    email=s.email,
+                    motivo=s.motivo,
+                    criado_em=s.criado_em,
+                    status=s.status,
+                )
+                for s in solicitacoes
+            ],
+            ignore_conflicts=True,
+        )
+        _registrar_emails(solicitacoes, using)
+        _apagar([s.id for s in solicitacoes], using)
+    return len(solicitacoes)
+
+
+def arquivar_decididas(dias=None, tamanho=None, max_lotes=None, using=None):
+    """
+    Arquiva as solicitações decididas há mais de ``dias`` dias, até
+    ``max_lotes`` lotes de ``tamanho`` linhas (padrões em settings), um lote de
+    cada status por vez. Retorna quantas foram arquivadas.
+    """
+    dias = settings.ARQUIVO_DIAS if dias is None else dias
+    tamanho = tamanho or settings.ARQUIVO_LOTE
+    max_lotes = max_lotes or settings.ARQUIVO_MAX_LOTES
+    limite = timezone.now() - timedelta(days=dias)
+
+    # Alternando, um acúmulo de aprovadas não gasta o orçamento inteiro e as
+    # recusadas também saem em toda execução.
+    arquivadas = lotes = 0
+    pendentes = list(STATUS_ARQUIVADOS)
+    while pendentes and lotes < max_lotes:
+        for status in list(pendentes):
+            if lotes == max_lotes:
+                break
+            movidas = arquivar_lote(status, limite, tamanho, using=using)
+            lotes += 1
+            arquivadas += movidas
+            if movidas < tamanho:
+                pendentes.remove(status)
+    return arquivadas
@@ -0,0 +1,102 @@
+"""
+Busca textual em nome, e-mail e motivo das solicitações.
+
+Cada backend filtra o queryset pelas palavras da busca (todas, por prefixo) e
+anota a ``relevancia`` de cada linha, maior para as mais relevantes. O backend
+vem de CHAT_ACCESS_REQUEST_BUSCA ou, sem ela, do banco em uso:
+
+- ``postgresql``: ``tsvector`` com índice GIN sobre a expressão (migração
+  0011), ordenado por ``ts_rank``;
+- ``sqlite``: tabela FTS5 mantida por triggers (migração 0011), ordenada por
+  ``bm25``;
+- ``icontains``: sem índice, como o SearchFilter do DRF.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABELA_FTS = "access_busca"
+
+# Mesmo texto do índice da migração 0011: o PostgreSQL só usa um índice de
+# expressão quando a consulta repete a expressão. O e-mail é quebrado nas
+# partes, para "example" achar "joao@example.com".
+VETOR_POSTGRES = (
+    "to_tsvector('simple'::regconfig, nome || ' ' || "
+    "translate(email, '@.-_+', '     ') || ' ' || motivo)"
+)
+
+
+EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def extrair_palavras(texto):
+    return re.findall(r"[^\W_]+", texto)
+
+
+def _buscar_postgres(queryset, palavras):
+    consulta = " & ".join(f"{palavra}:*" for palavra in palavras)
+    tsquery = "to_tsquery('simple'::regconfig, %s)"
+    return queryset.filter(
+        RawSQL(f"{VETOR_POSTGRES} @@ {tsquery}", [consulta], BooleanField())
+    ).annotate(
+        # Em double precision, para a posição do cursor voltar igual do JSON.
+        relevancia=RawSQL(
+            f"ts_rank({VETOR_POSTGRES}, {tsquery})::double precision",
+            [consulta],
+            FloatField(),
+        )
+    )
+
+
+def _buscar_sqlite(queryset, palavras):
+    # Entre aspas, cada palavra é um termo mesmo que seja AND, OR ou NOT.
+    consulta = " ".join(f'"{palavra}"*' for palavra in palavras)
+    return (
+        queryset.filter(
+            # INNER JOIN com a tabela FTS5, que dirige a consulta.
+            busca_fts__isnull=False
+        )
+        .filter(RawSQL(f"{TABELA_FTS} MATCH %s", [consulta], BooleanField()))
+        .annotate(
+            # O rank (bm25) é menor para os mais relevantes.
+            relevancia=-F("busca_fts__rank")
+        )
+    )
+
+
+def _buscar_icontains(queryset, palavras):
+    for palavra in palavras:
+        queryset = queryset.filter(
+            Q(nome__icontains=palavra)
+            | Q(email__icontains=palavra)
+            | Q(motivo__icontains=palavra)
+        )
+    return queryset.annotate(relevancia=Value(0.0, FloatField()))
+
+
+BACKENDS = {
+    "postgresql": _buscar_postgres,
+    "sqlite": _buscar_sqlite,
+    "icontains": _buscar_icontains,
+}
+
+
+def buscar(queryset, texto):
+    """
+    Solicitações do queryset que têm todas as palavras de ``texto`` (ou, se
+    ele for um e-mail completo, as desse e-mail), com a anotação
+    ``relevancia``. Sem palavras na busca, não devolve nenhuma.
+    """
+    if EMAIL.fullmatch(texto.strip()):
+        # E-mail completo: o índice de Lower(email) responde sem a busca
+        # textual, que teria de cruzar as listas de "example", "com" etc.
+        return queryset.por_email(texto).annotate(relevancia=Value(1.0, FloatField()))
+    termos = extrair_palavras(texto)
+    if not termos:
+        return queryset.annotate(relevancia=Value(0.0, FloatField())).none()
+    backend = settings.CHAT_ACCESS_REQUEST_BUSCA or connections[queryset.db].vendor
+    return BACKENDS.get(backend, _buscar_icontains)(queryset, termos)
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from access.models import ChatAccessRequest, EmailArquivado, normalizar_email
+
+
+def _chave(email):
+    return f"access:status-email:{normalizar_email(email)}"
+
+
+def _status_arquivado(email):
+    # Só consultado quando o e-mail não tem solicitação na tabela principal:
+    # as arquivadas são decididas e mais antigas que ARQUIVO_DIAS dias, e uma
+    # solicitação que ainda está na tabela vale sobre elas.
+    return EmailArquivado.objects.filter(email=normalizar_email(email)).values_list(
+        "status", flat=True
+    )
+
+
+def status_do_email(email):
+    """
+    Último status das solicitações do e-mail, lido do cache e, na falta dele,
+    do banco. E-mails sem solicitação não vão para o cache: a criação que vem
+    em seguida poderia ser confirmada antes do valor ser gravado.
+    """
+    chave = _chave(email)
+    status = cache.get(chave)
+    if status is None:
+        status = (
+            ChatAccessRequest.objects.por_email(email)
+            .order_by("-criado_em")
+            .values_list("status", flat=True)
+            .first()
+        ) or _status_arquivado(email).first()
+        if status is not None:
+            # add não sobrescreve um valor gravado por quem acabou de salvar.
+            cache.add(chave, status, settings.STATUS_EMAIL_CACHE_TIMEOUT)
+    return status
+
+
+async def astatus_do_email(email):
+    """Versão assíncrona de ``status_do_email``, para as views ASGI."""
+    chave = _chave(email)
+    status = await cache.aget(chave)
+    if status is None:
+        status = (
+            await (
+                ChatAccessRequest.objects.por_email(email)
+                .order_by("-criado_em")
+                .values_list("status", flat=True)
+                .afirst()
+            )
+            or await _status_arquivado(email).afirst()
+        )
+        if status is not None:
+            await cache.aadd(chave, status, settings.STATUS_EMAIL_CACHE_TIMEOUT)
+    return status
+
+
+def registrar_status_criados(solicitacoes, using=None):
+    """Grava no cache, após o commit, o status das solicitações recém-criadas."""
+    valores = {_chave(s.email): s.status for s in solicitacoes}
+    if valores:
+        transaction.on_commit(
+            lambda: cache.set_many(valores, settings.STATUS_EMAIL_CACHE_TIMEOUT),
+            using=using,
+        )
+
+
+def invalidar_status(emails, using=None):
+    """Remove do cache, após o commit, o status dos e-mails alterados."""
+    chaves = {_chave(email) for email in emails}
+    if chaves:
+        transaction.on_commit(lambda: cache.delete_many(chaves), using=using)
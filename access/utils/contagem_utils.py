@@ -0,0 +1,116 @@
+from collections import Counter
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from access.models import ChatAccessRequest, ContagemStatus, SolicitacaoArquivada
+
+
+def ajustar_contagens(deltas, using=None):
+    """
+    Soma ``deltas`` (``{(dia, status): n}``) aos contadores depois do commit.
+    Fora da transação que criou ou decidiu as solicitações, a linha do dia só
+    fica travada durante o próprio UPSERT. Uma perda entre o commit e o ajuste
+    é corrigida por ``reconciliar_contagens``.
+    """
+    deltas = {chave: n for chave, n in deltas.items() if n}
+    if deltas:
+        transaction.on_commit(partial(_aplicar, deltas, using), using=using)
+
+
+def _aplicar(deltas, using):
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    quote = connection.ops.quote_name
+    tabela = quote(ContagemStatus._meta.db_table)
+    sql = (
+        f"INSERT INTO {tabela} ({quote('dia')}, {quote('status')}, {quote('total')}) "
+        f"VALUES (%s, %s, %s) "
+        f"ON CONFLICT ({quote('dia')}, {quote('status')}) "
+        f"DO UPDATE SET {quote('total')} = {tabela}.{quote('total')} + "
+        f"EXCLUDED.{quote('total')}"
+    )
+    # Ordem fixa: dois ajustes concorrentes travam as linhas na mesma ordem.
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.executemany(
+            sql,
+            [
+                (connection.ops.adapt_datefield_value(dia), status, n)
+                for (dia, status), n in sorted(deltas.items())
+            ],
+        )
+
+
+def registrar_contagens_criadas(solicitacoes, using=None):
+    ajustar_contagens(
+        Counter((timezone.localdate(s.criado_em), s.status) for s in solicitacoes),
+        using=using,
+    )
+
+
+def registrar_transicao(solicitacao, using=None):
+    """Move a solicitação decidida do contador do status anterior para o novo."""
+    dia = timezone.localdate(solicitacao.criado_em)
+    ajustar_contagens(
+        {(dia, solicitacao.status_anterior): -1, (dia, solicitacao.status): 1},
+        using=using,
+    )
+
+
+def _por_dia_e_status(queryset):
+    return (
+        queryset.order_by()
+        .annotate(dia=TruncDate("criado_em"))
+        .values_list("dia", "status")
+        .annotate(total=Count("id"))
+    )
+
+
+def contagens_por_dia_e_status(queryset, *outros):
+    """
+    ``{(dia, status): total}`` calculado direto das solicitações. Com
+    ``outros`` querysets, soma todos numa única consulta (UNION ALL), lida
+    num só instantâneo do banco.
+    """
+    linhas = _por_dia_e_status(queryset)
+    if outros:
+        linhas = linhas.union(*map(_por_dia_e_status, outros), all=True)
+    contagens = Counter()
+    for dia, status, total in linhas:
+        contagens[(dia, status)] += total
+    return contagens
+
+
+def reconciliar_contagens(using=None):
+    """
+    Recalcula os contadores com um GROUP BY nas solicitações, inclusive as
+    arquivadas, e corrige os que divergem. Retorna quantos foram corrigidos.
+
+    Nada fica travado durante o GROUP BY: a diferença é somada aos
+    contadores pelo mesmo UPSERT de ``ajustar_contagens``, sem sobrescrever
+    os ajustes feitos enquanto isso. Uma criação ou decisão que termina no
+    meio da consulta ainda pode gerar uma diferença, desfeita na próxima
+    execução.
+    """
+    # As arquivadas continuam contadas (access/utils/arquivo_utils.py). Numa
+    # só consulta, uma solicitação arquivada no meio não conta duas vezes.
+    esperados = contagens_por_dia_e_status(
+        ChatAccessRequest.objects.using(using),
+        SolicitacaoArquivada.objects.using(using),
+    )
+    atuais = {
+        (dia, status): total
+        for dia, status, total in ContagemStatus.objects.using(using).values_list(
+            "dia", "status", "total"
+        )
+    }
+    deltas = {
+        chave: esperados.get(chave, 0) - atuais.get(chave, 0)
+        for chave in atuais.keys() | esperados.keys()
+    }
+    deltas = {chave: n for chave, n in deltas.items() if n}
+    if deltas:
+        _aplicar(deltas, using)
+    return len(deltas)
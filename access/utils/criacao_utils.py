@@ -0,0 +1,51 @@
+from django.db import transaction
+
+from access.models import ChatAccessRequest, normalizar_email
+from access.serializers import ChatAccessRequestSerializer
+from access.utils.cache_utils import registrar_status_criados
+from access.utils.contagem_utils import registrar_contagens_criadas
+from access.utils.email_utils import registrar_emails_criacao
+
+
+def criar_em_lote(itens):
+    """
+    Valida e cria uma lista de solicitações. A checagem de e-mail duplicado é
+    feita com uma única consulta para o lote inteiro. Retorna as solicitações
+    criadas e os erros de cada linha recusada, indexados pela posição.
+    """
+    emails = [
+        item["email"]
+        for item in itens
+        if isinstance(item, dict) and isinstance(item.get("email"), str)
+    ]
+    contexto = {
+        "status_por_email": ChatAccessRequest.objects.ultimo_status_por_email(emails)
+    }
+
+    validas = []
+    erros = []
+    vistos = set()
+    for indice, item in enumerate(itens):
+        serializer = ChatAccessRequestSerializer(data=item, context=contexto)
+        if not serializer.is_valid():
+            erros.append({"indice": indice, "erros": serializer.errors})
+            continue
+        email = normalizar_email(serializer.validated_data["email"])
+        if email in vistos:
+            erros.append(
+                {"indice": indice, "erros": {"email": ["E-mail repetido no lote."]}}
+            )
+            continue
+        vistos.add(email)
+        validas.append(ChatAccessRequest(**serializer.validated_data))
+
+    with transaction.atomic():
+        # bulk_create não dispara post_save: os e-mails do lote vão para o
+        # outbox na mesma transação; cache de status e contadores são
+        # atualizados aqui.
+        criadas = ChatAccessRequest.objects.bulk_create(validas)
+        registrar_emails_criacao(criadas)
+        registrar_status_criados(criadas)
+        registrar_contagens_criadas(criadas)
+
+    return criadas, erros
@@ -0,0 +1,172 @@
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models import F
+
+from access.models import (
+    ChatAccessRequest,
+    DecisaoEmLote,
+    origens_permitidas,
+    suporta_update_returning,
+)
+from access.tasks import aplicar_decisao_em_lote_async, informar_decisoes_em_lote
+from access.utils.cache_utils import invalidar_status
+from access.utils.contagem_utils import (
+    ajustar_contagens,
+    contagens_por_dia_e_status,
+    registrar_transicao,
+)
+from access.utils.email_utils import informar_decisao
+
+
+def _update_returning(queryset, status, chunk_size):
+    connection = connections[queryset.db]
+    try:
+        subquery, params = queryset.order_by().values("pk").query.sql_with_params()
+    except EmptyResultSet:
+        # Nenhuma linha pode mudar (ex.: pk__in=[]).
+        return
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(ChatAccessRequest._meta.db_table)} "
+        f"SET {quote('status')} = %s "
+        f"WHERE {quote('id')} IN ({subquery}) "
+        f"RETURNING {quote('nome')}, {quote('email')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [status, *params])
+        while linhas := cursor.fetchmany(chunk_size):
+            yield linhas
+
+
+def _update_por_chunks(queryset, status, chunk_size):
+    linhas = queryset.values_list("id", "nome", "email").iterator(chunk_size=chunk_size)
+    chunk = []
+    for linha in linhas:
+        chunk.append(linha)
+        if len(chunk) == chunk_size:
+            yield _aplicar_chunk(queryset, status, chunk)
+            chunk = []
+    if chunk:
+        yield _aplicar_chunk(queryset, status, chunk)
+
+
+def _aplicar_chunk(queryset, status, chunk):
+    ChatAccessRequest.objects.using(queryset.db).filter(
+        pk__in=[id_ for id_, _, _ in chunk]
+    ).update(status=status)
+    return [(nome, email) for _, nome, email in chunk]
+
+
+def alterar_status_retornando(queryset, status, chunk_size):
+    """
+    Altera o status das solicitações do queryset que podem ir para ele
+    (``TRANSICOES_STATUS``) e devolve, em chunks, ``(nome, email)`` de cada
+    linha alterada.
+    """
+    queryset = queryset.filter(status__in=origens_permitidas(status))
+    if suporta_update_returning(connections[queryset.db]):
+        return _update_returning(queryset, status, chunk_size)
+    return _update_por_chunks(queryset, status, chunk_size)
+
+
+def decidir(pk, status, using=None):
+    """
+    Decisão individual: aplica a transição com um UPDATE condicional e, só
+    quando a linha mudou, avisa o solicitante após o commit. Duas decisões
+    concorrentes não notificam duas vezes. Retorna a solicitação alterada ou
+    None.
+    """
+    solicitacao = ChatAccessRequest.objects.db_manager(using).transicionar(pk, status)
+    if solicitacao is not None:
+        # O UPDATE não dispara post_save.
+        invalidar_status([solicitacao.email], using=using)
+        registrar_transicao(solicitacao, using=using)
+        transaction.on_commit(partial(informar_decisao, solicitacao), using=using)
+    return solicitacao
+
+
+def decidir_em_lote(queryset, status):
+    """
+    Decisão em massa (admin): só lê os ids das solicitações que podem ir para
+    ``status`` (``TRANSICOES_STATUS``) e os enfileira em tarefas de até DECISAO_LOTE_CHUNK_SIZE ids. O UPDATE, os
+    contadores e os e-mails ficam com o worker (``aplicar_decisao_em_lote``);
+    o andamento fica em ``DecisaoEmLote``.
+    """
+    chunk_size = settings.DECISAO_LOTE_CHUNK_SIZE
+    decisao = DecisaoEmLote.objects.create(status=status)
+
+    def enfileirar(ids):
+        # Fora de uma transação roda na hora: cada chunk sai assim que é lido.
+        transaction.on_commit(
+            partial(aplicar_decisao_em_lote_async.delay, str(decisao.pk), status, ids),
+            using=queryset.db,
+        )
+
+    total = 0
+    ids = []
+    linhas = (
+        queryset.filter(status__in=origens_permitidas(status))
+        .order_by()
+        .values_list("pk", flat=True)
+    )
+    for pk in linhas.iterator(chunk_size=chunk_size):
+        ids.append(pk)
+        if len(ids) == chunk_size:
+            enfileirar(ids)
+            total += len(ids)
+            ids = []
+    if ids:
+        enfileirar(ids)
+        total += len(ids)
+    DecisaoEmLote.objects.filter(pk=decisao.pk).update(total=total)
+
+    decisao.total = total
+    return decisao
+
+
+def aplicar_decisao_em_lote(decisao_id, status, ids):
+    """
+    Parte do worker na decisão em massa: altera as solicitações ``ids`` que
+    ainda podem ir para ``status`` e, após o commit, avisa os solicitantes. As
+    que outra decisão alterou nesse meio tempo contam como ignoradas: não
+    mudam de novo nem recebem um segundo e-mail.
+    """
+    alteradas = []
+    with transaction.atomic():
+        # Trava as linhas que ainda podem mudar: uma decisão concorrente
+        # espera, e os contadores contados abaixo batem com o UPDATE.
+        travadas = list(
+            ChatAccessRequest.objects.filter(
+                pk__in=ids, status__in=origens_permitidas(status)
+            )
+            .select_for_update()
+            .values_list("pk", flat=True)
+        )
+        queryset = ChatAccessRequest.objects.filter(pk__in=travadas)
+        # O RETURNING não traz o status anterior: o que sai de cada contador é
+        # contado antes do UPDATE.
+        deltas = Counter()
+        for (dia, origem), n in contagens_por_dia_e_status(queryset).items():
+            deltas[dia, origem] -= n
+            deltas[dia, status] += n
+        ajustar_contagens(deltas, using=queryset.db)
+        for chunk in alterar_status_retornando(queryset, status, len(ids)):
+            alteradas.extend(list(linha) for linha in chunk)
+        # O UPDATE não dispara post_save.
+        invalidar_status((email for _, email in alteradas), using=queryset.db)
+        if alteradas:
+            # Só publica depois do commit, para o worker não notificar
+            # alterações que ainda podem ser desfeitas.
+            transaction.on_commit(
+                partial(informar_decisoes_em_lote.delay, decisao_id, status, alteradas),
+                using=queryset.db,
+            )
+    if len(alteradas) < len(ids):
+        DecisaoEmLote.objects.filter(pk=decisao_id).update(
+            ignoradas=F("ignoradas") + len(ids) - len(alteradas)
+        )
+    return len(alteradas)
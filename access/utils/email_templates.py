@@ -0,0 +1,102 @@
+from functools import lru_cache
+from pathlib import Path
+from string import Formatter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.html import escape
+
+DIRETORIO = Path(__file__).resolve().parent.parent / "email_templates"
+
+ASSUNTOS = {
+    "nova_solicitacao_admin": "Nova solicitação de acesso ao chat",
+    "confirmacao_solicitante": "Recebemos sua solicitação de acesso ao chat",
+    "decisao_aprovado": "Sua solicitação foi aprovada!",
+    "decisao_recusado": "Sua solicitação foi recusada",
+}
+
+# Settings lidos uma vez e gravados no próprio template ao carregá-lo.
+SETTINGS_ESTATICOS = {
+    "admin_base_url": "ADMIN_BASE_URL",
+    "chat_base_url": "CHAT_BASE_URL",
+}
+
+
+def _escapar(texto):
+    return texto.replace("{", "{{").replace("}", "}}")
+
+
+def _compilar(fonte, estaticos):
+    """
+    Grava os valores estáticos no template e devolve um format string só com
+    os campos dinâmicos, pronto para o ``format_map`` de cada renderização.
+    """
+    partes = []
+    for literal, campo, especificacao, conversao in Formatter().parse(fonte):
+        partes.append(_escapar(literal))
+        if campo is None:
+            continue
+        if campo in estaticos:
+            partes.append(_escapar(estaticos[campo]))
+            continue
+        partes.append("{" + campo)
+        if conversao:
+            partes.append("!" + conversao)
+        if especificacao:
+            partes.append(":" + especificacao)
+        partes.append("}")
+    return "".join(partes)
+
+
+class TemplateEmail:
+    def __init__(self, assunto, texto, html):
+        self.assunto = assunto
+        self.texto = texto
+        self.html = html
+
+    def renderizar(self, contexto):
+        contexto_html = {chave: escape(valor) for chave, valor in contexto.items()}
+        return (
+            self.assunto,
+            self.texto.format_map(contexto),
+            self.html.format_map(contexto_html),
+        )
+
+
+def _ler(nome, extensao):
+    # A quebra de linha no fim do arquivo não faz parte da mensagem.
+    return (DIRETORIO / f"{nome}.{extensao}").read_text(encoding="utf-8").rstrip("\n")
+
+
+@lru_cache(maxsize=None)
+def registro():
+    """Carrega e compila todos os templates de e-mail uma vez por processo."""
+    estaticos = {
+        campo: getattr(settings, nome) for campo, nome in SETTINGS_ESTATICOS.items()
+    }
+    return {
+        nome: TemplateEmail(
+            assunto,
+            _compilar(_ler(nome, "txt"), estaticos),
+            _compilar(_ler(nome, "html"), estaticos),
+        )
+        for nome, assunto in ASSUNTOS.items()
+    }
+
+
+def renderizar(nome, /, **contexto):
+    """Retorna ``(assunto, texto, html)`` do template ``nome``."""
+    return registro()[nome].renderizar(contexto)
+
+
+def renderizar_em_lote(nome, contextos):
+    template = registro()[nome]
+    for contexto in contextos:
+        yield template.renderizar(contexto)
+
+
+@receiver(setting_changed)
+def _limpar_registro(setting, **kwargs):
+    if setting in SETTINGS_ESTATICOS.values():
+        registro.cache_clear()
@@ -1,47 +1,176 @@
+from datetime import timedelta
+
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
+from access.models import EmailNaoEntregue, ItemResumoAdmin, MensagemOutbox
 from access.tasks import enviar_email_async
+from access.utils.email_templates import renderizar
 
 
-def notificar_admin(nova_requisicao):
-    assunto = "Nova solicitação de acesso ao chat"
-    mensagem = (
-        f"Nova solicitação de acesso ao chat recebida:\n\n"
-        f"Nome: {nova_requisicao.nome}\n"
-        f"Email: {nova_requisicao.email}\n"
-        f"Motivo: {nova_requisicao.motivo}\n\n"
-        f"Acesse o admin para aprovar ou recusar: {settings.ADMIN_BASE_URL}/access/chataccessrequest/{nova_requisicao.id}/change/"
+def _enfileirar_email(assunto, mensagem, destinatarios, tipo, html=None):
+    enviar_email_async.apply_async(
+        (assunto, mensagem, destinatarios), {"html": html}, **settings.EMAIL_ROTAS[tipo]
     )
-    enviar_email_async.delay(assunto, mensagem, [settings.DEFAULT_FROM_EMAIL])
 
 
-def confirmar_solicitante(nova_requisicao):
-    assunto = "Recebemos sua solicitação de acesso ao chat"
-    mensagem = (
-        f"Olá {nova_requisicao.nome},\n\n"
-        "Recebemos sua solicitação de acesso ao chat e ela será analisada em breve.\n\n"
-        "Você receberá uma resposta por e-mail após a aprovação ou recusa.\n\n"
-        "Atenciosamente,\nEquipe"
+def _link_admin(requisicao_id):
+    return f"{settings.ADMIN_BASE_URL}/access/chataccessrequest/{requisicao_id}/change/"
+
+
+def montar_email_admin(nova_requisicao):
+    return renderizar(
+        "nova_solicitacao_admin",
+        nome=nova_requisicao.nome,
+        email=nova_requisicao.email,
+        motivo=nova_requisicao.motivo,
+        id=nova_requisicao.id,
     )
-    enviar_email_async.delay(assunto, mensagem, [nova_requisicao.email])
 
 
-def informar_decisao(solicitacao, motivo_recusa=None):
-    if solicitacao.status == "aprovado":
-        assunto = "Sua solicitação foi aprovada!"
-        mensagem = (
-            f"Olá {solicitacao.nome},\n\n"
-            "Sua solicitação de acesso ao chat foi aprovada!\n\n"
-            f"Acesse agora: {settings.CHAT_BASE_URL}\n\n"
-            "Atenciosamente,\nEquipe"
+def montar_email_confirmacao(nova_requisicao):
+    return renderizar("confirmacao_solicitante", nome=nova_requisicao.nome)
+
+
+def registrar_emails_criacao(novas_requisicoes):
+    """
+    Grava no outbox os e-mails de uma ou mais solicitações recém-criadas. Deve
+    rodar na mesma transação da criação: o relay só publica o que foi
+    commitado, e nada é enviado se a transação for desfeita.
+    """
+    mensagens = []
+    for requisicao in novas_requisicoes:
+        if not settings.ADMIN_DIGEST_ENABLED:
+            assunto, mensagem, html = montar_email_admin(requisicao)
+            mensagens.append(
+                MensagemOutbox(
+                    chave=f"criacao-admin-{requisicao.pk}",
+                    assunto=assunto,
+                    mensagem=mensagem,
+                    html=html,
+                    destinatarios=[settings.DEFAULT_FROM_EMAIL],
+                    tipo="admin",
+                )
+            )
+        assunto, mensagem, html = montar_email_confirmacao(requisicao)
+        mensagens.append(
+            MensagemOutbox(
+                chave=f"criacao-confirmacao-{requisicao.pk}",
+                assunto=assunto,
+                mensagem=mensagem,
+                html=html,
+                destinatarios=[requisicao.email],
+                tipo="confirmacao",
+            )
+        )
+    MensagemOutbox.objects.bulk_create(mensagens, ignore_conflicts=True)
+
+    if settings.ADMIN_DIGEST_ENABLED:
+        # O admin recebe essas solicitações no próximo resumo.
+        ItemResumoAdmin.objects.bulk_create(
+            [
+                ItemResumoAdmin(solicitacao=requisicao)
+                for requisicao in novas_requisicoes
+            ]
+        )
+
+
+def montar_email_resumo(solicitacoes):
+    assunto = f"Resumo: {len(solicitacoes)} novas solicitações de acesso ao chat"
+    linhas = ["Novas solicitações de acesso ao chat recebidas:\n"]
+    for requisicao in solicitacoes:
+        motivo = requisicao.motivo
+        if len(motivo) > 200:
+            motivo = motivo[:200] + "..."
+        linhas.append(
+            f"- {requisicao.nome} <{requisicao.email}>\n"
+            f"  Motivo: {motivo}\n"
+            f"  Aprovar ou recusar: {_link_admin(requisicao.id)}\n"
+        )
+    linhas.append(
+        "Todas as pendentes: "
+        f"{settings.ADMIN_BASE_URL}/access/chataccessrequest/?status__exact=pendente"
+    )
+    return assunto, "\n".join(linhas)
+
+
+def registrar_resumo_admin():
+    """
+    Grava no outbox um resumo com as solicitações ainda não informadas ao
+    admin, se a mais antiga já esperou ADMIN_DIGEST_INTERVAL segundos ou se
+    há ADMIN_DIGEST_MAX_ITENS pendentes. Retorna quantas entraram no resumo.
+    """
+    with transaction.atomic():
+        itens = list(
+            ItemResumoAdmin.objects.select_related("solicitacao")
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("id")[: settings.ADMIN_DIGEST_MAX_ITENS]
         )
-    else:
-        assunto = "Sua solicitação foi recusada"
-        mensagem = (
-            f"Olá {solicitacao.nome},\n\n"
-            "Infelizmente sua solicitação de acesso ao chat foi recusada.\n"
-            f'Motivo: {motivo_recusa or "Não especificado"}\n\n'
-            "Atenciosamente,\nEquipe"
+        if not itens:
+            return 0
+        janela = timezone.now() - timedelta(seconds=settings.ADMIN_DIGEST_INTERVAL)
+        if len(itens) < settings.ADMIN_DIGEST_MAX_ITENS and itens[0].criado_em > janela:
+            return 0
+
+        assunto, mensagem = montar_email_resumo([item.solicitacao for item in itens])
+        MensagemOutbox.objects.create(
+            chave=f"resumo-admin-{itens[0].pk}-{itens[-1].pk}",
+            assunto=assunto,
+            mensagem=mensagem,
+            destinatarios=[settings.DEFAULT_FROM_EMAIL],
+            tipo="resumo",
         )
+        ItemResumoAdmin.objects.filter(pk__in=[item.pk for item in itens]).delete()
+    return len(itens)
+
+
+def contexto_decisao(nome, status, motivo_recusa=None):
+    if status == "aprovado":
+        return "decisao_aprovado", {"nome": nome}
+    return "decisao_recusado", {
+        "nome": nome,
+        "motivo_recusa": motivo_recusa or "Não especificado",
+    }
+
+
+def montar_email_decisao(nome, status, motivo_recusa=None):
+    template, contexto = contexto_decisao(nome, status, motivo_recusa)
+    return renderizar(template, **contexto)
 
-    enviar_email_async.delay(assunto, mensagem, [solicitacao.email])
+
+def informar_decisao(solicitacao, motivo_recusa=None):
+    assunto, mensagem, html = montar_email_decisao(
+        solicitacao.nome, solicitacao.status, motivo_recusa
+    )
+    _enfileirar_email(assunto, mensagem, [solicitacao.email], "decisao", html=html)
+
+
+def reenviar_nao_entregues(ids=None):
+    """
+    Publica de novo os e-mails da fila de mensagens mortas, cada um na fila e
+    prioridade de origem, e os marca como reenviados. Uma nova falha gera um
+    novo registro. Retorna quantos foram reenviados.
+    """
+    with transaction.atomic():
+        pendentes = EmailNaoEntregue.objects.filter(
+            reenviado_em__isnull=True
+        ).select_for_update(skip_locked=True)
+        if ids is not None:
+            pendentes = pendentes.filter(pk__in=ids)
+        pendentes = list(pendentes.order_by("id"))
+        with enviar_email_async.app.producer_or_acquire() as producer:
+            for email in pendentes:
+                rota = {"queue": email.fila} if email.fila else {}
+                if email.prioridade is not None:
+                    rota["priority"] = email.prioridade
+                enviar_email_async.apply_async(
+                    (email.assunto, email.mensagem, email.destinatarios),
+                    {"html": email.html},
+                    producer=producer,
+                    **rota,
+                )
+        EmailNaoEntregue.objects.filter(pk__in=[e.pk for e in pendentes]).update(
+            reenviado_em=timezone.now()
+        )
+    return len(pendentes)
@@ -0,0 +1,45 @@
+import csv
+
+import orjson
+
+# Quantas linhas vão em cada pedaço enviado ao cliente.
+LINHAS_POR_PEDACO = 500
+
+
+class _Eco:
+    def write(self, value):
+        return value
+
+
+def _em_pedacos(linhas, vazio=""):
+    pedaco = []
+    for linha in linhas:
+        pedaco.append(linha)
+        if len(pedaco) == LINHAS_POR_PEDACO:
+            yield vazio.join(pedaco)
+            pedaco = []
+    if pedaco:
+        yield vazio.join(pedaco)
+
+
+# As linhas já chegam com os valores representados como no serializer.
+
+
+def gerar_ndjson(campos, linhas):
+    return _em_pedacos(
+        (orjson.dumps(dict(zip(campos, linha))) + b"\n" for linha in linhas), b""
+    )
+
+
+def gerar_csv(campos, linhas):
+    writer = csv.writer(_Eco())
+    cabecalho = writer.writerow(campos)
+    corpo = (writer.writerow(linha) for linha in linhas)
+    yield cabecalho
+    yield from _em_pedacos(corpo)
+
+
+FORMATOS = {
+    "ndjson": (gerar_ndjson, "application/x-ndjson"),
+    "csv": (gerar_csv, "text/csv; charset=utf-8"),
+}
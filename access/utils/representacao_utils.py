@@ -0,0 +1,80 @@
+import copy
+from functools import lru_cache
+
+from rest_framework import serializers
+
+# Campos cuja representação é o próprio valor lido do banco.
+_REPRESENTACAO_DIRETA = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+@lru_cache(maxsize=None)
+def _campos_serializer(serializer_class):
+    return tuple(serializer_class().fields.items())
+
+
+def _conversor(campo):
+    if isinstance(campo, _REPRESENTACAO_DIRETA):
+        return None
+    if isinstance(campo, serializers.DateTimeField) and not hasattr(campo, "timezone"):
+        # O fuso atual é resolvido uma vez por página, não a cada linha.
+        campo = copy.copy(campo)
+        campo.timezone = campo.default_timezone()
+    return campo.to_representation
+
+
+def _campos(serializer_class):
+    """
+    ``(nome, fonte, conversor)`` de cada campo do serializer. O conversor é o
+    ``to_representation`` do próprio campo, e só existe quando ele muda o valor
+    (datas, por exemplo).
+    """
+    return [
+        (nome, campo.source, _conversor(campo))
+        for nome, campo in _campos_serializer(serializer_class)
+    ]
+
+
+def fontes(serializer_class):
+    """Campos a pedir em ``.values()``/``.values_list()`` para o serializer."""
+    return [campo.source for _, campo in _campos_serializer(serializer_class)]
+
+
+def representar_valores(serializer_class, linhas):
+    """
+    Caminho rápido, só de leitura: monta a saída de ``serializer_class`` a
+    partir dos dicts de ``.values(*fontes(serializer_class))``, sem instanciar
+    models nem percorrer os campos do serializer a cada linha.
+    """
+    campos = _campos(serializer_class)
+    return [
+        {
+            nome: (
+                conversor(linha[fonte])
+                if conversor is not None and linha[fonte] is not None
+                else linha[fonte]
+            )
+            for nome, fonte, conversor in campos
+        }
+        for linha in linhas
+    ]
+
+
+def representar_tuplas(serializer_class, linhas):
+    """Como ``representar_valores``, para as tuplas de ``.values_list()``."""
+    conversores = [
+        (indice, conversor)
+        for indice, (_, _, conversor) in enumerate(_campos(serializer_class))
+        if conversor is not None
+    ]
+    for linha in linhas:
+        if conversores:
+            linha = list(linha)
+            for indice, conversor in conversores:
+                if linha[indice] is not None:
+                    linha[indice] = conversor(linha[indice])
+        yield linha
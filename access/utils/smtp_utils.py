@@ -0,0 +1,76 @@
+import logging
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_CHAVE_ABERTO = "smtp:circuito:aberto_ate"
+_CHAVE_FALHAS = "smtp:circuito:falhas"
+
+
+class CircuitoAberto(Exception):
+    """Envio em pausa: o provedor SMTP falhou seguidamente há pouco."""
+
+    def __init__(self, restante):
+        super().__init__(f"Envio de e-mails pausado por mais {restante:.0f} s.")
+        self.restante = restante
+
+
+def erro_transitorio(exc):
+    """Se vale a pena tentar de novo: respostas 4xx, conexão caída ou pausa."""
+    if isinstance(exc, CircuitoAberto):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= codigo < 500 for codigo, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    # smtplib.SMTPException também é um OSError; os demais são de rede.
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+def _falha_do_provedor(exc):
+    # Só o que indica o servidor fora do ar conta para o circuito; um
+    # destinatário recusado não.
+    if isinstance(exc, (smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected)):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code == 421
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+def verificar_circuito():
+    """Levanta ``CircuitoAberto`` enquanto o envio estiver em pausa."""
+    aberto_ate = cache.get(_CHAVE_ABERTO)
+    if aberto_ate is not None:
+        restante = aberto_ate - time.time()
+        if restante > 0:
+            raise CircuitoAberto(restante)
+
+
+def registrar_falha(exc):
+    """
+    Conta as falhas do provedor numa janela de SMTP_CIRCUITO_JANELA segundos.
+    Ao chegar a SMTP_CIRCUITO_FALHAS, pausa o envio de todos os workers por
+    SMTP_CIRCUITO_PAUSA segundos; depois disso as tentativas voltam a passar.
+    """
+    if not _falha_do_provedor(exc):
+        return
+    cache.add(_CHAVE_FALHAS, 0, settings.SMTP_CIRCUITO_JANELA)
+    try:
+        falhas = cache.incr(_CHAVE_FALHAS)
+    except ValueError:
+        # A janela expirou entre o add e o incr.
+        falhas = 1
+        cache.set(_CHAVE_FALHAS, falhas, settings.SMTP_CIRCUITO_JANELA)
+    if falhas >= settings.SMTP_CIRCUITO_FALHAS:
+        pausa = settings.SMTP_CIRCUITO_PAUSA
+        cache.set(_CHAVE_ABERTO, time.time() + pausa, pausa)
+        cache.delete(_CHAVE_FALHAS)
+        logger.warning(
+            "SMTP: %s falhas seguidas, envio pausado por %s s.", falhas, pausa
+        )
@@ -1,50 +1,342 @@
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from datetime import datetime, time, timedelta
+
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import filters
-from rest_framework.generics import CreateAPIView, ListAPIView, UpdateAPIView
-from rest_framework.permissions import IsAdminUser
+from rest_framework import status as http_status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import (
+    CreateAPIView,
+    GenericAPIView,
+    ListAPIView,
+    RetrieveAPIView,
+    UpdateAPIView,
+)
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .filters import BuscaTextualFilter
+from .models import (
+    STATUS_CHOICES,
+    ChatAccessRequest,
+    ContagemStatus,
+    DecisaoEmLote,
+    normalizar_email,
+)
+from .pagination import KeysetCursorPagination
+from .renderers import JSONRapidoRenderer
+from .serializers import (
+    ChatAccessRequestSerializer,
+    ChatAccessRequestStatusSerializer,
+    DecisaoEmLoteSerializer,
+)
+from .throttling import CriacaoPorEmailThrottle, CriacaoPorIPThrottle
+from .utils.cache_utils import astatus_do_email
+from .utils.criacao_utils import criar_em_lote
+from .utils.decisao_utils import decidir
+from .utils.export_utils import FORMATOS
+from .utils.representacao_utils import (
+    fontes,
+    representar_tuplas,
+    representar_valores,
+)
 
-from .models import ChatAccessRequest
-from .serializers import ChatAccessRequestSerializer, ChatAccessRequestStatusSerializer
+
+def _parse_data(param, valor):
+    """
+    Converte o parâmetro em datetime com fuso. Para uma data sem hora, devolve
+    o início do dia e indica que o limite final deve incluir o dia inteiro.
+    """
+    try:
+        data = parse_date(valor)
+        dia_inteiro = data is not None
+        if dia_inteiro:
+            data_hora = datetime.combine(data, time.min)
+        else:
+            data_hora = parse_datetime(valor)
+            if data_hora is None:
+                raise ValueError
+    except ValueError:
+        raise ValidationError({param: "Data inválida. Use o formato ISO 8601."})
+    if timezone.is_naive(data_hora):
+        data_hora = timezone.make_aware(data_hora)
+    return data_hora, dia_inteiro
+
+
+class FiltroSolicitacoesMixin:
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        status_param = params.get("status")
+        if status_param:
+            queryset = queryset.filter(status=status_param)
+        if params.get("criado_de"):
+            inicio, _ = _parse_data("criado_de", params["criado_de"])
+            queryset = queryset.filter(criado_em__gte=inicio)
+        if params.get("criado_ate"):
+            fim, dia_inteiro = _parse_data("criado_ate", params["criado_ate"])
+            if dia_inteiro:
+                queryset = queryset.filter(criado_em__lt=fim + timedelta(days=1))
+            else:
+                queryset = queryset.filter(criado_em__lte=fim)
+        return queryset
 
 
 class ChatAccessRequestCreateView(CreateAPIView):
     queryset = ChatAccessRequest.objects.all()
     serializer_class = ChatAccessRequestSerializer
+    # Verificados antes do serializer: quem passou do limite não chega ao banco.
+    throttle_classes = [CriacaoPorIPThrottle, CriacaoPorEmailThrottle]
+
+    def perform_create(self, serializer):
+        # A solicitação e os e-mails do outbox (post_save) são gravados juntos.
+        with transaction.atomic():
+            serializer.save()
+
 
+class ChatAccessRequestBulkCreateView(GenericAPIView):
+    serializer_class = ChatAccessRequestSerializer
+    # Integração de parceiros: exige um usuário autenticado.
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        itens = request.data
+        if not isinstance(itens, list):
+            raise ValidationError("Envie uma lista de solicitações.")
+        if len(itens) > settings.CHAT_ACCESS_REQUEST_BULK_MAX:
+            raise ValidationError(
+                f"Envie no máximo {settings.CHAT_ACCESS_REQUEST_BULK_MAX} "
+                "solicitações por vez."
+            )
 
-class ChatAccessRequestListView(ListAPIView):
+        criadas, erros = criar_em_lote(itens)
+        return Response(
+            {
+                "criados": self.get_serializer(criadas, many=True).data,
+                "erros": erros,
+            },
+            status=(
+                http_status.HTTP_201_CREATED
+                if criadas
+                else http_status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+
+class ChatAccessRequestListView(FiltroSolicitacoesMixin, ListAPIView):
     queryset = ChatAccessRequest.objects.all()
     serializer_class = ChatAccessRequestSerializer
     permission_classes = [IsAdminUser]
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
-    search_fields = ["email", "nome"]
+    pagination_class = KeysetCursorPagination
+    # A busca vem antes: a ordenação padrão dela usa a relevância anotada.
+    filter_backends = [BuscaTextualFilter, filters.OrderingFilter]
     ordering_fields = ["criado_em", "status"]
+    renderer_classes = [JSONRapidoRenderer, BrowsableAPIRenderer]
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        status_param = self.request.query_params.get("status")
-        if status_param:
-            queryset = queryset.filter(status=status_param)
-        return queryset
+    @property
+    def ordering(self):
+        # Com busca e sem ?ordering, os mais relevantes primeiro; a relevância
+        # entra na chave do cursor.
+        if BuscaTextualFilter().get_search_terms(self.request):
+            return ("-relevancia",)
+        return None
 
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                "status",
-                openapi.IN_QUERY,
-                description="Filtrar por status",
-                type=openapi.TYPE_STRING,
-                enum=["pendente", "aprovado", "recusado"],
-            )
-        ]
-    )
+    # Definido aqui para receber os parâmetros do Swagger (access/schema.py).
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def _valores(self):
+        # Só leitura: dicts de .values() no lugar de instâncias do model.
+        queryset = self.filter_queryset(self.get_queryset())
+        campos = fontes(self.get_serializer_class())
+        if "relevancia" in queryset.query.annotations:
+            campos.append("relevancia")
+        return queryset.values(*campos)
+
+    def list(self, request, *args, **kwargs):
+        return self._resposta(self.paginate_queryset(self._valores()))
+
+    def _resposta(self, pagina):
+        dados = representar_valores(self.get_serializer_class(), pagina)
+        return self.get_paginated_response(dados)
+
+
+class ChatAccessRequestExportView(FiltroSolicitacoesMixin, GenericAPIView):
+    queryset = ChatAccessRequest.objects.all()
+    permission_classes = [IsAdminUser]
+    filter_backends = [BuscaTextualFilter]
+    # Mesmos campos e representação da listagem.
+    serializer_representacao = ChatAccessRequestSerializer
+
+    def get(self, request, *args, **kwargs):
+        formato = request.query_params.get("formato", "ndjson")
+        if formato not in FORMATOS:
+            raise ValidationError({"formato": f"Use um de: {', '.join(FORMATOS)}."})
+        gerar, content_type = FORMATOS[formato]
+
+        # values_list + iterator: nenhuma instância do model é criada e o
+        # resultado é lido do banco em blocos, sem acumular em memória.
+        linhas = (
+            self.filter_queryset(self.get_queryset())
+            .order_by("id")
+            .values_list(*fontes(self.serializer_representacao))
+            .iterator(chunk_size=settings.CHAT_ACCESS_REQUEST_EXPORT_CHUNK_SIZE)
+        )
+        response = StreamingHttpResponse(
+            gerar(
+                list(self.serializer_representacao().fields),
+                representar_tuplas(self.serializer_representacao, linhas),
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="solicitacoes.{formato}"'
+        )
+        return response
+
 
 class ChatAccessRequestStatusUpdateView(UpdateAPIView):
     queryset = ChatAccessRequest.objects.all()
     serializer_class = ChatAccessRequestStatusSerializer
     permission_classes = [IsAdminUser]
     lookup_field = "pk"
+
+    def update(self, request, *args, **kwargs):
+        # PUT e PATCH são a mesma coisa: o status é o único campo.
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self._decidir(serializer.validated_data["status"])
+
+    def _decidir(self, status):
+        # Sem get_object(): a transição é um UPDATE condicional, e só a
+        # resposta de erro precisa ler o status atual.
+        pk = self.kwargs[self.lookup_field]
+        if decidir(pk, status) is not None:
+            return Response({"status": status})
+        atual = (
+            ChatAccessRequest.objects.filter(pk=pk)
+            .values_list("status", flat=True)
+            .first()
+        )
+        if atual is None:
+            raise Http404
+        return Response(
+            {"status": [f"Não é possível mudar o status de {atual} para {status}."]},
+            status=http_status.HTTP_409_CONFLICT,
+        )
+
+
+class ChatAccessRequestEstatisticasView(APIView):
+    # Lê só os contadores (ContagemStatus): o custo depende dos dias pedidos,
+    # limitados a ESTATISTICAS_MAX_DIAS, e não do tamanho da tabela.
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        ate = self._dia("criado_ate") or timezone.localdate()
+        de = self._dia("criado_de") or ate - timedelta(
+            days=settings.ESTATISTICAS_DIAS - 1
+        )
+        dias = (ate - de).days + 1
+        if dias < 1:
+            raise ValidationError({"criado_de": "Deve ser anterior a criado_ate."})
+        if dias > settings.ESTATISTICAS_MAX_DIAS:
+            raise ValidationError(
+                f"Peça no máximo {settings.ESTATISTICAS_MAX_DIAS} dias por vez."
+            )
+
+        vazio = {status: 0 for status, _ in STATUS_CHOICES}
+        por_dia = {de + timedelta(days=n): dict(vazio) for n in range(dias)}
+        contadores = ContagemStatus.objects.filter(dia__range=(de, ate))
+        for dia, status, total in contadores.values_list("dia", "status", "total"):
+            por_dia[dia][status] = total
+        por_status = {
+            status: sum(contagem[status] for contagem in por_dia.values())
+            for status in vazio
+        }
+        return Response(
+            {
+                "criado_de": de,
+                "criado_ate": ate,
+                "total": sum(por_status.values()),
+                "por_status": por_status,
+                "por_dia": [
+                    {"dia": dia, **contagem} for dia, contagem in por_dia.items()
+                ],
+            }
+        )
+
+    def _dia(self, param):
+        valor = self.request.query_params.get(param)
+        if not valor:
+            return None
+        try:
+            dia = parse_date(valor)
+        except ValueError:
+            dia = None
+        if dia is None:
+            raise ValidationError({param: "Data inválida. Use o formato AAAA-MM-DD."})
+        return dia
+
+
+class DecisaoEmLoteDetailView(RetrieveAPIView):
+    queryset = DecisaoEmLote.objects.all()
+    serializer_class = DecisaoEmLoteSerializer
+    permission_classes = [IsAdminUser]
+    lookup_field = "pk"
+
+
+# Versões ASGI das rotas mais acessadas. Autenticação, permissões e throttles
+# continuam os mesmos das views acima; só o tratamento da requisição é async.
+
+
+class ChatAccessRequestAsyncCreateView(
+    AsyncGenericAPIView, ChatAccessRequestCreateView
+):
+    async def post(self, request, *args, **kwargs):
+        contexto = self.get_serializer_context()
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if isinstance(email, str):
+            # Com o status já no contexto, a validação não consulta o banco.
+            contexto["status_por_email"] = {
+                normalizar_email(email): await astatus_do_email(email)
+            }
+        serializer = self.get_serializer_class()(data=request.data, context=contexto)
+        serializer.is_valid(raise_exception=True)
+        # O ORM async ainda não abre transações: o save com o outbox roda numa
+        # thread, como um bloco atômico só.
+        await sync_to_async(self.perform_create)(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=http_status.HTTP_201_CREATED, headers=headers
+        )
+
+
+class ChatAccessRequestAsyncListView(AsyncGenericAPIView, ChatAccessRequestListView):
+    async def get(self, request, *args, **kwargs):
+        pagina = await self.paginator.apaginate_queryset(
+            self._valores(), request, view=self
+        )
+        return self._resposta(pagina)
+
+
+class ChatAccessRequestAsyncStatusUpdateView(
+    AsyncGenericAPIView, ChatAccessRequestStatusUpdateView
+):
+    async def put(self, request, *args, **kwargs):
+        return await self._atualizar(request, partial=False)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self._atualizar(request, partial=True)
+
+    async def _atualizar(self, request, partial):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # O UPDATE e o on_commit do e-mail rodam juntos numa thread.
+        return await sync_to_async(self._decidir)(serializer.validated_data["status"])
@@ -0,0 +1,97 @@
+"""
+Benchmark da paginação da lista do admin (access/pagination.py).
+
+Cria um banco de testes, popula com N solicitações e mede, para páginas cada
+vez mais fundas, o Paginator do Django (COUNT(*) e OFFSET desde o início) e o
+PaginadorAdmin chegando à página por um link da página vizinha (âncora).
+
+    python benchmarks/admin_paginacao.py --linhas 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.paginator import Paginator  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from access.models import ChatAccessRequest  # noqa: E402
+from access.pagination import CHAVE_KEYSET, PaginadorAdmin  # noqa: E402
+
+POR_PAGINA = 100
+
+
+def popular(linhas, lote=10_000):
+    for inicio in range(0, linhas, lote):
+        ChatAccessRequest.objects.bulk_create(
+            ChatAccessRequest(nome=f"N{i}", email=f"n{i}@example.com", motivo="x")
+            for i in range(inicio, min(inicio + lote, linhas))
+        )
+
+
+def queryset():
+    return ChatAccessRequest.objects.order_by(*CHAVE_KEYSET)
+
+
+def abrir(paginador, numero):
+    pagina = paginador.page(numero)
+    return pagina, list(pagina.object_list)
+
+
+def medir(funcao, repeticoes):
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    nome_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"Populando {args.linhas} solicitações...")
+        popular(args.linhas)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        paginas = args.linhas // POR_PAGINA
+        print(f"\n{'página':>8} {'Paginator':>12} {'PaginadorAdmin':>15}")
+        for numero in sorted({2, 100, 2000, paginas // 2, paginas - 1}):
+            # A âncora vem da página anterior, como no link "próxima".
+            paginador = PaginadorAdmin(queryset(), POR_PAGINA)
+            pagina, linhas = abrir(paginador, numero - 1)
+            ancora = PaginadorAdmin.ler_ancora(paginador.ancora_de(numero - 1, linhas))
+
+            def django_padrao():
+                paginador = Paginator(queryset(), POR_PAGINA)
+                return abrir(paginador, numero)
+
+            def com_ancora():
+                paginador = PaginadorAdmin(queryset(), POR_PAGINA, ancora=ancora)
+                return abrir(paginador, numero)
+
+            assert django_padrao()[1] == com_ancora()[1]
+            padrao = medir(django_padrao, args.repeticoes)
+            ancorado = medir(com_ancora, args.repeticoes)
+            print(f"{numero:>8} {padrao:>9.1f} ms {ancorado:>12.1f} ms")
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
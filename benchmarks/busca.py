@@ -0,0 +1,113 @@
+"""
+Benchmark da busca em nome/e-mail/motivo (access/utils/busca_utils.py).
+
+Cria um banco de testes (com a migração 0011: GIN no PostgreSQL, FTS5 no
+SQLite), popula com N solicitações e compara, para algumas buscas, o backend
+do banco com o ``icontains`` em cada campo: a primeira página ordenada por
+relevância, como na listagem, e o plano de execução.
+
+    python benchmarks/busca.py --linhas 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from access.models import ChatAccessRequest  # noqa: E402
+from access.utils.busca_utils import buscar  # noqa: E402
+
+PALAVRAS = (
+    "acesso painel relatório financeiro equipe projeto cliente suporte "
+    "integração dados auditoria contrato vendas marketing produto análise "
+    "treinamento pesquisa operação logística jurídico compras"
+).split()
+NOMES = "Ana Bruno Carla Daniel Eduarda Felipe Gabriela Heitor Isabela João".split()
+SOBRENOMES = "Silva Souza Oliveira Santos Pereira Lima Costa Ribeiro Alves".split()
+
+BUSCAS = {
+    # Uma linha só.
+    "e-mail exato": lambda linhas: f"usuario{linhas // 2}@example.com",
+    # Poucas linhas: palavra rara no motivo.
+    "palavra rara": lambda linhas: "homologação",
+    # Muitas linhas: nome comum e palavra comum.
+    "nome + palavra": lambda linhas: "Gabriela auditoria",
+}
+
+
+def popular(linhas, lote=10_000):
+    random.seed(42)
+    for inicio in range(0, linhas, lote):
+        solicitacoes = []
+        for i in range(inicio, min(inicio + lote, linhas)):
+            motivo = " ".join(random.choices(PALAVRAS, k=random.randint(8, 40)))
+            if i % 10_000 == 0:
+                motivo += " homologação"
+            solicitacoes.append(
+                ChatAccessRequest(
+                    nome=f"{random.choice(NOMES)} {random.choice(SOBRENOMES)}",
+                    email=f"usuario{i}@example.com",
+                    motivo=motivo,
+                )
+            )
+        ChatAccessRequest.objects.bulk_create(solicitacoes)
+
+
+def pagina(texto):
+    queryset = buscar(ChatAccessRequest.objects.all(), texto)
+    return queryset.order_by("-relevancia", "-criado_em", "-id")[:50]
+
+
+def medir(backend, texto, repeticoes):
+    settings.CHAT_ACCESS_REQUEST_BUSCA = backend
+    resultado = list(pagina(texto))
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        list(pagina(texto))
+    media = (time.perf_counter() - inicio) / repeticoes * 1000
+    return media, len(resultado), pagina(texto).explain()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--planos", action="store_true")
+    args = parser.parse_args()
+
+    nome_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"Populando {args.linhas} solicitações...")
+        inicio = time.perf_counter()
+        popular(args.linhas)
+        print(f"  {time.perf_counter() - inicio:.0f} s, com o índice de busca")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        print(f"\n{'busca':<16} {'backend':<12} {'linhas':>6} {'tempo':>11}")
+        for nome, texto in BUSCAS.items():
+            texto = texto(args.linhas)
+            for backend in (connection.vendor, "icontains"):
+                media, encontradas, plano = medir(backend, texto, args.repeticoes)
+                print(f"{nome:<16} {backend:<12} {encontradas:>6} {media:>8.1f} ms")
+                if args.planos:
+                    print(plano)
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
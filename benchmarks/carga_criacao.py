@@ -0,0 +1,125 @@
+"""
+Teste de carga da criação de solicitações (POST em ``chat-access-request``).
+
+Dispara N POSTs concorrentes contra um servidor já em execução e mostra vazão
+e latências. Com as mesmas variáveis de ambiente do servidor (PostgreSQL),
+também mostra quantas conexões novas o banco abriu durante a carga e quanto
+custa abrir uma conexão, para comparar os modos do core/database.py:
+
+    # sem reaproveitar conexões
+    DB_CONN_MAX_AGE=0 docker-compose up -d web
+    python benchmarks/carga_criacao.py --url http://localhost:8000/api/chat-access-request/
+
+    # conexões persistentes (padrão) ou pool
+    DB_POOL_ENABLED=True docker-compose up -d web
+    python benchmarks/carga_criacao.py --url http://localhost:8000/api/chat-access-request/
+
+O servidor precisa rodar sem limite de requisições por IP
+(``CHAT_ACCESS_REQUEST_THROTTLE_IP=``).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+
+def sessoes_abertas():
+    """Total de sessões já abertas no banco (PostgreSQL 14+)."""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sessions FROM pg_stat_database WHERE datname = current_database()"
+        )
+        return cursor.fetchone()[0]
+
+
+def custo_conexao(repeticoes=20):
+    """Tempo médio (ms) para abrir uma conexão nova e fazer um SELECT 1."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        connection.close()
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    connection.close()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def enviar(url, lote):
+    corpo = json.dumps(
+        {
+            "nome": "Carga",
+            "email": f"carga-{lote}-{uuid.uuid4().hex}@example.com",
+            "motivo": "Teste de carga",
+        }
+    ).encode()
+    requisicao = urllib.request.Request(
+        url, data=corpo, headers={"Content-Type": "application/json"}
+    )
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(requisicao, timeout=30) as resposta:
+            status = resposta.status
+    except urllib.error.HTTPError as erro:
+        status = erro.code
+    return status, (time.perf_counter() - inicio) * 1000
+
+
+def percentil(valores, p):
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    args = parser.parse_args()
+
+    lote = uuid.uuid4().hex[:8]
+    sessoes_antes = sessoes_abertas()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concorrencia) as executor:
+        resultados = list(
+            executor.map(lambda _: enviar(args.url, lote), range(args.requisicoes))
+        )
+    total = time.perf_counter() - inicio
+
+    sessoes_depois = sessoes_abertas()
+    latencias = sorted(latencia for _, latencia in resultados)
+    erros = sum(1 for status, _ in resultados if status != 201)
+
+    print(f"{args.requisicoes} POSTs, concorrência {args.concorrencia}")
+    print(f"vazão: {args.requisicoes / total:.1f} req/s ({erros} sem 201)")
+    print(
+        f"latência p50 {statistics.median(latencias):.1f} ms, "
+        f"p95 {percentil(latencias, 95):.1f} ms, "
+        f"p99 {percentil(latencias, 99):.1f} ms"
+    )
+    if sessoes_antes is not None:
+        # A consulta do próprio script também abre uma sessão.
+        print(f"conexões abertas no banco: {sessoes_depois - sessoes_antes - 1}")
+    print(f"custo de abrir uma conexão: {custo_conexao():.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Tempo de subida e memória do gunicorn em cada modo do gunicorn.conf.py.
+
+Para cada classe de worker (sync, gthread, uvicorn), com e sem preload, sobe o
+servidor, mede o tempo até a primeira resposta e até todos os workers estarem
+prontos, e soma a memória do master e dos workers: RSS e PSS (que divide as
+páginas compartilhadas entre os processos, mostrando o ganho do
+copy-on-write).
+
+    python benchmarks/gunicorn_modos.py --workers 4
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+MODOS = ["sync", "gthread", "uvicorn"]
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def responde(url):
+    try:
+        urllib.request.urlopen(url, timeout=1)
+    except urllib.error.HTTPError:
+        # 401/403 também é a aplicação respondendo.
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def filhos(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as arquivo:
+        return [int(p) for p in arquivo.read().split()]
+
+
+def memoria_kb(pid, campo, arquivo):
+    with open(f"/proc/{pid}/{arquivo}") as dados:
+        for linha in dados:
+            if linha.startswith(campo):
+                return int(linha.split()[1])
+    return 0
+
+
+def medir(modo, preload, workers):
+    porta = porta_livre()
+    env = {
+        **os.environ,
+        "GUNICORN_WORKER_CLASS": modo,
+        "GUNICORN_PRELOAD": str(preload),
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_BIND": f"127.0.0.1:{porta}",
+    }
+    url = f"http://127.0.0.1:{porta}/api/chat-access-request/list/"
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=RAIZ,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not responde(url):
+            time.sleep(0.05)
+        primeira = time.perf_counter() - inicio
+        # Cada worker abre a aplicação (sem preload) antes de aceitar conexões;
+        # espera todos existirem e responde mais algumas vezes.
+        while len(filhos(processo.pid)) < workers:
+            time.sleep(0.05)
+        for _ in range(workers * 4):
+            responde(url)
+        todos = time.perf_counter() - inicio
+
+        pids = [processo.pid, *filhos(processo.pid)]
+        rss = sum(memoria_kb(pid, "VmRSS", "status") for pid in pids)
+        pss = sum(memoria_kb(pid, "Pss:", "smaps_rollup") for pid in pids)
+    finally:
+        processo.terminate()
+        processo.wait()
+    return primeira, todos, rss / 1024, pss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(
+        f"{'modo':<8} {'preload':<8} {'1ª resposta':>12} {'todos prontos':>14} "
+        f"{'RSS total':>10} {'PSS total':>10}"
+    )
+    for modo in MODOS:
+        for preload in (False, True):
+            primeira, todos, rss, pss = medir(modo, preload, args.workers)
+            print(
+                f"{modo:<8} {str(preload):<8} {primeira:>11.2f}s {todos:>13.2f}s "
+                f"{rss:>8.0f}MB {pss:>8.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
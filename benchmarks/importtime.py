@@ -0,0 +1,89 @@
+"""
+Tempo de import na subida dos processos web e worker.
+
+Roda cada processo com ``python -X importtime``, soma o tempo de import de
+todos os módulos e mostra os pacotes que mais pesam. Com ``--orcamento-web`` e
+``--orcamento-worker`` (em ms) o script sai com erro quando um processo passa
+do orçamento, para ser usado no CI:
+
+    python benchmarks/importtime.py --orcamento-web 450 --orcamento-worker 350
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# O que cada processo importa antes de atender a primeira requisição/tarefa.
+PROCESSOS = {
+    "web": (
+        "core.settings",
+        "import core.wsgi; from django.urls import get_resolver; "
+        "get_resolver().url_patterns",
+    ),
+    "worker": (
+        "core.settings_worker",
+        "from core.celery import app; import django; django.setup(); "
+        "app.loader.import_default_modules()",
+    ),
+}
+
+
+def medir(settings_module, codigo):
+    """Retorna ``(total_ms, ms_por_pacote)`` de uma subida."""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": settings_module},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    pacotes = Counter()
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, _, modulo = linha[len("import time:") :].split("|")
+        pacotes[modulo.strip().split(".")[0]] += int(proprio) / 1000
+    return sum(pacotes.values()), pacotes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--orcamento-web", type=float)
+    parser.add_argument("--orcamento-worker", type=float)
+    args = parser.parse_args()
+    orcamentos = {"web": args.orcamento_web, "worker": args.orcamento_worker}
+
+    estourados = []
+    for processo, (settings_module, codigo) in PROCESSOS.items():
+        medicoes = [medir(settings_module, codigo) for _ in range(args.repeticoes)]
+        # A mediana descarta as subidas com o cache de disco ainda frio.
+        total, pacotes = sorted(medicoes, key=lambda m: m[0])[len(medicoes) // 2]
+        orcamento = orcamentos[processo]
+
+        print(f"{processo} ({settings_module}): {total:.0f} ms", end="")
+        print(f" (orçamento {orcamento:.0f} ms)" if orcamento else "")
+        print(f"  mín {min(m[0] for m in medicoes):.0f} ms, ", end="")
+        print(f"desvio {statistics.pstdev(m[0] for m in medicoes):.0f} ms")
+        for pacote, ms in pacotes.most_common(args.top):
+            print(f"  {pacote:<28} {ms:>7.1f} ms")
+        print()
+
+        if orcamento and total > orcamento:
+            estourados.append(processo)
+
+    if estourados:
+        sys.exit(f"Acima do orçamento de import: {', '.join(estourados)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark dos índices de ChatAccessRequest (migração 0003).
+
+Cria um banco de testes, popula com N solicitações e mostra o plano de execução
+e o tempo médio das consultas de ``validate_email`` e da listagem por status,
+primeiro sem e depois com os índices compostos.
+
+    python benchmarks/indices_email_status.py --linhas 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from access.models import ChatAccessRequest  # noqa: E402
+
+STATUS = ["pendente"] * 2 + ["aprovado"] * 5 + ["recusado"] * 3
+
+
+def popular(linhas, lote=10_000):
+    random.seed(42)
+    for inicio in range(0, linhas, lote):
+        ChatAccessRequest.objects.bulk_create(
+            ChatAccessRequest(
+                nome=f"Usuário {i}",
+                email=f"Usuario{i}@Example.com",
+                motivo="Benchmark",
+                status=random.choice(STATUS),
+            )
+            for i in range(inicio, min(inicio + lote, linhas))
+        )
+
+
+def consultas(linhas):
+    alvo = f"usuario{linhas // 2}@example.com"
+    return {
+        "validate_email": lambda: ChatAccessRequest.objects.por_email(alvo)
+        .order_by("-criado_em")
+        .values_list("status", flat=True)[:1],
+        "lista por status": lambda: ChatAccessRequest.objects.filter(
+            status="pendente"
+        ).order_by("-criado_em")[:50],
+    }
+
+
+def medir(nome, consulta, repeticoes):
+    print(f"\n--- {nome}")
+    print(consulta().explain())
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        list(consulta())
+    media = (time.perf_counter() - inicio) / repeticoes * 1000
+    print(f"tempo médio: {media:.3f} ms")
+
+
+def analisar():
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"ANALYZE {ChatAccessRequest._meta.db_table}")
+        else:
+            cursor.execute("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    nome_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"Populando {args.linhas} solicitações...")
+        popular(args.linhas)
+        indices = ChatAccessRequest._meta.indexes
+
+        with connection.schema_editor() as editor:
+            for indice in indices:
+                editor.remove_index(ChatAccessRequest, indice)
+        analisar()
+        print("\n===== SEM ÍNDICES")
+        for nome, consulta in consultas(args.linhas).items():
+            medir(nome, consulta, args.repeticoes)
+
+        with connection.schema_editor() as editor:
+            for indice in indices:
+                editor.add_index(ChatAccessRequest, indice)
+        analisar()
+        print("\n===== COM ÍNDICES")
+        for nome, consulta in consultas(args.linhas).items():
+            medir(nome, consulta, args.repeticoes)
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
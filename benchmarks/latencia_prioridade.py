@@ -0,0 +1,205 @@
+"""
+Latência das confirmações durante uma aprovação em massa.
+
+Para cada layout, sobe os workers, enfileira a notificação de uma aprovação em
+massa de --decisoes solicitações (informar_decisoes_em_lote em chunks de
+DECISAO_LOTE_CHUNK_SIZE, como o admin faz) e, logo em seguida, uma confirmação
+a cada --intervalo segundos. O envio de cada e-mail é simulado com --smtp-ms
+de espera. A latência de uma confirmação vai da publicação até o envio.
+
+- ``fila-unica``: tudo na fila "emails", um worker com a concorrência total
+  (como era antes das filas por prioridade);
+- ``prioridade``: EMAIL_ROTAS e os workers do docker-compose, "emails" e
+  "emails_prioritarios" com a mesma concorrência total.
+
+Precisa do broker e do banco migrado, e dos workers do compose parados, para
+não disputarem as filas:
+
+    docker compose stop worker worker-prioritario
+    python benchmarks/latencia_prioridade.py --decisoes 10000
+"""
+
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings_worker")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.mail.backends.base import BaseEmailBackend  # noqa: E402
+
+from core.celery import app  # noqa: E402
+
+django.setup()
+
+# Os workers sobem com "-A benchmarks.latencia_prioridade" e herdam isto.
+settings.EMAIL_BACKEND = "benchmarks.latencia_prioridade.BackendLento"
+
+PREFIXO = "bench-confirmacao"
+
+
+class BackendLento(BaseEmailBackend):
+    """Espera BENCH_SMTP_MS por mensagem e registra quando cada confirmação saiu."""
+
+    def send_messages(self, email_messages):
+        espera = float(os.environ["BENCH_SMTP_MS"]) / 1000
+        for mensagem in email_messages:
+            time.sleep(espera)
+            if mensagem.subject.startswith(PREFIXO):
+                with open(os.environ["BENCH_REGISTRO"], "a") as registro:
+                    registro.write(f"{mensagem.subject}\t{time.time()}\n")
+        return len(email_messages)
+
+
+LAYOUTS = {
+    # (filas, concorrência) de cada worker.
+    "fila-unica": lambda geral, prioritario: [("emails", geral + prioritario)],
+    "prioridade": lambda geral, prioritario: [
+        ("emails", geral),
+        (settings.FILA_PRIORITARIA, prioritario),
+    ],
+}
+
+
+def subir_workers(layout, env):
+    processos = []
+    for filas, concorrencia in layout:
+        log = Path(tempfile.mkstemp(prefix=f"worker-{filas}-", suffix=".log")[1])
+        processo = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "celery",
+                "-A",
+                "benchmarks.latencia_prioridade",
+                "worker",
+                "-Q",
+                filas,
+                "-c",
+                str(concorrencia),
+                "-n",
+                f"bench-{filas}@%h",
+                "-l",
+                "info",
+                "-f",
+                str(log),
+                "--without-gossip",
+                "--without-mingle",
+                "--without-heartbeat",
+            ],
+            cwd=RAIZ,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        processos.append((processo, log))
+    for processo, log in processos:
+        while " ready." not in log.read_text():
+            if processo.poll() is not None:
+                raise RuntimeError(f"Worker terminou antes de ficar pronto: {log}")
+            time.sleep(0.1)
+    return processos
+
+
+def percentil(valores, p):
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def medir(nome, args):
+    from access.tasks import informar_decisoes_em_lote
+    from access.utils.email_utils import _enfileirar_email
+
+    registro = Path(tempfile.mkstemp(prefix="confirmacoes-")[1])
+    env = {
+        **os.environ,
+        "BENCH_REGISTRO": str(registro),
+        "BENCH_SMTP_MS": str(args.smtp_ms),
+    }
+    os.environ.update(env)
+    rotas = settings.EMAIL_ROTAS
+    if nome == "fila-unica":
+        settings.EMAIL_ROTAS = {tipo: {"queue": "emails"} for tipo in rotas}
+
+    app.control.purge()
+    workers = subir_workers(LAYOUTS[nome](args.geral, args.prioritario), env)
+    try:
+        chunk = settings.DECISAO_LOTE_CHUNK_SIZE
+        with app.producer_or_acquire() as producer:
+            for inicio in range(0, args.decisoes, chunk):
+                solicitacoes = [
+                    [f"Usuário {i}", f"usuario{i}@example.com"]
+                    for i in range(inicio, min(inicio + chunk, args.decisoes))
+                ]
+                informar_decisoes_em_lote.apply_async(
+                    (str(uuid.uuid4()), "aprovado", solicitacoes), producer=producer
+                )
+
+        for i in range(args.confirmacoes):
+            _enfileirar_email(
+                f"{PREFIXO} {i} {time.time()}",
+                "Recebemos sua solicitação.",
+                [f"novo{i}@example.com"],
+                "confirmacao",
+            )
+            time.sleep(args.intervalo)
+
+        limite = time.time() + args.timeout
+        while time.time() < limite:
+            linhas = registro.read_text().splitlines()
+            if len(linhas) >= args.confirmacoes:
+                break
+            time.sleep(0.2)
+    finally:
+        for processo, log in workers:
+            # Desligamento a frio: encerra também os processos do pool.
+            processo.send_signal(signal.SIGQUIT)
+            processo.wait()
+            log.unlink()
+        app.control.purge()
+        settings.EMAIL_ROTAS = rotas
+
+    latencias = [
+        (float(enviado) - float(assunto.split()[-1])) * 1000
+        for assunto, enviado in (linha.split("\t") for linha in linhas)
+    ]
+    registro.unlink()
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decisoes", type=int, default=10_000)
+    parser.add_argument("--confirmacoes", type=int, default=200)
+    parser.add_argument("--intervalo", type=float, default=0.05)
+    parser.add_argument("--smtp-ms", type=float, default=5)
+    parser.add_argument("--geral", type=int, default=4)
+    parser.add_argument("--prioritario", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--layout", choices=list(LAYOUTS), action="append")
+    args = parser.parse_args()
+
+    print(f"{'layout':<12} {'enviadas':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'máx':>9}")
+    for nome in args.layout or list(LAYOUTS):
+        latencias = medir(nome, args)
+        if len(latencias) < 2:
+            print(f"{nome:<12} {len(latencias):>9}  (timeout)")
+            continue
+        print(
+            f"{nome:<12} {len(latencias):>9} "
+            f"{percentil(latencias, 50):>7.0f}ms {percentil(latencias, 95):>7.0f}ms "
+            f"{percentil(latencias, 99):>7.0f}ms {max(latencias):>7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
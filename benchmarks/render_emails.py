@@ -0,0 +1,117 @@
+"""
+Benchmark da renderização dos e-mails de decisão.
+
+Compara o registro pré-compilado de ``access.utils.email_templates`` (texto e
+HTML) com o mesmo template no motor de templates do Django, compilado uma vez
+e renderizado a cada mensagem, e com as f-strings usadas antes do registro
+(só texto: os e-mails ainda não tinham HTML).
+
+    python benchmarks/render_emails.py --mensagens 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.template import Context, Engine  # noqa: E402
+from django.utils.html import escape  # noqa: E402
+
+from access.utils.email_templates import (  # noqa: E402
+    DIRETORIO,
+    registro,
+    renderizar_em_lote,
+)
+
+
+def _fonte_django(extensao):
+    fonte = (DIRETORIO / f"decisao_recusado.{extensao}").read_text(encoding="utf-8")
+    for campo in ("nome", "motivo_recusa", "chat_base_url"):
+        fonte = fonte.replace("{" + campo + "}", "{{ " + campo + " }}")
+    return fonte
+
+
+def _contextos(mensagens):
+    return (
+        {"nome": f"Usuário {i}", "motivo_recusa": "Não especificado"}
+        for i in range(mensagens)
+    )
+
+
+def registro_pre_compilado(mensagens):
+    registro.cache_clear()
+    for _ in renderizar_em_lote("decisao_recusado", _contextos(mensagens)):
+        pass
+
+
+def motor_django(mensagens):
+    texto = Engine(autoescape=False).from_string(_fonte_django("txt"))
+    html = Engine().from_string(_fonte_django("html"))
+    for contexto in _contextos(mensagens):
+        contexto["chat_base_url"] = settings.CHAT_BASE_URL
+        contexto = Context(contexto)
+        texto.render(contexto)
+        html.render(contexto)
+
+
+def fstring_anterior(mensagens):
+    # montar_email_decisao antes do registro, recusada.
+    for contexto in _contextos(mensagens):
+        nome, motivo_recusa = contexto["nome"], contexto["motivo_recusa"]
+        (
+            f"Olá {nome},\n\n"
+            "Infelizmente sua solicitação de acesso ao chat foi recusada.\n"
+            f'Motivo: {motivo_recusa or "Não especificado"}\n\n'
+            "Atenciosamente,\nEquipe"
+        )
+
+
+def fstring_com_html(mensagens):
+    # As mesmas f-strings, com o HTML escapado que o registro também gera.
+    for contexto in _contextos(mensagens):
+        nome, motivo_recusa = contexto["nome"], contexto["motivo_recusa"]
+        (
+            f"Olá {nome},\n\n"
+            "Infelizmente sua solicitação de acesso ao chat foi recusada.\n"
+            f"Motivo: {motivo_recusa}\n\n"
+            "Atenciosamente,\nEquipe"
+        )
+        (
+            f"<p>Olá {escape(nome)},</p>\n"
+            "<p>Infelizmente sua solicitação de acesso ao chat foi recusada.<br>\n"
+            f"Motivo: {escape(motivo_recusa)}</p>\n"
+            "<p>Atenciosamente,<br>Equipe</p>"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mensagens", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for nome, funcao in (
+        ("motor do Django (compilado uma vez)", motor_django),
+        ("f-string anterior (só texto)", fstring_anterior),
+        ("f-string (texto e HTML)", fstring_com_html),
+        ("registro pré-compilado", registro_pre_compilado),
+    ):
+        inicio = time.perf_counter()
+        funcao(args.mensagens)
+        total = time.perf_counter() - inicio
+        print(
+            f"{nome}: {total:.2f} s "
+            f"({total / args.mensagens * 1_000_000:.1f} µs por e-mail)"
+        )
+
+
+if __name__ == "__main__":
+    main()
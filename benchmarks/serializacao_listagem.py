@@ -0,0 +1,89 @@
+"""
+Benchmark da serialização de uma página da listagem de solicitações.
+
+Compara o caminho antigo (instâncias do model + ``ChatAccessRequestSerializer``
++ ``JSONRenderer``) com o caminho rápido da listagem (``.values()`` +
+``representar_valores`` + ``JSONRapidoRenderer``), numa página de N linhas.
+
+    python benchmarks/serializacao_listagem.py --linhas 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from access.models import ChatAccessRequest  # noqa: E402
+from access.renderers import JSONRapidoRenderer  # noqa: E402
+from access.serializers import ChatAccessRequestSerializer  # noqa: E402
+from access.utils.representacao_utils import (  # noqa: E402
+    fontes,
+    representar_valores,
+)
+
+
+def popular(linhas):
+    ChatAccessRequest.objects.bulk_create(
+        ChatAccessRequest(
+            nome=f"Usuário {i}",
+            email=f"usuario{i}@example.com",
+            motivo="Benchmark da listagem",
+        )
+        for i in range(linhas)
+    )
+
+
+def serializer(linhas):
+    pagina = ChatAccessRequest.objects.order_by("-criado_em", "-id")[:linhas]
+    dados = ChatAccessRequestSerializer(pagina, many=True).data
+    return JSONRenderer().render(dados)
+
+
+def caminho_rapido(linhas):
+    pagina = ChatAccessRequest.objects.order_by("-criado_em", "-id").values(
+        *fontes(ChatAccessRequestSerializer)
+    )[:linhas]
+    dados = representar_valores(ChatAccessRequestSerializer, pagina)
+    return JSONRapidoRenderer().render(dados)
+
+
+def medir(nome, funcao, linhas, repeticoes):
+    funcao(linhas)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        saida = funcao(linhas)
+    media = (time.perf_counter() - inicio) / repeticoes * 1000
+    print(f"{nome}: {media:.1f} ms por página")
+    return saida
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    nome_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        popular(args.linhas)
+        antes = medir("serializer", serializer, args.linhas, args.repeticoes)
+        depois = medir("caminho rápido", caminho_rapido, args.linhas, args.repeticoes)
+        print(f"saídas idênticas: {antes == depois}")
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
@@ -9,3 +10,17 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 celery = app
+
+
+@worker_init.connect
+def ajustar_prefetch_por_fila(sender, **kwargs):
+    # Chamado com as filas do worker já definidas (-Q) e antes de o consumer
+    # ser criado. Um --prefetch-multiplier explícito prevalece.
+    conf = sender.app.conf
+    if sender.prefetch_multiplier != conf.worker_prefetch_multiplier:
+        return
+    filas = sender.app.amqp.queues.consume_from or sender.app.amqp.queues
+    por_fila = conf.get("prefetch_por_fila") or {}
+    sender.prefetch_multiplier = min(
+        por_fila.get(fila, conf.worker_prefetch_multiplier) for fila in filas
+    )
@@ -0,0 +1,54 @@
+"""
+Configuração do banco a partir de variáveis de ambiente.
+
+Com ``POSTGRES_DB`` definido usa PostgreSQL; sem ele, SQLite (testes e
+desenvolvimento). No PostgreSQL há dois modos:
+
+- conexões persistentes (padrão): cada thread reaproveita a sua conexão por
+  ``DB_CONN_MAX_AGE`` segundos, verificada antes de cada requisição;
+- pool do psycopg (``DB_POOL_ENABLED=True``): cada processo mantém de
+  ``DB_POOL_MIN_SIZE`` a ``DB_POOL_MAX_SIZE`` conexões. O máximo deve
+  acompanhar as threads que usam o banco no processo (threads do gunicorn ou
+  concorrência de um worker Celery com pool de threads; 1 no prefork).
+"""
+
+
+def _inteiro(env, nome, padrao):
+    return int(env.get(nome) or padrao)
+
+
+def configuracao_banco(env, base_dir):
+    if not env.get("POSTGRES_DB"):
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": base_dir / "db.sqlite3",
+        }
+
+    banco = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env["POSTGRES_DB"],
+        "USER": env.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": env.get("POSTGRES_PASSWORD", ""),
+        "HOST": env.get("POSTGRES_HOST", "db"),
+        "PORT": env.get("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": _inteiro(env, "DB_CONN_MAX_AGE", 60),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+
+    if env.get("DB_POOL_ENABLED") == "True":
+        from psycopg_pool import ConnectionPool
+
+        # O Django não aceita conexões persistentes junto com o pool: quem
+        # reaproveita as conexões passa a ser o pool.
+        banco["CONN_MAX_AGE"] = 0
+        banco["OPTIONS"]["pool"] = {
+            "min_size": _inteiro(env, "DB_POOL_MIN_SIZE", 1),
+            "max_size": _inteiro(
+                env, "DB_POOL_MAX_SIZE", _inteiro(env, "GUNICORN_THREADS", 1)
+            ),
+            "timeout": _inteiro(env, "DB_POOL_TIMEOUT", 10),
+            # Testa a conexão ao tirá-la do pool.
+            "check": ConnectionPool.check_connection,
+        }
+    return banco
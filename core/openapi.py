@@ -0,0 +1,94 @@
+"""
+Schema OpenAPI da API.
+
+O schema não muda enquanto o processo roda: é gerado uma vez e reaproveitado
+pelo Swagger, pelo ReDoc e pelo ``/swagger.json``. O comando ``gerar_schema``
+grava os arquivos em ``OPENAPI_SCHEMA_ROOT``, servidos pelo whitenoise com
+ETag e Last-Modified, sem passar pelo Django.
+
+Importado só sob demanda (ver core/urls.py): carrega o drf_yasg.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+# Arquivo gravado pelo gerar_schema -> codec. Os nomes seguem as rotas de
+# core/urls.py, para que o arquivo responda no lugar da view.
+ARQUIVOS = {
+    "swagger.json": OpenAPICodecJson,
+    "swagger.yaml": OpenAPICodecYaml,
+}
+
+
+def info():
+    return openapi.Info(
+        title="Backend Robusto API",
+        default_version="v1",
+        description="Documentação automática com Swagger",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="seuemail@exemplo.com"),
+        license=openapi.License(name="MIT License"),
+    )
+
+
+@lru_cache(maxsize=None)
+def gerar():
+    """Gera o schema público, uma vez por processo."""
+    import access.schema  # noqa: F401
+
+    return OpenAPISchemaGenerator(info()).get_schema(request=None, public=True)
+
+
+class GeradorEmCache(OpenAPISchemaGenerator):
+    def get_schema(self, request=None, public=False):
+        if public:
+            return gerar()
+        return super().get_schema(request, public)
+
+
+@lru_cache(maxsize=None)
+def schema_view():
+    return get_schema_view(
+        info(),
+        public=True,
+        permission_classes=[permissions.AllowAny],
+        generator_class=GeradorEmCache,
+    )
+
+
+def conteudo(nome):
+    return ARQUIVOS[nome](validators=[]).encode(gerar())
+
+
+def escrever(diretorio=None):
+    """Grava os arquivos do schema e retorna os caminhos escritos."""
+    diretorio = Path(diretorio or settings.OPENAPI_SCHEMA_ROOT)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    caminhos = []
+    for nome in ARQUIVOS:
+        caminho = diretorio / nome
+        # Troca atômica: o whitenoise nunca serve um arquivo pela metade.
+        temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+        temporario.write_bytes(conteudo(nome))
+        os.replace(temporario, caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def desatualizados(diretorio=None):
+    """Nomes dos arquivos ausentes ou diferentes do schema do código atual."""
+    diretorio = Path(diretorio or settings.OPENAPI_SCHEMA_ROOT)
+    return [
+        nome
+        for nome in ARQUIVOS
+        if not (diretorio / nome).is_file()
+        or (diretorio / nome).read_bytes() != conteudo(nome)
+    ]
@@ -0,0 +1,25 @@
+"""
+Settings dos processos Celery (worker e beat).
+
+Os processos do Celery não servem HTTP: sem admin, arquivos estáticos,
+sessões, DRF e drf_yasg, o ``django.setup()`` de cada processo importa só o
+que as tarefas usam.
+"""
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import INSTALLED_APPS
+
+APPS_SO_WEB = {
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "drf_yasg",
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in APPS_SO_WEB]
+
+MIDDLEWARE = []
+
+ROOT_URLCONF = "core.urls_worker"
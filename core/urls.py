@@ -1,39 +1,41 @@
+from functools import lru_cache
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Backend Robusto API",
-        default_version="v1",
-        description="Documentação automática com Swagger",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="seuemail@exemplo.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+
+
+@lru_cache(maxsize=None)
+def _documentacao_view(ui):
+    # drf_yasg e a documentação das views só são carregados no primeiro
+    # acesso ao Swagger/ReDoc, e não na subida de cada processo.
+    from core.openapi import schema_view
+
+    if ui is None:
+        return schema_view().without_ui(cache_timeout=0)
+    return schema_view().with_ui(ui, cache_timeout=0)
+
+
+def documentacao(ui=None):
+    def view(request, *args, **kwargs):
+        return _documentacao_view(ui)(request, *args, **kwargs)
+
+    return view
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("access.urls")),
-    # Rotas do Swagger:
+    # Rotas do Swagger. Depois do gerar_schema, o /swagger.json e o
+    # /swagger.yaml são servidos pelo whitenoise (WHITENOISE_ROOT).
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
+        documentacao(),
         name="schema-json",
     ),
-    path(
-        "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("swagger/", documentacao("swagger"), name="schema-swagger-ui"),
+    path("redoc/", documentacao("redoc"), name="schema-redoc"),
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
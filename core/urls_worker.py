@@ -0,0 +1,3 @@
+# Os processos do Celery não atendem requisições, mas o worker roda os
+# checks do Django ao subir, e eles carregam o ROOT_URLCONF.
+urlpatterns = []
@@ -0,0 +1,99 @@
+"""
+Configuração do gunicorn, lida das variáveis de ambiente.
+
+    gunicorn -c gunicorn.conf.py
+
+GUNICORN_WORKER_CLASS escolhe o modo:
+
+- ``sync``: um processo por requisição em andamento;
+- ``gthread`` (padrão): GUNICORN_THREADS threads por processo, para que um
+  ``.delay()`` ou uma consulta lenta não segure o processo inteiro;
+- ``uvicorn``: ASGI (``core.asgi``), com as views async ligadas.
+"""
+
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger("gunicorn.error")
+
+MODOS = {
+    "sync": ("sync", "core.wsgi:application"),
+    "gthread": ("gthread", "core.wsgi:application"),
+    "uvicorn": ("uvicorn_worker.UvicornWorker", "core.asgi:application"),
+}
+
+modo = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+if modo not in MODOS:
+    raise RuntimeError(
+        f"GUNICORN_WORKER_CLASS inválido: {modo!r}. Use um de: {', '.join(MODOS)}."
+    )
+worker_class, wsgi_app = MODOS[modo]
+
+cpus = multiprocessing.cpu_count()
+# sync precisa de mais processos para cobrir as esperas de I/O; nos outros
+# modos a concorrência vem das threads ou do event loop.
+workers = int(
+    os.getenv("GUNICORN_WORKERS") or (cpus * 2 + 1 if modo == "sync" else cpus + 1)
+)
+threads = int(os.getenv("GUNICORN_THREADS") or (4 if modo == "gthread" else 1))
+# O pool do banco (core/database.py) é dimensionado pelas threads do processo.
+os.environ["GUNICORN_THREADS"] = str(threads)
+if modo == "uvicorn":
+    os.environ.setdefault("CHAT_ACCESS_REQUEST_ASYNC_VIEWS", "True")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Django, DRF e Celery são importados uma vez no master e os workers
+# compartilham essas páginas de memória (copy-on-write).
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+# Recicla cada worker depois de um número de requisições, com jitter para que
+# eles não reiniciem todos ao mesmo tempo.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+
+def pre_fork(server, worker):
+    # Com preload_app o master carregou a aplicação: nenhuma conexão aberta
+    # nele pode ser herdada pelos workers.
+    if not preload_app:
+        return
+
+    from django.db import connections
+
+    from core.celery import app
+
+    connections.close_all()
+    # Com DB_POOL_ENABLED, close_all() só devolve a conexão ao pool do
+    # psycopg: o pool aberto no master (e as conexões dele) também precisa
+    # ser fechado, ou cada worker herda os mesmos sockets.
+    for conexao in connections.all(initialized_only=True):
+        if conexao.settings_dict["OPTIONS"].get("pool"):
+            conexao.close_pool()
+    app.pool.force_close_all()
+
+
+def post_worker_init(worker):
+    # Abre as conexões no próprio worker, antes da primeira requisição. No
+    # gthread e no uvicorn o banco é usado por outras threads, que abrem as
+    # suas; só a conexão com o broker é compartilhada pelo processo.
+    from django.db import connection
+
+    from core.celery import app
+
+    if modo == "sync":
+        # Com o banco fora, o worker sobe assim mesmo e a conexão é aberta na
+        # primeira requisição, em vez de o worker cair e renascer em loop.
+        try:
+            connection.ensure_connection()
+        except Exception as exc:
+            logger.warning("Banco indisponível ao iniciar o worker: %s", exc)
+    try:
+        with app.producer_or_acquire() as producer:
+            producer.connection.ensure_connection(max_retries=1)
+    except Exception as exc:
+        logger.warning("Broker indisponível ao iniciar o worker: %s", exc)
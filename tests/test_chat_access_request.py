@@ -1,26 +1,75 @@
+import csv
+import io
+import json
+import os
+import re
+import smtplib
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.contrib.admin.sites import AdminSite
+from django.contrib.admin.views.main import PAGE_VAR
 from django.contrib.auth.models import User
 from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.request import Request
 from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 
 from access.admin import ChatAccessRequestAdmin
-from access.models import ChatAccessRequest
-from access.tasks import enviar_email_async
-from access.utils.email_utils import notificar_admin
-from access.views import ChatAccessRequestListView
+from access.models import (
+    ChatAccessRequest,
+    ContagemStatus,
+    DecisaoEmLote,
+    EmailArquivado,
+    EmailNaoEntregue,
+    ItemResumoAdmin,
+    MensagemOutbox,
+    SolicitacaoArquivada,
+)
+from access.tasks import (
+    entregar_mensagens,
+    enviar_email_async,
+    enviar_emails_outbox,
+    informar_decisoes_em_lote,
+    limpar_outbox,
+    publicar_outbox,
+)
+from access.utils.arquivo_utils import arquivar_decididas
+from access.utils.busca_utils import buscar
+from access.utils.contagem_utils import reconciliar_contagens
+from access.utils.criacao_utils import criar_em_lote
+from access.utils.decisao_utils import (
+    aplicar_decisao_em_lote,
+    decidir,
+    decidir_em_lote,
+)
+from access.utils.email_utils import registrar_emails_criacao
+from access.utils.smtp_utils import registrar_falha
+from access.views import (
+    ChatAccessRequestAsyncCreateView,
+    ChatAccessRequestAsyncListView,
+    ChatAccessRequestAsyncStatusUpdateView,
+    ChatAccessRequestListView,
+)
 
 
 @pytest.mark.django_db
 class TestChatAccessRequest:
 
     def setup_method(self):
+        cache.clear()
         self.client = APIClient()
         self.url = reverse("chat-access-request")
         self.data = {
@@ -42,12 +91,6 @@ class TestChatAccessRequest:
         obj = ChatAccessRequest(nome="Maria", status="aprovado")
         assert str(obj) == "Maria (aprovado)"
 
-    def test_notificar_admin(self, mocker):
-        mock = mocker.patch("access.utils.email_utils.enviar_email_async.delay")
-        requisicao = ChatAccessRequest(nome="Ex", email="a@a.com", motivo="x")
-        notificar_admin(requisicao)
-        mock.assert_called_once()
-
     def test_criar_requisicao_sucesso(self, mocker):
         mock_send = mocker.patch("access.utils.email_utils.enviar_email_async.delay")
         response = self.client.post(self.url, self.data, format="json")
@@ -79,7 +122,15 @@ class TestChatAccessRequest:
         mock_send = mocker.patch("access.utils.email_utils.enviar_email_async.delay")
         response = self.client.post(self.url, self.data, format="json")
         assert response.status_code == 201
-        assert mock_send.call_count >= 1
+        # Os e-mails vão para o outbox; nada é publicado durante a requisição.
+        mock_send.assert_not_called()
+        destinatarios = MensagemOutbox.objects.order_by("chave").values_list(
+            "destinatarios", flat=True
+        )
+        assert list(destinatarios) == [
+            [settings.DEFAULT_FROM_EMAIL],
+            [self.data["email"]],
+        ]
 
     def test_status_colored(self, mocker):
         mocker.patch("access.utils.email_utils.enviar_email_async.delay")
@@ -104,32 +155,42 @@ class TestChatAccessRequest:
         fields = admin_instance.get_fields(None)
         assert fields == ["nome", "email", "motivo", "criado_em", "status"]
 
-    def test_aprovar_requisicoes(self, mocker):
+    def test_aprovar_requisicoes(self, mocker, django_capture_on_commit_callbacks):
         mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+        self._decidir_no_worker(mocker)
         obj = ChatAccessRequest.objects.create(**self.data)
         admin_instance = ChatAccessRequestAdmin(ChatAccessRequest, AdminSite())
-        mock = mocker.patch("access.admin.informar_decisao")
+        mock = mocker.patch(
+            "access.utils.decisao_utils.informar_decisoes_em_lote.delay"
+        )
         queryset = ChatAccessRequest.objects.filter(id=obj.id)
         request = self._get_mocked_request()
-        admin_instance.aprovar_requisicoes(request, queryset)
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_instance.aprovar_requisicoes(request, queryset)
         obj.refresh_from_db()
         assert obj.status == "aprovado"
         mock.assert_called_once()
+        assert mock.call_args[0][1:] == ("aprovado", [[obj.nome, obj.email]])
 
-    def test_recusar_requisicoes(self, mocker):
+    def test_recusar_requisicoes(self, mocker, django_capture_on_commit_callbacks):
         mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+        self._decidir_no_worker(mocker)
         obj = ChatAccessRequest.objects.create(**self.data)
         admin_instance = ChatAccessRequestAdmin(ChatAccessRequest, AdminSite())
-        mock = mocker.patch("access.admin.informar_decisao")
+        mock = mocker.patch(
+            "access.utils.decisao_utils.informar_decisoes_em_lote.delay"
+        )
         queryset = ChatAccessRequest.objects.filter(id=obj.id)
         request = self._get_mocked_request()
-        admin_instance.recusar_requisicoes(request, queryset)
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_instance.recusar_requisicoes(request, queryset)
         obj.refresh_from_db()
         assert obj.status == "recusado"
         mock.assert_called_once()
+        assert mock.call_args[0][1:] == ("recusado", [[obj.nome, obj.email]])
 
     def test_informar_decisao_aprovado(self, mocker):
-        mock = mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+        mock = mocker.patch("access.utils.email_utils.enviar_email_async.apply_async")
         obj = ChatAccessRequest(
             nome="João", email="joao@example.com", motivo="Teste", status="aprovado"
         )
@@ -139,12 +200,13 @@ class TestChatAccessRequest:
         informar_decisao(obj)
 
         mock.assert_called_once()
-        args, kwargs = mock.call_args
+        args = mock.call_args.args[0]
         assert "aprovada" in args[1]  # verifica a mensagem
         assert obj.email in args[2]  # verifica destinatário
+        assert mock.call_args.kwargs["queue"] == "emails_prioritarios"
 
     def test_informar_decisao_recusado_com_motivo(self, mocker):
-        mock = mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+        mock = mocker.patch("access.utils.email_utils.enviar_email_async.apply_async")
         obj = ChatAccessRequest(
             nome="João", email="joao@example.com", motivo="Teste", status="recusado"
         )
@@ -154,13 +216,13 @@ class TestChatAccessRequest:
         informar_decisao(obj, motivo_recusa="Não atende os requisitos")
 
         mock.assert_called_once()
-        args, kwargs = mock.call_args
+        args = mock.call_args.args[0]
         assert "recusada" in args[1]
         assert "Não atende os requisitos" in args[1]
         assert obj.email in args[2]
 
     def test_informar_decisao_recusado_sem_motivo(self, mocker):
-        mock = mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+        mock = mocker.patch("access.utils.email_utils.enviar_email_async.apply_async")
         obj = ChatAccessRequest(
             nome="João", email="joao@example.com", motivo="Teste", status="recusado"
         )
@@ -170,7 +232,7 @@ class TestChatAccessRequest:
         informar_decisao(obj)
 
         mock.assert_called_once()
-        args, kwargs = mock.call_args
+        args = mock.call_args.args[0]
         assert "Não especificado" in args[1]
         assert obj.email in args[2]
 
@@ -209,8 +271,9 @@ class TestChatAccessRequest:
         assert queryset.count() == 1
         assert queryset.first().status == "recusado"
 
-    def test_save_model_dispara_email_quando_status_muda(self, mocker):
-        mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+    def test_save_model_dispara_email_quando_status_muda(
+        self, mocker, django_capture_on_commit_callbacks
+    ):
         # Cria uma solicitação inicial no banco (status pendente)
         obj_original = ChatAccessRequest.objects.create(
             nome="João",
@@ -219,24 +282,33 @@ class TestChatAccessRequest:
             status="pendente",
         )
 
-        # Simula alteração para aprovado
-        obj_modificado = ChatAccessRequest.objects.get(id=obj_original.id)
-        obj_modificado.status = "aprovado"
-
         # Mocka o método informar_decisao
-        mock_informar = mocker.patch("access.admin.informar_decisao")
+        mock_informar = mocker.patch("access.utils.decisao_utils.informar_decisao")
 
         # Instancia o admin
         admin_instance = ChatAccessRequestAdmin(ChatAccessRequest, AdminSite())
+        admin_instance.message_user = Mock()
+        form = Mock(changed_data=["status"], initial={"status": "pendente"})
 
-        # Cria um mock de request do admin
-        mock_request = Mock()
+        # Dois admins abrem a mesma solicitação e decidem ao mesmo tempo.
+        for status in ("aprovado", "recusado"):
+            obj_modificado = ChatAccessRequest.objects.get(id=obj_original.id)
+            obj_modificado.status = status
+            with django_capture_on_commit_callbacks(execute=True):
+                admin_instance.save_model(Mock(), obj_modificado, form, change=True)
 
-        # Executa o método de salvar com mudança
-        admin_instance.save_model(mock_request, obj_modificado, form=None, change=True)
-
-        # Verifica se a função de notificação foi chamada
-        mock_informar.assert_called_once_with(obj_modificado)
+        # Só a primeira decisão vale e notifica o solicitante.
+        obj_original.refresh_from_db()
+        assert obj_original.status == "aprovado"
+        mock_informar.assert_called_once()
+        notificada = mock_informar.call_args.args[0]
+        assert (notificada.pk, notificada.email, notificada.status) == (
+            obj_original.pk,
+            "joao@example.com",
+            "aprovado",
+        )
+        admin_instance.message_user.assert_called_once()
+        assert "não foi alterado" in admin_instance.message_user.call_args.args[1]
 
     def test_chat_access_request_list_view_get(self, mocker):
         mocker.patch("access.utils.email_utils.enviar_email_async.delay")
@@ -268,8 +340,8 @@ class TestChatAccessRequest:
 
         # Verifica se retornou corretamente
         assert response.status_code == 200
-        assert len(response.data) == 1
-        assert response.data[0]["nome"] == "Ana"
+        assert len(response.data["results"]) == 1
+        assert response.data["results"][0]["nome"] == "Ana"
 
     def test_enviar_email_async(self, mocker):
         # mock
@@ -289,3 +361,1354 @@ class TestChatAccessRequest:
         assert actual_args[2] == settings.DEFAULT_FROM_EMAIL
         assert actual_args[3] == destinatarios
         assert mock_send_mail.call_args[1]["fail_silently"] is False
+
+    def test_entregar_mensagens_reaproveita_conexao(self, mocker):
+        connection = mocker.MagicMock()
+        mocker.patch("access.tasks.get_connection", return_value=connection)
+        connection.send_messages.side_effect = [1, Exception("recusado"), 1]
+
+        resultados = entregar_mensagens(
+            [
+                ("A", "a", ["a@example.com"]),
+                ("B", "b", ["invalido"]),
+                ("C", "c", ["c@example.com"]),
+            ]
+        )
+
+        assert resultados[0] is None
+        assert str(resultados[1]) == "recusado"
+        assert resultados[2] is None
+        assert connection.send_messages.call_count == 3
+        connection.close.assert_called()
+
+    def test_entregar_mensagens_falha_ao_conectar(self, mocker):
+        connection = mocker.MagicMock()
+        connection.open.side_effect = OSError("sem conexão")
+        mocker.patch("access.tasks.get_connection", return_value=connection)
+
+        resultados = entregar_mensagens([("A", "a", ["a@example.com"])] * 2)
+
+        assert all(isinstance(erro, OSError) for erro in resultados)
+        connection.send_messages.assert_not_called()
+
+    def _decidir_no_worker(self, mocker):
+        # Sem worker nos testes: a tarefa de cada chunk roda na hora.
+        return mocker.patch(
+            "access.utils.decisao_utils.aplicar_decisao_em_lote_async.delay",
+            side_effect=aplicar_decisao_em_lote,
+        )
+
+    def _criar_pendentes(self, quantidade):
+        return ChatAccessRequest.objects.bulk_create(
+            ChatAccessRequest(nome=f"N{i}", email=f"n{i}@example.com", motivo="x")
+            for i in range(quantidade)
+        )
+
+    @pytest.mark.parametrize("update_returning", [True, False])
+    def test_decidir_em_lote_em_chunks(
+        self, mocker, settings, django_capture_on_commit_callbacks, update_returning
+    ):
+        settings.DECISAO_LOTE_CHUNK_SIZE = 2
+        mocker.patch(
+            "access.utils.decisao_utils.suporta_update_returning",
+            return_value=update_returning,
+        )
+        mock = mocker.patch(
+            "access.utils.decisao_utils.informar_decisoes_em_lote.delay"
+        )
+        mock_worker = self._decidir_no_worker(mocker)
+        self._criar_pendentes(5)
+        ChatAccessRequest.objects.filter(email="n0@example.com").update(
+            status="aprovado"
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            decisao = decidir_em_lote(ChatAccessRequest.objects.all(), "aprovado")
+
+        # A linha que já estava aprovada não é alterada nem notificada.
+        assert decisao.total == 4
+        assert [len(call.args[2]) for call in mock_worker.call_args_list] == [2, 2]
+        assert mock.call_count == 2
+        assert ChatAccessRequest.objects.filter(status="aprovado").count() == 5
+        notificados = [email for call in mock.call_args_list for _, email in call[0][2]]
+        assert sorted(notificados) == [f"n{i}@example.com" for i in range(1, 5)]
+
+    def test_decidir_em_lote_so_enfileira(
+        self, mocker, django_capture_on_commit_callbacks
+    ):
+        mock = mocker.patch(
+            "access.utils.decisao_utils.informar_decisoes_em_lote.delay"
+        )
+        mock_worker = mocker.patch(
+            "access.utils.decisao_utils.aplicar_decisao_em_lote_async.delay"
+        )
+        self._criar_pendentes(3)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            decisao = decidir_em_lote(ChatAccessRequest.objects.all(), "aprovado")
+
+        # O admin não altera nada: as solicitações vão para o worker.
+        assert ChatAccessRequest.objects.filter(status="pendente").count() == 3
+        (decisao_id, status, ids), _ = mock_worker.call_args
+        # Uma é aprovada, outra recusada (e notificadas) antes de o worker
+        # chegar no chunk: nenhuma das duas muda nem é notificada de novo.
+        ChatAccessRequest.objects.filter(pk=ids[0]).update(status="aprovado")
+        ChatAccessRequest.objects.filter(pk=ids[1]).update(status="recusado")
+        with django_capture_on_commit_callbacks(execute=True):
+            assert aplicar_decisao_em_lote(decisao_id, status, ids) == 1
+            # Sem nenhuma linha que possa mudar, não há UPDATE.
+            assert aplicar_decisao_em_lote(decisao_id, status, []) == 0
+
+        assert mock.call_args[0][2] == [
+            list(ChatAccessRequest.objects.values_list("nome", "email").get(pk=ids[2]))
+        ]
+        assert ChatAccessRequest.objects.get(pk=ids[1]).status == "recusado"
+        decisao.refresh_from_db()
+        assert (decisao.total, decisao.ignoradas, decisao.concluido) == (3, 2, False)
+        DecisaoEmLote.objects.filter(pk=decisao.pk).update(processados=1)
+        decisao.refresh_from_db()
+        assert decisao.concluido
+
+    def test_informar_decisoes_em_lote_atualiza_progresso(self, mocker):
+        mock_entregar = mocker.patch(
+            "access.tasks.entregar_mensagens", return_value=[None, Exception("x")]
+        )
+        decisao = DecisaoEmLote.objects.create(status="recusado", total=2)
+
+        informar_decisoes_em_lote(
+            str(decisao.pk), "recusado", [["Ana", "a@a.com"], ["Bia", "b@b.com"]]
+        )
+
+        mensagens = mock_entregar.call_args[0][0]
+        assert mensagens[0][2] == ["a@a.com"]
+        assert "recusada" in mensagens[1][1]
+        decisao.refresh_from_db()
+        assert (decisao.processados, decisao.falhas) == (1, 1)
+        assert decisao.concluido
+
+    def _falhas_de_lote(self):
+        from access.utils.smtp_utils import CircuitoAberto
+
+        return [
+            None,
+            CircuitoAberto(60),
+            smtplib.SMTPResponseException(451, b"Tente mais tarde"),
+            smtplib.SMTPRecipientsRefused({"d@d.com": (550, b"Mailbox unavailable")}),
+        ]
+
+    def test_informar_decisoes_em_lote_tenta_de_novo(self, mocker):
+        mocker.patch(
+            "access.tasks.entregar_mensagens", return_value=self._falhas_de_lote()
+        )
+        mock_reagendar = mocker.patch(
+            "access.tasks.informar_decisoes_em_lote.apply_async"
+        )
+        decisao = DecisaoEmLote.objects.create(status="aprovado", total=4)
+        solicitacoes = [[nome, f"{nome}@x.com"] for nome in "abcd"]
+
+        informar_decisoes_em_lote(str(decisao.pk), "aprovado", solicitacoes, 2)
+
+        # A pausada volta sem gastar tentativa; a transitória, com mais uma.
+        reagendadas = [
+            (call.args[0][2], call.args[1]) for call in mock_reagendar.call_args_list
+        ]
+        assert reagendadas == [
+            ([["b", "b@x.com"]], {"tentativa": 2}),
+            ([["c", "c@x.com"]], {"tentativa": 3}),
+        ]
+        assert EmailNaoEntregue.objects.get().destinatarios == ["d@x.com"]
+        decisao.refresh_from_db()
+        assert (decisao.processados, decisao.falhas) == (1, 1)
+        assert not decisao.concluido
+
+    def test_progresso_decisao_em_lote(self):
+        admin_user = User.objects.create_superuser(
+            username="admin", password="admin", email="admin@example.com"
+        )
+        decisao = DecisaoEmLote.objects.create(status="aprovado", total=3)
+        self.client.force_authenticate(admin_user)
+
+        response = self.client.get(
+            reverse("chat-access-request-decisao", args=[decisao.pk])
+        )
+
+        assert response.status_code == 200
+        assert response.data["total"] == 3
+        assert response.data["concluido"] is False
+
+    def test_nao_permite_email_repetido_com_outra_caixa(self, mocker):
+        mocker.patch("access.utils.email_utils.enviar_email_async.delay")
+        ChatAccessRequest.objects.create(**self.data)
+        data = {**self.data, "email": "JOAO@Example.com"}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == 400
+        assert "Já existe uma solicitação pendente" in response.data["email"][0]
+
+    def _listar(self, url, **params):
+        admin_user = User.objects.create_superuser(
+            username="admin", password="admin", email="admin@example.com"
+        )
+        self.client.force_authenticate(admin_user)
+        return self.client.get(url, params)
+
+    def _percorrer(self, response):
+        nomes = [item["nome"] for item in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            nomes += [item["nome"] for item in response.data["results"]]
+        return nomes, response
+
+    def test_lista_paginada_por_cursor(self, mocker, settings):
+        settings.CHAT_ACCESS_REQUEST_PAGE_SIZE = 2
+        criados = self._criar_pendentes(5)
+        # Mesmo criado_em para todas: o desempate fica por conta do id.
+        ChatAccessRequest.objects.update(criado_em="2025-01-01T00:00:00Z")
+
+        response = self._listar(reverse("chat-access-request-list"))
+        nomes, ultima = self._percorrer(response)
+
+        assert nomes == [obj.nome for obj in reversed(criados)]
+        anterior = self.client.get(ultima.data["previous"])
+        assert [item["nome"] for item in anterior.data["results"]] == ["N2", "N1"]
+
+    def test_lista_paginada_com_status_e_ordering(self, mocker, settings):
+        settings.CHAT_ACCESS_REQUEST_PAGE_SIZE = 2
+        self._criar_pendentes(5)
+        ChatAccessRequest.objects.filter(nome__in=["N1", "N3"]).update(
+            status="aprovado"
+        )
+
+        response = self._listar(
+            reverse("chat-access-request-list"),
+            status="pendente",
+            ordering="criado_em",
+        )
+        nomes, _ = self._percorrer(response)
+
+        assert nomes == ["N0", "N2", "N4"]
+
+    def test_lista_desempata_no_sentido_do_ordering(self, mocker, settings):
+        settings.CHAT_ACCESS_REQUEST_PAGE_SIZE = 2
+        criados = self._criar_pendentes(5)
+        ChatAccessRequest.objects.update(criado_em="2025-01-01T00:00:00Z")
+
+        response = self._listar(
+            reverse("chat-access-request-list"), ordering="criado_em"
+        )
+        nomes, _ = self._percorrer(response)
+
+        assert nomes == [obj.nome for obj in criados]
+
+    def test_lista_respeita_tamanho_maximo_de_pagina(self, mocker, settings):
+        settings.CHAT_ACCESS_REQUEST_MAX_PAGE_SIZE = 3
+        self._criar_pendentes(5)
+
+        response = self._listar(reverse("chat-access-request-list"), page_size=50)
+
+        assert len(response.data["results"]) == 3
+
+    def test_lista_cursor_invalido(self):
+        response = self._listar(
+            reverse("chat-access-request-list"), cursor="cD1pbnZhbGlkbw=="
+        )
+        assert response.status_code == 404
+
+    def _exportar(self, **params):
+        response = self._listar(reverse("chat-access-request-export"), **params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_exportar_ndjson(self):
+        self._criar_pendentes(3)
+        ChatAccessRequest.objects.filter(nome="N1").update(status="aprovado")
+
+        response, conteudo = self._exportar(status="pendente")
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        linhas = [json.loads(linha) for linha in conteudo.splitlines()]
+        assert [linha["nome"] for linha in linhas] == ["N0", "N2"]
+        assert set(linhas[0]) == {
+            "id",
+            "nome",
+            "email",
+            "motivo",
+            "criado_em",
+            "status",
+        }
+
+    def test_exportar_csv_com_busca_e_periodo(self):
+        self._criar_pendentes(3)
+        ChatAccessRequest.objects.filter(nome="N2").update(
+            criado_em="2025-01-10T12:00:00Z"
+        )
+
+        response, conteudo = self._exportar(
+            formato="csv", search="n2@", criado_de="2025-01-10", criado_ate="2025-01-10"
+        )
+
+        linhas = list(csv.reader(io.StringIO(conteudo)))
+        assert response["Content-Disposition"].endswith('solicitacoes.csv"')
+        assert linhas[0] == ["id", "nome", "email", "motivo", "criado_em", "status"]
+        assert [linha[1] for linha in linhas[1:]] == ["N2"]
+        assert linhas[1][4] == "2025-01-10T12:00:00Z"
+
+    def test_exportar_parametros_invalidos(self):
+        response = self._listar(
+            reverse("chat-access-request-export"), formato="xml", criado_de="ontem"
+        )
+        assert response.status_code == 400
+        response = self.client.get(
+            reverse("chat-access-request-export"), {"criado_de": "ontem"}
+        )
+        assert response.status_code == 400
+        assert "criado_de" in response.data
+
+    def test_exportar_exige_admin(self):
+        response = self.client.get(reverse("chat-access-request-export"))
+        assert response.status_code in (401, 403)
+
+    def test_criar_em_lote(self):
+        ChatAccessRequest.objects.create(**self.data, status="aprovado")
+        user = User.objects.create_user(username="parceiro", password="x")
+        self.client.force_authenticate(user)
+        itens = [
+            {"nome": "Ana", "email": "ana@example.com", "motivo": "x"},
+            {**self.data, "email": "JOAO@example.com"},
+            {"nome": "Ana 2", "email": "Ana@Example.com", "motivo": "x"},
+            {"nome": "Sem email", "motivo": "x"},
+            {"nome": "Bia", "email": "bia@example.com", "motivo": "y"},
+        ]
+
+        response = self.client.post(
+            reverse("chat-access-request-bulk"), itens, format="json"
+        )
+
+        assert response.status_code == 201
+        assert [item["nome"] for item in response.data["criados"]] == ["Ana", "Bia"]
+        assert all(item["id"] for item in response.data["criados"])
+        erros = {erro["indice"]: erro["erros"] for erro in response.data["erros"]}
+        assert "já foi aprovado" in erros[1]["email"][0]
+        assert erros[2]["email"] == ["E-mail repetido no lote."]
+        assert "email" in erros[3]
+        # Duas mensagens no outbox para cada solicitação criada (e para a
+        # criada no início do teste).
+        assert MensagemOutbox.objects.count() == 6
+        ana = ChatAccessRequest.objects.get(email="ana@example.com")
+        confirmacao = MensagemOutbox.objects.get(chave=f"criacao-confirmacao-{ana.pk}")
+        assert confirmacao.destinatarios == ["ana@example.com"]
+
+    def test_criar_em_lote_consulta_duplicados_uma_vez(
+        self, django_assert_max_num_queries
+    ):
+        from access.utils.criacao_utils import criar_em_lote
+
+        itens = [
+            {"nome": f"N{i}", "email": f"n{i}@example.com", "motivo": "x"}
+            for i in range(20)
+        ]
+        # Consulta de duplicados (na tabela e no arquivo) + INSERT das
+        # solicitações + INSERT do outbox, dentro de um savepoint.
+        with django_assert_max_num_queries(6):
+            criadas, erros = criar_em_lote(itens)
+
+        assert len(criadas) == 20
+        assert erros == []
+
+    def test_criar_em_lote_entrada_invalida(self):
+        user = User.objects.create_user(username="parceiro", password="x")
+        self.client.force_authenticate(user)
+        url = reverse("chat-access-request-bulk")
+
+        assert self.client.post(url, self.data, format="json").status_code == 400
+        response = self.client.post(url, [{"nome": "x"}], format="json")
+        assert response.status_code == 400
+        assert response.data["criados"] == []
+
+    def test_criar_em_lote_exige_autenticacao(self):
+        response = self.client.post(
+            reverse("chat-access-request-bulk"), [self.data], format="json"
+        )
+        assert response.status_code in (401, 403)
+
+    def _criar_outbox(self, quantidade):
+        return MensagemOutbox.objects.bulk_create(
+            MensagemOutbox(
+                chave=f"m{i}", assunto="A", mensagem="a", destinatarios=[f"{i}@x.com"]
+            )
+            for i in range(quantidade)
+        )
+
+    def test_email_nao_vai_para_outbox_em_rollback(self):
+        from django.db import transaction
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                ChatAccessRequest.objects.create(**self.data)
+                raise RuntimeError
+
+        assert not MensagemOutbox.objects.exists()
+
+    def test_publicar_outbox_em_lotes(self, mocker, settings):
+        settings.OUTBOX_BATCH_SIZE = 2
+        mock = mocker.patch("access.tasks.enviar_emails_outbox.apply_async")
+        self._criar_outbox(5)
+
+        call_command("publicar_outbox", stdout=io.StringIO())
+
+        lotes = [call.args[0][0] for call in mock.call_args_list]
+        assert [len(ids) for ids in lotes] == [2, 2, 1]
+        # Todas as publicações usam o mesmo producer (mesma conexão).
+        assert len({id(call.kwargs["producer"]) for call in mock.call_args_list}) == 1
+        assert not MensagemOutbox.objects.filter(publicado_em__isnull=True).exists()
+
+    def test_outbox_republica_perdidas_e_limpa_enviadas(self, mocker, settings):
+        mock = mocker.patch("access.tasks.enviar_emails_outbox.apply_async")
+        perdida, recente, enviada = self._criar_outbox(3)
+        agora = timezone.now()
+        MensagemOutbox.objects.filter(pk=perdida.pk).update(
+            publicado_em=agora - timedelta(seconds=settings.OUTBOX_REPUBLICAR_APOS + 1)
+        )
+        MensagemOutbox.objects.filter(pk=recente.pk).update(publicado_em=agora)
+        MensagemOutbox.objects.filter(pk=enviada.pk).update(
+            publicado_em=agora - timedelta(days=30),
+            enviado_em=agora - timedelta(days=settings.OUTBOX_RETENCAO_DIAS + 1),
+        )
+
+        # A perdida volta a ser publicada; o relay não apaga nada.
+        assert publicar_outbox() == 1
+        assert mock.call_args.args[0] == ([perdida.pk],)
+        assert MensagemOutbox.objects.get(pk=perdida.pk).tentativas == 1
+        assert MensagemOutbox.objects.count() == 3
+
+        assert limpar_outbox() == 1
+        assert not MensagemOutbox.objects.filter(pk=enviada.pk).exists()
+
+        # Perdida de novo na última tentativa: vai para os não entregues.
+        MensagemOutbox.objects.filter(pk=perdida.pk).update(
+            publicado_em=agora - timedelta(seconds=settings.OUTBOX_REPUBLICAR_APOS + 1),
+            tentativas=settings.OUTBOX_MAX_TENTATIVAS - 1,
+        )
+        assert publicar_outbox() == 0
+        assert not MensagemOutbox.objects.filter(pk=perdida.pk).exists()
+        assert EmailNaoEntregue.objects.get().destinatarios == perdida.destinatarios
+
+    def test_publicar_outbox_por_prioridade(self, mocker):
+        mock = mocker.patch("access.tasks.enviar_emails_outbox.apply_async")
+        ChatAccessRequest.objects.create(**self.data)
+
+        call_command("publicar_outbox", stdout=io.StringIO())
+
+        rotas = {
+            MensagemOutbox.objects.get(pk=call.args[0][0][0]).tipo: (
+                call.kwargs["queue"],
+                call.kwargs.get("priority"),
+            )
+            for call in mock.call_args_list
+        }
+        assert rotas == {
+            "admin": ("emails", None),
+            "confirmacao": ("emails_prioritarios", 9),
+        }
+
+    @pytest.mark.parametrize(
+        "filas, prefetch",
+        [(None, 1), (["emails"], 1), (["celery"], 4)],
+    )
+    def test_prefetch_por_fila(self, filas, prefetch):
+        from core.celery import ajustar_prefetch_por_fila
+        from core.celery import app as celery_app
+
+        filas_app = celery_app.amqp.Queues(celery_app.conf.task_queues)
+        if filas:
+            filas_app.select(filas)
+        worker = Mock(prefetch_multiplier=4)
+        worker.app.conf = celery_app.conf
+        worker.app.amqp.queues = filas_app
+
+        ajustar_prefetch_por_fila(worker)
+
+        assert worker.prefetch_multiplier == prefetch
+
+    def test_enviar_emails_outbox_deduplica_e_reenfileira_falhas(
+        self, mocker, settings
+    ):
+        mensagens = self._criar_outbox(5)
+        MensagemOutbox.objects.filter(pk=mensagens[0].pk).update(
+            enviado_em=timezone.now()
+        )
+        # Já na última tentativa.
+        MensagemOutbox.objects.filter(pk=mensagens[4].pk).update(
+            tentativas=settings.OUTBOX_MAX_TENTATIVAS - 1
+        )
+        MensagemOutbox.objects.update(publicado_em=timezone.now())
+        greylisting = smtplib.SMTPResponseException(451, b"Tente mais tarde")
+        mock_entregar = mocker.patch(
+            "access.tasks.entregar_mensagens",
+            return_value=[
+                None,
+                greylisting,
+                smtplib.SMTPResponseException(550, b"Mailbox unavailable"),
+                greylisting,
+            ],
+        )
+
+        enviar_emails_outbox([m.pk for m in mensagens])
+
+        # A primeira já tinha sido enviada e não é reenviada.
+        assert [m[2] for m in mock_entregar.call_args[0][0]] == [
+            [f"{i}@x.com"] for i in range(1, 5)
+        ]
+        assert MensagemOutbox.objects.get(pk=mensagens[1].pk).enviado_em
+        # O erro transitório volta para o relay, só depois da espera.
+        falha = MensagemOutbox.objects.get(pk=mensagens[2].pk)
+        assert (falha.enviado_em, falha.publicado_em, falha.tentativas) == (
+            None,
+            None,
+            1,
+        )
+        assert falha.proxima_tentativa_em > timezone.now()
+        mock_publicar = mocker.patch("access.tasks.enviar_emails_outbox.apply_async")
+        assert publicar_outbox() == 0
+        mock_publicar.assert_not_called()
+        # O erro permanente e a que esgotou as tentativas vão para os não
+        # entregues, na fila do tipo, e saem do outbox.
+        assert not MensagemOutbox.objects.filter(
+            pk__in=[mensagens[3].pk, mensagens[4].pk]
+        ).exists()
+        perdidas = EmailNaoEntregue.objects.order_by("id")
+        assert [(e.destinatarios, e.fila, e.tentativas) for e in perdidas] == [
+            (["3@x.com"], "emails", 1),
+            (["4@x.com"], "emails", settings.OUTBOX_MAX_TENTATIVAS),
+        ]
+
+    def test_modo_resumo_nao_envia_email_por_solicitacao(self, settings):
+        settings.ADMIN_DIGEST_ENABLED = True
+
+        obj = ChatAccessRequest.objects.create(**self.data)
+
+        chaves = list(MensagemOutbox.objects.values_list("chave", flat=True))
+        assert chaves == [f"criacao-confirmacao-{obj.pk}"]
+        assert ItemResumoAdmin.objects.filter(solicitacao=obj).exists()
+
+    def test_resumo_admin_por_janela_e_quantidade(self, settings):
+        from django.utils import timezone
+
+        from access.tasks import enviar_resumo_admin
+
+        settings.ADMIN_DIGEST_ENABLED = True
+        settings.ADMIN_DIGEST_MAX_ITENS = 3
+        criadas = self._criar_pendentes(2)
+        registrar_emails_criacao(criadas)
+
+        # Poucas e recentes: ainda não envia.
+        enviar_resumo_admin()
+        assert not MensagemOutbox.objects.filter(chave__startswith="resumo").exists()
+
+        ItemResumoAdmin.objects.update(
+            criado_em=timezone.now() - timedelta(seconds=settings.ADMIN_DIGEST_INTERVAL)
+        )
+        enviar_resumo_admin()
+        resumo = MensagemOutbox.objects.get(chave__startswith="resumo")
+        assert "2 novas solicitações" in resumo.assunto
+        assert f"/access/chataccessrequest/{criadas[1].pk}/change/" in resumo.mensagem
+        assert not ItemResumoAdmin.objects.exists()
+
+        # Atingiu ADMIN_DIGEST_MAX_ITENS: envia sem esperar a janela, em resumos
+        # de no máximo 3 solicitações.
+        registrar_emails_criacao(self._criar_pendentes(4)[-4:])
+        enviar_resumo_admin()
+        assert MensagemOutbox.objects.filter(chave__startswith="resumo").count() == 2
+        assert ItemResumoAdmin.objects.count() == 1
+
+    def test_templates_de_email_texto_e_html(self, settings):
+        from access.utils.email_templates import renderizar
+
+        settings.CHAT_BASE_URL = "https://chat.example.com"
+        assunto, texto, html = renderizar(
+            "decisao_recusado", nome="<Ana>", motivo_recusa="Fora do escopo"
+        )
+
+        assert assunto == "Sua solicitação foi recusada"
+        assert texto.startswith("Olá <Ana>,")
+        assert "Motivo: Fora do escopo" in texto
+        assert "&lt;Ana&gt;" in html and "<Ana>" not in html
+
+        # Mudar o setting invalida o registro compilado.
+        settings.CHAT_BASE_URL = "https://outro.example.com"
+        _, texto, _ = renderizar("decisao_aprovado", nome="Ana")
+        assert "https://outro.example.com" in texto
+
+    def test_template_sem_quebra_de_linha_no_fim(self, monkeypatch, tmp_path):
+        from access.utils import email_templates
+
+        (tmp_path / "a.txt").write_text("Equipe", encoding="utf-8")
+        (tmp_path / "b.txt").write_text("Equipe\n", encoding="utf-8")
+        monkeypatch.setattr(email_templates, "DIRETORIO", tmp_path)
+
+        assert email_templates._ler("a", "txt") == "Equipe"
+        assert email_templates._ler("b", "txt") == "Equipe"
+
+    def test_informar_decisoes_em_lote_envia_html(self, mocker):
+        from access.tasks import informar_decisoes_em_lote
+
+        mock_entregar = mocker.patch(
+            "access.tasks.entregar_mensagens", return_value=[None, None]
+        )
+        decisao = DecisaoEmLote.objects.create(status="aprovado", total=2)
+
+        informar_decisoes_em_lote(
+            str(decisao.pk), "aprovado", [["Ana", "ana@x.com"], ["Bia", "bia@x.com"]]
+        )
+
+        enviadas = mock_entregar.call_args[0][0]
+        assert [m[2] for m in enviadas] == [["ana@x.com"], ["bia@x.com"]]
+        assert all(m[3].startswith("<p>Olá") for m in enviadas)
+        assert "Olá Bia" in enviadas[1][1]
+
+    def test_validacao_de_email_usa_cache(
+        self, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            ChatAccessRequest.objects.create(**self.data)
+
+        # O status da solicitação recém-criada já está no cache.
+        with django_assert_num_queries(0):
+            response = self.client.post(self.url, self.data, format="json")
+        assert response.status_code == 400
+        assert "Já existe uma solicitação pendente" in response.data["email"][0]
+
+    def test_cache_de_status_invalidado_na_mudanca_de_status(
+        self, mocker, django_capture_on_commit_callbacks
+    ):
+        mocker.patch("access.utils.decisao_utils.informar_decisoes_em_lote.delay")
+        mocker.patch("access.utils.decisao_utils.informar_decisao")
+        self._decidir_no_worker(mocker)
+        obj = ChatAccessRequest.objects.create(**self.data)
+        assert self.client.post(self.url, self.data, format="json").status_code == 400
+
+        admin = User.objects.create_superuser("admin", "admin@x.com", "senha")
+        self.client.force_authenticate(admin)
+        url = reverse("chat-access-request-status", args=[obj.pk])
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.patch(url, {"status": "aprovado"}, format="json")
+        response = self.client.post(self.url, self.data, format="json")
+        assert "já foi aprovado" in response.data["email"][0]
+
+        outra = {**self.data, "email": "outra@example.com"}
+        outro = ChatAccessRequest.objects.create(**outra)
+        assert self.client.post(self.url, outra, format="json").status_code == 400
+        with django_capture_on_commit_callbacks(execute=True):
+            decidir_em_lote(
+                ChatAccessRequest.objects.filter(pk__in=[obj.pk, outro.pk]),
+                "recusado",
+            )
+        # A aprovada não pode ser recusada depois.
+        response = self.client.post(self.url, self.data, format="json")
+        assert "já foi aprovado" in response.data["email"][0]
+        response = self.client.post(self.url, outra, format="json")
+        assert "já foi recusado" in response.data["email"][0]
+
+    def test_limite_por_ip_antes_da_validacao(
+        self, settings, django_assert_num_queries
+    ):
+        settings.CHAT_ACCESS_REQUEST_THROTTLE_IP = "2/minute"
+        for i in range(2):
+            dados = {**self.data, "email": f"user{i}@example.com"}
+            assert self.client.post(self.url, dados, format="json").status_code == 201
+
+        with django_assert_num_queries(0):
+            response = self.client.post(self.url, self.data, format="json")
+        assert response.status_code == 429
+        assert "Retry-After" in response
+
+        # Outro IP continua liberado.
+        response = self.client.post(
+            self.url, self.data, format="json", REMOTE_ADDR="10.0.0.2"
+        )
+        assert response.status_code == 201
+
+    def test_limite_por_email(self, settings):
+        settings.CHAT_ACCESS_REQUEST_THROTTLE_EMAIL = "2/minute"
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            response = self.client.post(
+                self.url, self.data, format="json", REMOTE_ADDR=ip
+            )
+            assert response.status_code in (201, 400)
+
+        dados = {**self.data, "email": "  JOAO@example.com"}
+        response = self.client.post(
+            self.url, dados, format="json", REMOTE_ADDR="10.0.0.3"
+        )
+        assert response.status_code == 429
+
+    def _chamar_async(self, view_class, request, **kwargs):
+        return async_to_sync(view_class.as_view())(request, **kwargs)
+
+    def test_views_async_criacao_e_duplicado(self, django_capture_on_commit_callbacks):
+        factory = APIRequestFactory()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self._chamar_async(
+                ChatAccessRequestAsyncCreateView,
+                factory.post(self.url, self.data, format="json"),
+            )
+        assert response.status_code == 201
+        assert MensagemOutbox.objects.count() == 2
+
+        response = self._chamar_async(
+            ChatAccessRequestAsyncCreateView,
+            factory.post(self.url, self.data, format="json"),
+        )
+        assert response.status_code == 400
+        assert "Já existe uma solicitação pendente" in response.data["email"][0]
+
+    def test_views_async_listagem_e_status(self, settings):
+        settings.CHAT_ACCESS_REQUEST_PAGE_SIZE = 2
+        criadas = self._criar_pendentes(3)
+        admin = User.objects.create_superuser("admin", "admin@x.com", "senha")
+        factory = APIRequestFactory()
+
+        request = factory.get(reverse("chat-access-request-list"))
+        force_authenticate(request, admin)
+        response = self._chamar_async(ChatAccessRequestAsyncListView, request)
+        assert len(response.data["results"]) == 2
+        assert response.data["next"]
+
+        url = reverse("chat-access-request-status", args=[criadas[0].pk])
+        request = factory.patch(url, {"status": "aprovado"}, format="json")
+        force_authenticate(request, admin)
+        response = self._chamar_async(
+            ChatAccessRequestAsyncStatusUpdateView, request, pk=criadas[0].pk
+        )
+        assert response.data == {"status": "aprovado"}
+        criadas[0].refresh_from_db()
+        assert criadas[0].status == "aprovado"
+
+        request = factory.patch(url, {"status": "aprovado"}, format="json")
+        response = self._chamar_async(
+            ChatAccessRequestAsyncStatusUpdateView, request, pk=criadas[0].pk
+        )
+        assert response.status_code in (401, 403)
+
+    def test_listagem_rapida_igual_ao_serializer(self):
+        from rest_framework.renderers import JSONRenderer
+
+        from access.renderers import JSONRapidoRenderer
+        from access.serializers import ChatAccessRequestSerializer
+
+        ChatAccessRequest.objects.bulk_create(
+            [
+                ChatAccessRequest(nome="Zoë", email="z@x.com", motivo="ação\u2028"),
+                ChatAccessRequest(nome="Ana", email="a@x.com", motivo="x"),
+            ]
+        )
+        ChatAccessRequest.objects.filter(nome="Ana").update(
+            criado_em="2025-01-10T12:00:00.123456Z", status="aprovado"
+        )
+
+        response = self._listar(reverse("chat-access-request-list"))
+
+        esperado = ChatAccessRequestSerializer(
+            ChatAccessRequest.objects.order_by("-criado_em", "-id"), many=True
+        ).data
+        assert response.data["results"] == esperado
+        assert JSONRenderer().render(esperado)[1:-1] in response.content
+        assert JSONRapidoRenderer().render(response.data) == JSONRenderer().render(
+            response.data
+        )
+
+    def test_politica_de_resultados_das_tarefas(self):
+        from django_celery_results.models import TaskResult
+
+        from access.tasks import (
+            aplicar_decisao_em_lote_async,
+            enviar_email_async,
+            informar_decisoes_em_lote,
+        )
+
+        assert enviar_email_async.ignore_result
+        assert aplicar_decisao_em_lote_async.ignore_result
+        assert informar_decisoes_em_lote.ignore_result
+
+        enviar_email_async.apply(args=("Teste", "Mensagem", ["t@example.com"]))
+        assert not TaskResult.objects.exists()
+
+    def test_validacao_das_configuracoes_de_resultado(self, settings):
+        from access.checks import verificar_resultados_celery
+
+        def ids():
+            return [erro.id for erro in verificar_resultados_celery(None)]
+
+        assert ids() == []
+
+        settings.CELERY_RESULT_BACKEND = "rpc://"
+        assert ids() == ["access.E001"]
+
+        settings.CELERY_RESULT_BACKEND = None
+        assert ids() == []
+        settings.TAREFAS_COM_RESULTADO = ["access.tasks.informar_decisoes_em_lote"]
+        assert ids() == ["access.E003"]
+        settings.TAREFAS_COM_RESULTADO = []
+
+        settings.CELERY_RESULT_BACKEND = "django-db"
+        settings.CELERY_TASK_IGNORE_RESULT = False
+        settings.CELERY_RESULT_EXPIRES = 0
+        assert ids() == ["access.E004", "access.E005"]
+
+        settings.CELERY_RESULT_BACKEND = "redis://redis:6379/1"
+        settings.CELERY_RESULT_EXPIRES = 3600
+        assert ids() == ["access.W001"]
+
+    def test_validacao_das_rotas_de_email(self, settings):
+        from access.checks import verificar_rotas_email
+
+        assert verificar_rotas_email(None) == []
+        settings.EMAIL_ROTAS = {**settings.EMAIL_ROTAS, "resumo": {"queue": "x"}}
+        assert [e.id for e in verificar_rotas_email(None)] == ["access.E006"]
+
+    def test_configuracao_banco_por_ambiente(self, tmp_path):
+        from core.database import configuracao_banco
+
+        assert configuracao_banco({}, tmp_path)["ENGINE"].endswith("sqlite3")
+
+        env = {"POSTGRES_DB": "chat", "POSTGRES_HOST": "pg", "DB_CONN_MAX_AGE": "120"}
+        banco = configuracao_banco(env, tmp_path)
+        assert banco["ENGINE"] == "django.db.backends.postgresql"
+        assert banco["HOST"] == "pg"
+        assert banco["CONN_MAX_AGE"] == 120
+        assert banco["CONN_HEALTH_CHECKS"] is True
+        assert banco["OPTIONS"] == {}
+
+    def test_configuracao_banco_com_pool(self, tmp_path):
+        pytest.importorskip("psycopg_pool")
+        from core.database import configuracao_banco
+
+        env = {
+            "POSTGRES_DB": "chat",
+            "DB_POOL_ENABLED": "True",
+            "GUNICORN_THREADS": "4",
+        }
+        banco = configuracao_banco(env, tmp_path)
+        assert banco["CONN_MAX_AGE"] == 0
+        assert banco["OPTIONS"]["pool"]["max_size"] == 4
+
+    @pytest.mark.parametrize(
+        "settings_module, codigo, proibidos",
+        [
+            (
+                "core.settings",
+                "import core.wsgi; from django.urls import get_resolver; "
+                "get_resolver().url_patterns",
+                ["drf_yasg.views", "drf_yasg.generators", "core.openapi"],
+            ),
+            (
+                "core.settings_worker",
+                "from core.celery import app; import django; django.setup(); "
+                "app.loader.import_default_modules()",
+                ["drf_yasg", "rest_framework", "django.contrib.admin"],
+            ),
+        ],
+    )
+    def test_subida_sem_imports_desnecessarios(
+        self, settings_module, codigo, proibidos
+    ):
+        # Roda em outro processo: o da suíte já tem tudo importado.
+        codigo += (
+            "; import sys; print(' '.join(m for m in %r if m in sys.modules))"
+            % proibidos
+        )
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=Path(settings.BASE_DIR),
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings_module},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert saida.stdout.strip() == ""
+
+    def test_documentacao_gerada_sob_demanda(self):
+        resposta = self.client.get("/swagger.json")
+        assert resposta.status_code == 200
+        listagem = resposta.json()["paths"]["/chat-access-request/list/"]["get"]
+        assert {"status", "criado_de", "criado_ate"} <= {
+            p["name"] for p in listagem["parameters"]
+        }
+
+    def test_schema_estatico_com_etag(self, settings, tmp_path):
+        with pytest.raises(CommandError):
+            call_command("gerar_schema", saida=tmp_path, check=True)
+        call_command("gerar_schema", saida=tmp_path, stdout=io.StringIO())
+        call_command("gerar_schema", saida=tmp_path, check=True, stdout=io.StringIO())
+
+        # O whitenoise lê o WHITENOISE_ROOT ao montar o middleware.
+        settings.WHITENOISE_ROOT = str(tmp_path)
+        client = APIClient()
+        resposta = client.get("/swagger.json")
+        assert resposta.status_code == 200
+        assert (
+            b"".join(resposta.streaming_content)
+            == (tmp_path / "swagger.json").read_bytes()
+        )
+
+        resposta = client.get("/swagger.json", HTTP_IF_NONE_MATCH=resposta["ETag"])
+        assert resposta.status_code == 304
+
+    def _enviar_com_erro(self, mocker, erro):
+        mock_send_mail = mocker.patch("access.tasks.send_mail", side_effect=erro)
+        enviar_email_async.apply(
+            args=("Assunto", "Mensagem", ["a@a.com"]),
+            routing_key="emails_prioritarios",
+            priority=9,
+        )
+        return mock_send_mail
+
+    def test_email_com_erro_transitorio_tenta_de_novo(self, mocker, settings):
+        mock_send_mail = self._enviar_com_erro(
+            mocker, smtplib.SMTPResponseException(451, b"Tente mais tarde")
+        )
+
+        assert mock_send_mail.call_count == settings.EMAIL_RETRY_MAX_TENTATIVAS + 1
+        morto = EmailNaoEntregue.objects.get()
+        assert morto.tentativas == settings.EMAIL_RETRY_MAX_TENTATIVAS + 1
+
+    def test_email_com_erro_permanente_vai_direto_para_nao_entregues(self, mocker):
+        mock_send_mail = self._enviar_com_erro(
+            mocker,
+            smtplib.SMTPRecipientsRefused({"a@a.com": (550, b"Mailbox unavailable")}),
+        )
+
+        assert mock_send_mail.call_count == 1
+        morto = EmailNaoEntregue.objects.get()
+        assert morto.tentativas == 1
+        assert (morto.fila, morto.prioridade) == ("emails_prioritarios", 9)
+
+    def _pausas_do_circuito(self, mocker, quantidade):
+        # Com o worker eager não passa tempo: a pausa acaba depois de
+        # ``quantidade`` tarefas barradas pelo circuito.
+        from access.utils import smtp_utils
+
+        barradas = []
+
+        def verificar():
+            try:
+                smtp_utils.verificar_circuito()
+            except smtp_utils.CircuitoAberto:
+                barradas.append(1)
+                if len(barradas) == quantidade:
+                    cache.clear()
+                raise
+
+        mocker.patch("access.tasks.verificar_circuito", side_effect=verificar)
+        return barradas
+
+    def test_circuito_pausa_envio_com_provedor_fora(self, mocker, settings):
+        pausas = settings.EMAIL_RETRY_MAX_TENTATIVAS + 2
+        barradas = self._pausas_do_circuito(mocker, pausas)
+        falhas = [ConnectionRefusedError()] * settings.SMTP_CIRCUITO_FALHAS
+        mock_send_mail = self._enviar_com_erro(mocker, falhas + [1])
+
+        # Barradas pelo circuito, as tentativas não chegam ao SMTP nem gastam
+        # o limite de tentativas: o e-mail sai quando a pausa acaba.
+        assert len(barradas) == pausas
+        assert mock_send_mail.call_count == settings.SMTP_CIRCUITO_FALHAS + 1
+        assert not EmailNaoEntregue.objects.exists()
+
+    def test_outbox_nao_gasta_tentativas_com_circuito_aberto(self, settings):
+        for _ in range(settings.SMTP_CIRCUITO_FALHAS):
+            registrar_falha(ConnectionRefusedError())
+
+        mensagem = self._criar_outbox(1)[0]
+        enviar_emails_outbox([mensagem.pk])
+        mensagem.refresh_from_db()
+        assert (mensagem.tentativas, mensagem.enviado_em) == (0, None)
+
+    def test_reenviar_nao_entregues(self, mocker):
+        mock = mocker.patch("access.utils.email_utils.enviar_email_async.apply_async")
+        email = EmailNaoEntregue.objects.create(
+            assunto="A",
+            mensagem="a",
+            destinatarios=["a@a.com"],
+            fila="emails_prioritarios",
+            prioridade=9,
+            erro="x",
+            tentativas=9,
+        )
+
+        call_command("reenviar_nao_entregues", stdout=io.StringIO())
+        call_command("reenviar_nao_entregues", stdout=io.StringIO())
+
+        mock.assert_called_once()
+        assert mock.call_args.args == (("A", "a", ["a@a.com"]), {"html": ""})
+        assert mock.call_args.kwargs["queue"] == "emails_prioritarios"
+        assert mock.call_args.kwargs["priority"] == 9
+        email.refresh_from_db()
+        assert email.reenviado_em is not None
+
+    @pytest.mark.parametrize("update_returning", [True, False])
+    def test_status_com_update_condicional(
+        self,
+        mocker,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+        update_returning,
+    ):
+        mocker.patch(
+            "access.models.suporta_update_returning", return_value=update_returning
+        )
+        mock_informar = mocker.patch("access.utils.decisao_utils.informar_decisao")
+        obj = ChatAccessRequest.objects.create(**self.data)
+        admin = User.objects.create_superuser("admin", "admin@x.com", "senha")
+        self.client.force_authenticate(admin)
+        url = reverse("chat-access-request-status", args=[obj.pk])
+
+        # Os callbacks do commit (e-mail e contadores) ficam fora da contagem.
+        with django_capture_on_commit_callbacks(execute=True):
+            with django_assert_num_queries(1 if update_returning else 4):
+                response = self.client.put(url, {"status": "aprovado"}, format="json")
+        assert response.data == {"status": "aprovado"}
+        mock_informar.assert_called_once()
+        assert mock_informar.call_args.args[0].nome == self.data["nome"]
+
+        # Já decidida: nada muda e ninguém é notificado de novo.
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.patch(url, {"status": "recusado"}, format="json")
+        assert response.status_code == 409
+        assert "de aprovado para recusado" in response.data["status"][0]
+        mock_informar.assert_called_once()
+        obj.refresh_from_db()
+        assert obj.status == "aprovado"
+
+        response = self.client.patch(url, {}, format="json")
+        assert response.status_code == 400
+        url = reverse("chat-access-request-status", args=[obj.pk + 1])
+        response = self.client.patch(url, {"status": "aprovado"}, format="json")
+        assert response.status_code == 404
+
+    def _contagens(self):
+        return {
+            (c.dia, c.status): c.total for c in ContagemStatus.objects.exclude(total=0)
+        }
+
+    def test_contadores_de_status(self, mocker, django_capture_on_commit_callbacks):
+        mocker.patch("access.utils.decisao_utils.informar_decisao")
+        mocker.patch("access.utils.decisao_utils.informar_decisoes_em_lote.delay")
+        self._decidir_no_worker(mocker)
+        hoje = timezone.localdate()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.post(self.url, self.data, format="json")
+            criadas, _ = criar_em_lote(
+                [
+                    {"nome": f"N{i}", "email": f"n{i}@example.com", "motivo": "x"}
+                    for i in range(3)
+                ]
+            )
+        assert self._contagens() == {(hoje, "pendente"): 4}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            decidir(criadas[0].pk, "aprovado")
+            # Uma aprovada e uma pendente: só a pendente pode ser recusada.
+            decidir_em_lote(
+                ChatAccessRequest.objects.filter(pk__in=[c.pk for c in criadas[:2]]),
+                "recusado",
+            )
+        with django_capture_on_commit_callbacks(execute=True):
+            # Decisão recusada: não mexe nos contadores.
+            decidir(criadas[1].pk, "aprovado")
+        assert self._contagens() == {
+            (hoje, "pendente"): 2,
+            (hoje, "aprovado"): 1,
+            (hoje, "recusado"): 1,
+        }
+
+        # Alterações por fora (ex.: SQL manual) são corrigidas pela reconciliação.
+        ChatAccessRequest.objects.filter(pk=criadas[2].pk).update(
+            criado_em=timezone.now() - timedelta(days=2), status="aprovado"
+        )
+        with CaptureQueriesContext(connection) as consultas:
+            assert reconciliar_contagens() == 2
+        # Solicitações e arquivadas lidas juntas, num só instantâneo.
+        assert sum("UNION ALL" in c["sql"] for c in consultas) == 1
+        assert reconciliar_contagens() == 0
+        assert self._contagens() == {
+            (hoje, "pendente"): 1,
+            (hoje, "aprovado"): 1,
+            (hoje, "recusado"): 1,
+            (hoje - timedelta(days=2), "aprovado"): 1,
+        }
+
+    def test_estatisticas_leem_so_os_contadores(
+        self, settings, django_assert_num_queries
+    ):
+        settings.ESTATISTICAS_DIAS = 3
+        hoje = timezone.localdate()
+        ContagemStatus.objects.bulk_create(
+            [
+                ContagemStatus(dia=hoje, status="pendente", total=5),
+                ContagemStatus(dia=hoje, status="aprovado", total=2),
+                ContagemStatus(
+                    dia=hoje - timedelta(days=2), status="recusado", total=1
+                ),
+                ContagemStatus(
+                    dia=hoje - timedelta(days=3), status="pendente", total=7
+                ),
+            ]
+        )
+        url = reverse("chat-access-request-estatisticas")
+        assert self.client.get(url).status_code in (401, 403)
+        admin = User.objects.create_superuser("admin", "admin@x.com", "senha")
+        self.client.force_authenticate(admin)
+
+        with django_assert_num_queries(1):
+            response = self.client.get(url)
+        assert response.data["total"] == 8
+        assert response.data["por_status"] == {
+            "pendente": 5,
+            "aprovado": 2,
+            "recusado": 1,
+        }
+        assert [dia["dia"] for dia in response.data["por_dia"]] == [
+            hoje - timedelta(days=2),
+            hoje - timedelta(days=1),
+            hoje,
+        ]
+        assert response.data["por_dia"][1] == {
+            "dia": hoje - timedelta(days=1),
+            "pendente": 0,
+            "aprovado": 0,
+            "recusado": 0,
+        }
+
+        inicio = (hoje - timedelta(days=3)).isoformat()
+        response = self.client.get(url, {"criado_de": inicio, "criado_ate": inicio})
+        assert response.data["total"] == 7
+        assert self.client.get(url, {"criado_de": "ontem"}).status_code == 400
+        response = self.client.get(url, {"criado_de": "2000-01-01"})
+        assert response.status_code == 400
+
+    def _criar_para_busca(self):
+        return ChatAccessRequest.objects.bulk_create(
+            [
+                ChatAccessRequest(
+                    nome="Maria Souza",
+                    email="maria@empresa.com.br",
+                    motivo="Acesso ao painel financeiro. Painel de custos.",
+                ),
+                ChatAccessRequest(
+                    nome="João Silva",
+                    email="joao.silva@example.com",
+                    motivo="Preciso de acesso ao painel",
+                ),
+                ChatAccessRequest(
+                    nome="Ana", email="ana@example.com", motivo="Relatórios and OR"
+                ),
+            ]
+        )
+
+    @pytest.mark.parametrize("backend", ["", "icontains"])
+    def test_busca_textual(self, settings, backend):
+        settings.CHAT_ACCESS_REQUEST_BUSCA = backend
+        maria, joao, ana = self._criar_para_busca()
+
+        def nomes(texto):
+            return [s.nome for s in buscar(ChatAccessRequest.objects.all(), texto)]
+
+        assert nomes("financ") == ["Maria Souza"]
+        assert nomes("SILVA example") == ["João Silva"]
+        assert sorted(nomes("empresa.com")) == ["Maria Souza"]
+        assert nomes(" JOAO.Silva@example.com ") == ["João Silva"]
+        assert nomes("relatórios and") == ["Ana"]
+        assert nomes("painel inexistente") == []
+        assert nomes("@@") == []
+
+        # Mantido em dia a cada escrita, inclusive update() e delete().
+        joao.nome = "João Pereira"
+        joao.save()
+        ChatAccessRequest.objects.filter(pk=ana.pk).update(motivo="Auditoria")
+        maria.delete()
+        assert nomes("silva") == ["João Pereira"]
+        assert nomes("pereira") == ["João Pereira"]
+        assert nomes("relatórios") == []
+        assert nomes("auditoria") == ["Ana"]
+        assert nomes("financeiro") == []
+
+    def test_busca_ordenada_por_relevancia(self, settings):
+        settings.CHAT_ACCESS_REQUEST_PAGE_SIZE = 1
+        maria, joao, _ = self._criar_para_busca()
+        admin = User.objects.create_superuser("admin", "admin@x.com", "senha")
+        self.client.force_authenticate(admin)
+
+        # "painel" aparece duas vezes no motivo da Maria.
+        url = reverse("chat-access-request-list")
+        response = self.client.get(url, {"search": "painel"})
+        assert [s["nome"] for s in response.data["results"]] == ["Maria Souza"]
+        response = self.client.get(response.data["next"])
+        assert [s["nome"] for s in response.data["results"]] == ["João Silva"]
+        assert response.data["next"] is None
+
+        # Uma ordenação pedida continua valendo.
+        response = self.client.get(url, {"search": "painel", "ordering": "criado_em"})
+        assert [s["nome"] for s in response.data["results"]] == ["Maria Souza"]
+
+        response = self.client.get(
+            reverse("chat-access-request-export"), {"search": "painel"}
+        )
+        linhas = b"".join(response.streaming_content).decode().splitlines()
+        assert len(linhas) == 2
+
+        self.client.force_login(admin)
+        response = self.client.get("/admin/access/chataccessrequest/", {"q": "painel"})
+        assert list(response.context["cl"].result_list) == [maria, joao]
+        response = self.client.get(
+            "/admin/access/chataccessrequest/", {"q": "painel", "o": "1"}
+        )
+        assert list(response.context["cl"].result_list) == [joao, maria]
+
+    def _lista_admin(self, monkeypatch, quantidade):
+        monkeypatch.setattr(ChatAccessRequestAdmin, "list_per_page", 5)
+        self._criar_pendentes(quantidade)
+        # Metade com o mesmo criado_em: o id desempata.
+        ids = ChatAccessRequest.objects.order_by("id").values("id")[: quantidade // 2]
+        ChatAccessRequest.objects.filter(id__in=ids).update(criado_em=timezone.now())
+        esperado = list(ChatAccessRequest.objects.order_by("-criado_em", "-id"))
+        admin = User.objects.create_superuser("admin", "admin@x.com", "senha")
+        self.client.force_login(admin)
+
+        def abrir(query=""):
+            response = self.client.get("/admin/access/chataccessrequest/" + query)
+            assert response.status_code == 200
+            return response.context["cl"]
+
+        return [esperado[i : i + 5] for i in range(0, quantidade, 5)], abrir
+
+    def test_admin_pagina_pela_ancora(self, monkeypatch):
+        paginas, abrir = self._lista_admin(monkeypatch, 23)
+
+        cl = abrir()
+        assert cl.result_count == 23
+        assert cl.full_result_count is None
+        # Seguindo os links de página, para a frente e para trás.
+        for numero in [2, 3, 4, 5, 4, 3, 2, 1]:
+            cl = abrir(cl.get_query_string({PAGE_VAR: numero}))
+            assert list(cl.result_list) == paginas[numero - 1]
+        # Sem âncora, ou com uma inválida, a página é contada das pontas.
+        for numero in range(1, 6):
+            assert list(abrir(f"?p={numero}").result_list) == paginas[numero - 1]
+        assert list(abrir("?p=2&ancora=x").result_list) == paginas[1]
+        # Filtros e ordenação não levam a âncora.
+        assert "ancora" not in cl.get_query_string({"status__exact": "pendente"})
+        cl = abrir(cl.get_query_string({PAGE_VAR: 2, "o": "1"}))
+        nomes = sorted(s.nome for pagina in paginas for s in pagina)
+        assert [s.nome for s in cl.result_list] == nomes[5:10]
+
+    def test_admin_usa_estimativa_em_tabela_grande(self, monkeypatch, mocker, settings):
+        settings.ADMIN_CONTAGEM_EXATA_MAX = 1000
+        mocker.patch("access.pagination.estimar_linhas", return_value=1_000_000)
+        paginas, abrir = self._lista_admin(monkeypatch, 23)
+
+        cl = abrir("?p=3")
+        with CaptureQueriesContext(connection) as consultas:
+            cl = abrir(cl.get_query_string({PAGE_VAR: 4}))
+        assert cl.result_count == 1_000_000
+        assert list(cl.result_list) == paginas[3]
+        sql = [consulta["sql"] for consulta in consultas]
+        assert not any("COUNT(" in consulta for consulta in sql)
+        # A página vizinha sai da âncora, pulando no máximo a página atual.
+        pulos = [int(n) for n in re.findall(r"OFFSET (\d+)", " ".join(sql))]
+        assert pulos and max(pulos) <= 5
+
+    def _criar_para_arquivar(self):
+        antigo = timezone.now() - timedelta(days=400)
+        solicitacoes = ChatAccessRequest.objects.bulk_create(
+            ChatAccessRequest(nome=nome, email=email, motivo="x", status=status)
+            for nome, email, status in [
+                ("Ana", "ana@example.com", "recusado"),
+                ("Ana", "Ana@Example.com", "aprovado"),
+                ("Bia", "bia@example.com", "recusado"),
+                ("Caio", "caio@example.com", "aprovado"),
+                ("Duda", "duda@example.com", "pendente"),
+                ("Eva", "eva@example.com", "aprovado"),
+            ]
+        )
+        # Todas antigas menos a da Eva; a aprovação da Ana é a mais recente.
+        for dias, solicitacao in enumerate(solicitacoes[:5]):
+            ChatAccessRequest.objects.filter(pk=solicitacao.pk).update(
+                criado_em=antigo + timedelta(days=dias)
+            )
+        ItemResumoAdmin.objects.create(solicitacao=solicitacoes[2])
+        reconciliar_contagens()
+        return solicitacoes
+
+    def test_arquivamento_de_decididas(self):
+        solicitacoes = self._criar_para_arquivar()
+
+        # Um lote por transação, no máximo max_lotes por execução, alternando
+        # entre os status: as aprovadas não tomam o orçamento das recusadas.
+        assert arquivar_decididas(dias=365, tamanho=1, max_lotes=2) == 2
+        assert set(SolicitacaoArquivada.objects.values_list("status", flat=True)) == {
+            "aprovado",
+            "recusado",
+        }
+        assert arquivar_decididas(dias=365, tamanho=1) == 2
+        assert arquivar_decididas(dias=365) == 0
+
+        restantes = ChatAccessRequest.objects.order_by("id")
+        assert [s.nome for s in restantes] == ["Duda", "Eva"]
+        arquivadas = SolicitacaoArquivada.objects.order_by("id")
+        assert [s.id for s in arquivadas] == [s.pk for s in solicitacoes[:4]]
+        assert arquivadas[1].email == "Ana@Example.com"
+        assert not ItemResumoAdmin.objects.exists()
+        assert dict(EmailArquivado.objects.values_list("email", "status")) == {
+            "ana@example.com": "aprovado",
+            "bia@example.com": "recusado",
+            "caio@example.com": "aprovado",
+        }
+        # Os contadores continuam contando as arquivadas.
+        assert reconciliar_contagens() == 0
+        assert buscar(ChatAccessRequest.objects.all(), "caio").count() == 0
+
+    def test_email_arquivado_continua_duplicado(self):
+        self._criar_para_arquivar()
+        call_command("arquivar_solicitacoes", "--dias", "365", stdout=io.StringIO())
+
+        response = self.client.post(
+            self.url, {**self.data, "email": "ANA@example.com"}, format="json"
+        )
+        assert response.status_code == 400
+        assert "já foi aprovado" in str(response.data["email"])
+        response = self.client.post(
+            self.url, {**self.data, "email": "bia@example.com"}, format="json"
+        )
+        assert "já foi recusado" in str(response.data["email"])
+
+        criadas, erros = criar_em_lote(
+            [
+                {"nome": "Caio", "email": "caio@example.com", "motivo": "x"},
+                {"nome": "Duda", "email": "duda@example.com", "motivo": "x"},
+                {"nome": "Gil", "email": "gil@example.com", "motivo": "x"},
+            ]
+        )
+        assert [c.email for c in criadas] == ["gil@example.com"]
+        assert [e["indice"] for e in erros] == [0, 1]
+
+    @pytest.mark.parametrize("estimativa", [30, 15])
+    def test_admin_com_estimativa_diferente_do_total(
+        self, monkeypatch, mocker, settings, estimativa
+    ):
+        settings.ADMIN_CONTAGEM_EXATA_MAX = 10
+        mocker.patch("access.pagination.estimar_linhas", return_value=estimativa)
+        paginas, abrir = self._lista_admin(monkeypatch, 23)
+        ultima = estimativa // 5
+
+        # Pelos links "próxima", as páginas seguem as linhas reais, sem
+        # repetir nem pular nenhuma.
+        cl = abrir()
+        vistas = list(cl.result_list)
+        for numero in range(2, ultima + 1):
+            cl = abrir(cl.get_query_string({PAGE_VAR: numero}))
+            assert cl.result_count == estimativa
+            vistas += list(cl.result_list)
+        esperado = [s for pagina in paginas for s in pagina]
+        assert vistas == esperado[: len(vistas)]
+        # Aberta direto, a última página traz as mais antigas.
+        assert list(abrir(f"?p={ultima}").result_list) == esperado[-5:]